@@ -1,8 +1,36 @@
-from flask import Flask
+import hmac
+import json
+import threading
+
+import click
+from flask import Flask, request
 
 from .config import DevelopmentConfig
-from .routes import auth_bp, catalog_bp, maintenance_bp, predictions_bp, vehicles_bp
-from .utils.db import init_db
+from .jobs.compaction import build_compactor, collection_size
+from .jobs.date_migration import build_date_migration
+from .jobs.reminders import build_scheduler, start_reminder_thread
+from .jobs.retrain import init_model_registry
+from .jobs.rollups import rebuild_cost_rollups
+from .jobs.shadow import init_shadow_evaluation
+from .models import Vehicle
+from .models.due import refresh_all_due_fields
+from .models.indexes import ensure_indexes
+from .models.unit_of_work import init_unit_of_work
+from .routes import (
+    analytics_bp,
+    auth_bp,
+    catalog_bp,
+    dashboard_bp,
+    maintenance_bp,
+    models_bp,
+    predictions_bp,
+    telemetry_bp,
+    vehicles_bp,
+)
+from .storage import get_storage, init_storage
+from .utils.admission import init_admission
+from .utils.db import get_db, init_db
+from .utils.metrics import metrics
 
 
 def create_app(config_object=None):
@@ -10,15 +38,92 @@ def create_app(config_object=None):
     app.config.from_object(config_object or DevelopmentConfig)
 
     init_db(app)
+    init_storage(app)
+    init_unit_of_work(app)
+    init_admission(app)
+    init_shadow_evaluation(app)
+    init_model_registry(app)
 
     app.register_blueprint(auth_bp, url_prefix="/api/auth")
     app.register_blueprint(catalog_bp, url_prefix="/api/catalog")
     app.register_blueprint(vehicles_bp, url_prefix="/api/vehicles")
     app.register_blueprint(maintenance_bp, url_prefix="/api/maintenance")
     app.register_blueprint(predictions_bp, url_prefix="/api")
+    app.register_blueprint(telemetry_bp, url_prefix="/api/telemetry")
+    app.register_blueprint(analytics_bp, url_prefix="/api/analytics")
+    app.register_blueprint(models_bp, url_prefix="/api/models")
+    app.register_blueprint(dashboard_bp, url_prefix="/api/dashboard")
+
+    @app.cli.command("ensure-indexes")
+    def ensure_indexes_command():
+        for name in ensure_indexes():
+            print(name)
+
+    @app.cli.command("refresh-due")
+    def refresh_due_command():
+        print(f"refreshed {refresh_all_due_fields()} vehicles")
+
+    @app.cli.command("backfill-cost-rollups")
+    def backfill_cost_rollups_command():
+        buckets, removed = rebuild_cost_rollups(get_db())
+        print(f"rebuilt {buckets} cost rollups, removed {removed} stale")
+
+    @app.cli.command("run-reminders")
+    @click.option("--once", is_flag=True, help="Run a single scan instead of looping.")
+    def run_reminders_command(once):
+        scheduler = build_scheduler(app, get_db())
+        if once:
+            Vehicle.assign_missing_shard_keys(get_db())
+            print(scheduler.run_once())
+            return
+        scheduler.run_forever(app.config["REMINDER_INTERVAL_SECONDS"], threading.Event())
+
+    @app.cli.command("compact-predictions")
+    def compact_predictions_command():
+        db = get_db()
+        before = collection_size(db)
+        print(build_compactor(app, db).run())
+        after = collection_size(db)
+        print(f"documents {before[0]} -> {after[0]}, data {before[1]} -> {after[1]} bytes, storage {before[2]} -> {after[2]} bytes")
+
+    @app.cli.command("migrate-dates")
+    @click.option("--max-batches", type=int, default=None, help="Stop after this many batches; rerun to continue.")
+    @click.option("--restart", is_flag=True, help="Rescan from the first document instead of the checkpoint.")
+    def migrate_dates_command(max_batches, restart):
+        if get_storage().name != "mongo":
+            raise click.ClickException("migrate-dates only applies to the mongo storage backend")
+        results = build_date_migration(app, get_db()).run(max_batches=max_batches, restart=restart)
+        for collection, totals in results.items():
+            state = "complete" if totals["complete"] else "paused, rerun to continue"
+            print(
+                f"{collection}: converted {totals['converted']} of {totals['scanned']} scanned, "
+                f"skipped {totals['skipped']} in {totals['batches']} batches ({state})"
+            )
+        if all(totals["complete"] for totals in results.values()) and not app.config["STRING_DATES_MIGRATED"]:
+            print("all dates migrated; set STRING_DATES_MIGRATED=true to sort service_date through the indexes")
+
+    @app.cli.command("tune-models")
+    def tune_models_command():
+        job = app.extensions["model_retrain"].start(requested_by="cli", mode="tune", background=False)
+        if job is None:
+            raise click.ClickException("a retraining job is already running")
+        print(json.dumps(job, indent=2, default=str))
+
+    if app.config["REMINDERS_IN_PROCESS"]:
+        app.extensions["reminder_stop"] = start_reminder_thread(app)
 
     @app.get("/health")
     def health_check():
         return {"status": "ok"}, 200
 
+    @app.get("/metrics")
+    def metrics_snapshot():
+        token = app.config["METRICS_TOKEN"]
+        if not token:
+            return {"error": "Not found"}, 404
+        supplied = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+        if not hmac.compare_digest(supplied.encode(), token.encode()):
+            return {"error": "Missing or invalid token"}, 401
+        return metrics.snapshot(), 200
+
     return app
@@ -4,8 +4,82 @@ import os
 class BaseConfig:
     SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret")
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "dev-jwt-secret")
+    STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "mongo").lower()
+    SQLITE_PATH = os.getenv(
+        "SQLITE_PATH",
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "caremycar.sqlite3"),
+    )
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
     MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
     MONGO_DB_NAME = os.getenv("MONGO_DB_NAME", "vehicle_maintenance")
+    MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "50"))
+    MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "2000"))
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+    MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+    MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "30000"))
+    MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "zstd,snappy,zlib")
+    MONGO_READ_ONLY_PREFERENCE = os.getenv("MONGO_READ_ONLY_PREFERENCE", "primary")
+    MONGO_SLOW_QUERY_MS = int(os.getenv("MONGO_SLOW_QUERY_MS", "100"))
+    MONGO_REQUEST_QUERY_WARN = int(os.getenv("MONGO_REQUEST_QUERY_WARN", "10"))
+    # Bearer token required by GET /metrics; the endpoint is disabled while unset.
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+    PASSWORD_SALT_LENGTH = int(os.getenv("PASSWORD_SALT_LENGTH", "16"))
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "16"))
+    PASSWORD_HASH_TIMEOUT_MS = int(os.getenv("PASSWORD_HASH_TIMEOUT_MS", "3000"))
+    PASSWORD_HASH_RESULT_TIMEOUT_MS = int(os.getenv("PASSWORD_HASH_RESULT_TIMEOUT_MS", "10000"))
+    MAINTENANCE_IMPORT_BATCH_SIZE = int(os.getenv("MAINTENANCE_IMPORT_BATCH_SIZE", "1000"))
+    MAINTENANCE_IMPORT_MAX_ERRORS = int(os.getenv("MAINTENANCE_IMPORT_MAX_ERRORS", "1000"))
+    TELEMETRY_MAX_BATCH = int(os.getenv("TELEMETRY_MAX_BATCH", "5000"))
+    TELEMETRY_BUCKET_SIZE = int(os.getenv("TELEMETRY_BUCKET_SIZE", "200"))
+    TELEMETRY_RATE_ALPHA = float(os.getenv("TELEMETRY_RATE_ALPHA", "0.2"))
+    TELEMETRY_MAX_CLOCK_SKEW_S = int(os.getenv("TELEMETRY_MAX_CLOCK_SKEW_S", "300"))
+    REMINDERS_IN_PROCESS = os.getenv("REMINDERS_IN_PROCESS", "false").lower() == "true"
+    REMINDER_INTERVAL_SECONDS = int(os.getenv("REMINDER_INTERVAL_SECONDS", "900"))
+    REMINDER_SHARDS = int(os.getenv("REMINDER_SHARDS", "4"))
+    REMINDER_BATCH_SIZE = int(os.getenv("REMINDER_BATCH_SIZE", "500"))
+    REMINDER_HORIZON_DAYS = int(os.getenv("REMINDER_HORIZON_DAYS", "30"))
+    REMINDER_MARGIN_KM = int(os.getenv("REMINDER_MARGIN_KM", "1000"))
+    REMINDER_LEASE_SECONDS = int(os.getenv("REMINDER_LEASE_SECONDS", "300"))
+    SHADOW_COST_MODEL_PATH = os.getenv("SHADOW_COST_MODEL_PATH", "")
+    SHADOW_SAMPLE_RATE = float(os.getenv("SHADOW_SAMPLE_RATE", "0.1"))
+    SHADOW_QUEUE_SIZE = int(os.getenv("SHADOW_QUEUE_SIZE", "1000"))
+    SHADOW_BATCH_SIZE = int(os.getenv("SHADOW_BATCH_SIZE", "64"))
+    CATALOG_SEARCH_REFRESH_SECONDS = int(os.getenv("CATALOG_SEARCH_REFRESH_SECONDS", "300"))
+    PREDICTIONS_TTL_DAYS = int(os.getenv("PREDICTIONS_TTL_DAYS", "180"))
+    PREDICTIONS_KEEP_LATEST = int(os.getenv("PREDICTIONS_KEEP_LATEST", "20"))
+    PREDICTIONS_SNAPSHOT_RETENTION_DAYS = int(os.getenv("PREDICTIONS_SNAPSHOT_RETENTION_DAYS", "730"))
+    PREDICTIONS_DEDUP_COST_TOLERANCE = float(os.getenv("PREDICTIONS_DEDUP_COST_TOLERANCE", "1.0"))
+    PREDICTIONS_COMPACTION_BATCH = int(os.getenv("PREDICTIONS_COMPACTION_BATCH", "1000"))
+    DATE_MIGRATION_BATCH_SIZE = int(os.getenv("DATE_MIGRATION_BATCH_SIZE", "1000"))
+    DATE_MIGRATION_PAUSE_MS = int(os.getenv("DATE_MIGRATION_PAUSE_MS", "0"))
+    # Set once `flask migrate-dates` reports complete: service_date is then sorted
+    # as stored, through the indexes, instead of through a $convert-ed key.
+    STRING_DATES_MIGRATED = os.getenv("STRING_DATES_MIGRATED", "false").lower() == "true"
+    MODEL_REGISTRY_DIR = os.getenv(
+        "MODEL_REGISTRY_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "model_registry")
+    )
+    MODEL_RETRAIN_TIMEOUT_SECONDS = int(os.getenv("MODEL_RETRAIN_TIMEOUT_SECONDS", "1800"))
+    MODEL_KEEP_VERSIONS = int(os.getenv("MODEL_KEEP_VERSIONS", "5"))
+    MODEL_PROMOTION_MAX_MAE_RATIO = float(os.getenv("MODEL_PROMOTION_MAX_MAE_RATIO", "1.25"))
+    # Cores a tuning job's search may use; it shares the host with the web workers.
+    MODEL_TUNING_N_JOBS = int(os.getenv("MODEL_TUNING_N_JOBS", "2"))
+    PREDICT_MAX_CONCURRENCY = int(os.getenv("PREDICT_MAX_CONCURRENCY", "2"))
+    PREDICT_MAX_QUEUE = int(os.getenv("PREDICT_MAX_QUEUE", "8"))
+    PREDICT_QUEUE_TIMEOUT_MS = int(os.getenv("PREDICT_QUEUE_TIMEOUT_MS", "1500"))
+    PREDICT_RETRY_AFTER_SECONDS = int(os.getenv("PREDICT_RETRY_AFTER_SECONDS", "2"))
+    # Time POST /api/predict may spend from its arrival (admission queue, model
+    # loads, predicting) before it answers with the rule-based estimates; 0
+    # waits for the models.
+    PREDICT_LATENCY_BUDGET_MS = int(os.getenv("PREDICT_LATENCY_BUDGET_MS", "250"))
+    PREDICT_INFERENCE_WORKERS = int(os.getenv("PREDICT_INFERENCE_WORKERS", "2"))
+    PREDICT_INFERENCE_MAX_QUEUE = int(os.getenv("PREDICT_INFERENCE_MAX_QUEUE", "2"))
+    FORECAST_MAX_YEARS = int(os.getenv("FORECAST_MAX_YEARS", "10"))
+    DUE_MAX_DAYS = int(os.getenv("DUE_MAX_DAYS", "3650"))
+    DUE_MAX_KM = int(os.getenv("DUE_MAX_KM", "1000000"))
+    PREDICT_MAX_SCENARIOS = int(os.getenv("PREDICT_MAX_SCENARIOS", "10000"))
 
 
 class DevelopmentConfig(BaseConfig):
@@ -14,3 +88,5 @@ class DevelopmentConfig(BaseConfig):
 
 class ProductionConfig(BaseConfig):
     DEBUG = False
+    MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "5"))
+    MONGO_READ_ONLY_PREFERENCE = os.getenv("MONGO_READ_ONLY_PREFERENCE", "secondaryPreferred")
@@ -0,0 +1,168 @@
+import logging
+from datetime import datetime, timedelta, timezone
+
+from ..models.prediction import Prediction
+from ..utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+_PROJECTION = {
+    "user_id": 1,
+    "vehicle_id": 1,
+    "created_at": 1,
+    "snapshot": 1,
+    "prediction.maintenance_schedule.recommended_next_oil_change_km": 1,
+    "prediction.maintenance_schedule.recommended_general_check_date": 1,
+    "prediction.cost_prediction": 1,
+}
+
+
+def _as_utc(value):
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _signature(doc):
+    prediction = doc.get("prediction") or {}
+    schedule = prediction.get("maintenance_schedule") or {}
+    cost = prediction.get("cost_prediction") or {}
+    key = (
+        schedule.get("recommended_next_oil_change_km"),
+        schedule.get("recommended_general_check_date"),
+        cost.get("service_type"),
+        cost.get("model_used"),
+    )
+    return key, cost.get("estimated_cost_mxn")
+
+
+def _near_identical(newer, older, tolerance):
+    newer_key, newer_cost = newer
+    older_key, older_cost = older
+    if newer_key != older_key:
+        return False
+    if newer_cost is None or older_cost is None:
+        return newer_cost == older_cost
+    return abs(newer_cost - older_cost) <= tolerance
+
+
+class PredictionCompactor:
+    """Thins out stored predictions one vehicle at a time.
+
+    Per vehicle, newest first: a prediction that repeats the one stored right after
+    it (same schedule and service, cost within ``cost_tolerance``) is dropped; the
+    newest prediction of each day becomes a snapshot kept for ``snapshot_days``;
+    the ``keep_latest`` most recent predictions are never deleted and are marked as
+    snapshots too, whatever their age; every other prediction is deleted.
+    Non-snapshot records are later expired by the TTL index.
+    """
+
+    def __init__(
+        self,
+        db,
+        keep_latest=20,
+        cost_tolerance=1.0,
+        snapshot_days=730,
+        batch_size=1000,
+        clock=lambda: datetime.now(timezone.utc),
+    ):
+        self.db = db
+        self.keep_latest = max(1, keep_latest)
+        self.cost_tolerance = cost_tolerance
+        self.snapshot_days = snapshot_days
+        self.batch_size = batch_size
+        self.clock = clock
+        self._deletes = []
+        self._snapshots = []
+
+    def run(self):
+        totals = {"vehicles": 0, "scanned": 0, "deduplicated": 0, "downsampled": 0, "expired": 0, "snapshots": 0}
+        # The TTL index only covers {"snapshot": False}; records stored before the
+        # flag existed have no field at all and would never expire.
+        totals["backfilled"] = self.db[Prediction.collection].update_many(
+            {"snapshot": {"$exists": False}}, {"$set": {"snapshot": False}}
+        ).modified_count
+        snapshot_cutoff = self.clock() - timedelta(days=self.snapshot_days)
+        cursor = (
+            self.db[Prediction.collection]
+            .find({}, _PROJECTION)
+            .sort([("user_id", 1), ("vehicle_id", 1), ("created_at", -1)])
+            .batch_size(self.batch_size)
+        )
+
+        group = []
+        current = None
+        for doc in cursor:
+            key = (doc.get("user_id"), doc.get("vehicle_id"))
+            if key != current and group:
+                self._compact_vehicle(group, snapshot_cutoff, totals)
+                group = []
+            current = key
+            group.append(doc)
+        if group:
+            self._compact_vehicle(group, snapshot_cutoff, totals)
+        self._flush(force=True)
+
+        for name in ("backfilled", "deduplicated", "downsampled", "expired", "snapshots"):
+            metrics.incr(f"predictions.compaction.{name}", totals[name])
+        return totals
+
+    def _compact_vehicle(self, docs, snapshot_cutoff, totals):
+        totals["vehicles"] += 1
+        totals["scanned"] += len(docs)
+
+        kept = []
+        previous = None
+        for doc in docs:
+            signature = _signature(doc)
+            if previous is not None and _near_identical(previous, signature, self.cost_tolerance):
+                self._deletes.append(doc["_id"])
+                totals["deduplicated"] += 1
+                continue
+            previous = signature
+            kept.append(doc)
+
+        seen_days = set()
+        for position, doc in enumerate(kept):
+            created_at = _as_utc(doc.get("created_at"))
+            day = created_at.date() if created_at else None
+            daily = day is not None and day not in seen_days
+            seen_days.add(day)
+
+            latest = position < self.keep_latest
+            if latest or (daily and created_at >= snapshot_cutoff):
+                if not doc.get("snapshot"):
+                    self._snapshots.append(doc["_id"])
+                    totals["snapshots"] += 1
+            elif daily:
+                self._deletes.append(doc["_id"])
+                totals["expired"] += 1
+            else:
+                self._deletes.append(doc["_id"])
+                totals["downsampled"] += 1
+        self._flush()
+
+    def _flush(self, force=False):
+        collection = self.db[Prediction.collection]
+        while len(self._deletes) >= self.batch_size or (force and self._deletes):
+            chunk, self._deletes = self._deletes[:self.batch_size], self._deletes[self.batch_size:]
+            collection.delete_many({"_id": {"$in": chunk}})
+        while len(self._snapshots) >= self.batch_size or (force and self._snapshots):
+            chunk, self._snapshots = self._snapshots[:self.batch_size], self._snapshots[self.batch_size:]
+            collection.update_many({"_id": {"$in": chunk}}, {"$set": {"snapshot": True}})
+
+
+def build_compactor(app, db):
+    return PredictionCompactor(
+        db,
+        keep_latest=app.config["PREDICTIONS_KEEP_LATEST"],
+        cost_tolerance=app.config["PREDICTIONS_DEDUP_COST_TOLERANCE"],
+        snapshot_days=app.config["PREDICTIONS_SNAPSHOT_RETENTION_DAYS"],
+        batch_size=app.config["PREDICTIONS_COMPACTION_BATCH"],
+    )
+
+
+def collection_size(db):
+    """Return (document count, data size, storage size) of the predictions collection."""
+    stats = db.command("collStats", Prediction.collection)
+    return stats.get("count", 0), stats.get("size", 0), stats.get("storageSize", 0)
@@ -0,0 +1,120 @@
+import logging
+import time
+from datetime import datetime, timezone
+
+from pymongo import UpdateOne
+
+from ..models.maintenance import Maintenance
+from ..models.vehicle import Vehicle
+from ..utils.dates import parse_date
+from ..utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_COLLECTION = "migrations"
+MIGRATION_ID = "string_dates_to_bson"
+DATE_FIELDS = {
+    Maintenance.collection: ("service_date",),
+    Vehicle.collection: ("acquisition_date",),
+}
+
+
+class StringDateMigration:
+    """Rewrites "YYYY-MM-DD" date fields as BSON dates, in _id order, one batch at a time.
+
+    Every batch is one unordered ``bulk_write`` whose filters repeat the strings
+    that were read, so a value the application changed in the meantime is left
+    alone. The last _id of each batch is checkpointed in ``migrations``: a stopped
+    run continues where it left off and a finished one only looks at documents
+    inserted since (``restart`` rescans everything). Values that do not parse
+    as dates are kept and counted as skipped.
+    """
+
+    def __init__(self, db, batch_size=1000, pause_seconds=0.0, fields=None):
+        self.db = db
+        self.batch_size = max(1, batch_size)
+        self.pause_seconds = pause_seconds
+        self.fields = fields or DATE_FIELDS
+
+    def run(self, max_batches=None, restart=False):
+        checkpoints = {} if restart else self._checkpoints()
+        results = {}
+        for collection, fields in self.fields.items():
+            totals = {"scanned": 0, "converted": 0, "skipped": 0, "batches": 0, "complete": False}
+            last_id = (checkpoints.get(collection) or {}).get("last_id")
+            while max_batches is None or max_batches > 0:
+                docs = self._next_batch(collection, fields, last_id)
+                if not docs:
+                    totals["complete"] = True
+                    break
+                converted, skipped = self._convert(collection, fields, docs)
+                last_id = docs[-1]["_id"]
+                self._save_checkpoint(collection, last_id, converted, skipped)
+                totals["scanned"] += len(docs)
+                totals["converted"] += converted
+                totals["skipped"] += skipped
+                totals["batches"] += 1
+                if max_batches is not None:
+                    max_batches -= 1
+                if len(docs) < self.batch_size:
+                    totals["complete"] = True
+                    break
+                if self.pause_seconds:
+                    time.sleep(self.pause_seconds)
+            results[collection] = totals
+            metrics.incr("migrations.string_dates.converted", totals["converted"])
+            metrics.incr("migrations.string_dates.skipped", totals["skipped"])
+        return results
+
+    def _next_batch(self, collection, fields, last_id):
+        query = {"$or": [{field: {"$type": "string"}} for field in fields]}
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        return list(
+            self.db[collection].find(query, dict.fromkeys(fields, 1)).sort("_id", 1).limit(self.batch_size)
+        )
+
+    def _convert(self, collection, fields, docs):
+        """Write one batch; returns (documents converted, values skipped)."""
+        operations = []
+        skipped = 0
+        for doc in docs:
+            original, converted = {}, {}
+            for field in fields:
+                value = doc.get(field)
+                if not isinstance(value, str):
+                    continue
+                parsed = parse_date(value)
+                if parsed is None:
+                    skipped += 1
+                    logger.warning("Keeping unparseable %s.%s on %s: %r", collection, field, doc["_id"], value)
+                    continue
+                original[field] = value
+                converted[field] = parsed
+            if converted:
+                operations.append(UpdateOne({"_id": doc["_id"], **original}, {"$set": converted}))
+        if not operations:
+            return 0, skipped
+        return self.db[collection].bulk_write(operations, ordered=False).modified_count, skipped
+
+    def _checkpoints(self):
+        state = self.db[MIGRATIONS_COLLECTION].find_one({"_id": MIGRATION_ID}) or {}
+        return state.get("collections") or {}
+
+    def _save_checkpoint(self, collection, last_id, converted, skipped):
+        self.db[MIGRATIONS_COLLECTION].update_one(
+            {"_id": MIGRATION_ID},
+            {
+                "$set": {f"collections.{collection}.last_id": last_id, "updated_at": datetime.now(timezone.utc)},
+                "$inc": {f"collections.{collection}.converted": converted, f"collections.{collection}.skipped": skipped},
+            },
+            upsert=True,
+        )
+
+
+def build_date_migration(app, db):
+    return StringDateMigration(
+        db,
+        batch_size=app.config["DATE_MIGRATION_BATCH_SIZE"],
+        pause_seconds=app.config["DATE_MIGRATION_PAUSE_MS"] / 1000,
+    )
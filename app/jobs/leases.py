@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+LEASES_COLLECTION = "scheduler_leases"
+
+
+class LeaseManager:
+    """Time-bounded exclusive leases stored as documents, one per named shard of work."""
+
+    def __init__(self, db, owner, lease_seconds=60, clock=datetime.utcnow):
+        self.db = db
+        self.owner = owner
+        self.lease_seconds = lease_seconds
+        self.clock = clock
+
+    def acquire(self, name):
+        now = self.clock()
+        try:
+            lease = self.db[LEASES_COLLECTION].find_one_and_update(
+                {"_id": name, "$or": [{"owner": self.owner}, {"expires_at": {"$lt": now}}]},
+                {"$set": {"owner": self.owner, "expires_at": now + timedelta(seconds=self.lease_seconds)}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        except DuplicateKeyError:
+            # Another owner holds an unexpired lease, so the upsert collided with it.
+            return False
+        return bool(lease and lease.get("owner") == self.owner)
+
+    def hold(self, name, until):
+        """Keep an owned lease until at least ``until``; it is never shortened."""
+        self.db[LEASES_COLLECTION].update_one(
+            {"_id": name, "owner": self.owner},
+            {"$max": {"expires_at": until}},
+        )
+
+    def release(self, name):
+        self.db[LEASES_COLLECTION].update_one(
+            {"_id": name, "owner": self.owner},
+            {"$set": {"expires_at": self.clock()}},
+        )
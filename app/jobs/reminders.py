@@ -0,0 +1,173 @@
+import logging
+import os
+import socket
+import threading
+from datetime import datetime, timedelta
+
+from pymongo import UpdateOne
+
+from ..models.vehicle import SHARD_SPACE, Vehicle
+from ..utils.db import get_db
+from ..utils.metrics import metrics
+from .leases import LeaseManager
+
+logger = logging.getLogger(__name__)
+
+REMINDERS_COLLECTION = "reminders"
+REMINDER_INDEXES = [
+    ([("dedup_key", 1)], {"unique": True}),
+    ([("user_id", 1), ("created_at", -1)], {}),
+]
+
+
+def _shard_bounds(shard, shard_count):
+    return shard * SHARD_SPACE // shard_count, (shard + 1) * SHARD_SPACE // shard_count
+
+
+def _reminder_operation(vehicle, now):
+    due_date = vehicle.get("next_due_date")
+    due_km = vehicle.get("next_due_km")
+    vehicle_id = str(vehicle["_id"])
+    # One reminder per vehicle and due target; rescans upsert onto the same key.
+    dedup_key = f"{vehicle_id}:{due_date.date().isoformat() if due_date else '-'}:{due_km if due_km is not None else '-'}"
+    return UpdateOne(
+        {"dedup_key": dedup_key},
+        {
+            "$setOnInsert": {
+                "dedup_key": dedup_key,
+                "user_id": vehicle.get("user_id"),
+                "vehicle_id": vehicle_id,
+                "next_due_date": due_date,
+                "next_due_km": due_km,
+                "next_due_margin_km": vehicle.get("next_due_margin_km"),
+                "status": "pending",
+                "created_at": now,
+            }
+        },
+        upsert=True,
+    )
+
+
+class ReminderScheduler:
+    """Scans vehicles nearing their due date or mileage and records reminders.
+
+    Work is split into ``shard_count`` ranges of the vehicles' ``shard_key``; each
+    range is claimed through a lease so several scheduler instances can run side by
+    side without scanning the same vehicles. A scanned shard's lease is held for
+    the rest of the ``cycle_seconds`` cycle (at least its TTL), so no other
+    instance rescans it before the next cycle; a failed scan releases it.
+    """
+
+    def __init__(
+        self,
+        db,
+        shard_count=1,
+        batch_size=500,
+        horizon_days=30,
+        margin_km=1000,
+        lease_seconds=300,
+        cycle_seconds=0,
+        owner=None,
+        clock=datetime.utcnow,
+    ):
+        self.db = db
+        self.shard_count = max(1, shard_count)
+        self.batch_size = batch_size
+        self.horizon_days = horizon_days
+        self.margin_km = margin_km
+        self.cycle_seconds = cycle_seconds
+        self.clock = clock
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+        self.leases = LeaseManager(db, self.owner, lease_seconds=lease_seconds, clock=clock)
+
+    def run_once(self):
+        totals = {"shards": 0, "scanned": 0, "created": 0}
+        cycle_ends = self.clock() + timedelta(seconds=self.cycle_seconds)
+        for shard in range(self.shard_count):
+            lease_name = f"reminders:{self.shard_count}:{shard}"
+            if not self.leases.acquire(lease_name):
+                continue
+            try:
+                scanned, created = self.scan_shard(shard)
+            except Exception:
+                self.leases.release(lease_name)
+                raise
+            self.leases.hold(lease_name, cycle_ends)
+            totals["shards"] += 1
+            totals["scanned"] += scanned
+            totals["created"] += created
+        return totals
+
+    def scan_shard(self, shard):
+        now = self.clock()
+        low, high = _shard_bounds(shard, self.shard_count)
+        cursor = (
+            self.db[Vehicle.collection]
+            .find(
+                {
+                    "shard_key": {"$gte": low, "$lt": high},
+                    "$or": [
+                        {"next_due_date": {"$lte": now + timedelta(days=self.horizon_days)}},
+                        {"next_due_margin_km": {"$lte": self.margin_km}},
+                    ],
+                },
+                {"user_id": 1, "next_due_date": 1, "next_due_km": 1, "next_due_margin_km": 1},
+            )
+            .batch_size(self.batch_size)
+        )
+
+        scanned = 0
+        created = 0
+        batch = []
+        for vehicle in cursor:
+            batch.append(_reminder_operation(vehicle, now))
+            if len(batch) >= self.batch_size:
+                created += self._flush(batch)
+                scanned += len(batch)
+                batch = []
+        if batch:
+            created += self._flush(batch)
+            scanned += len(batch)
+
+        metrics.incr("reminders.scanned", scanned)
+        metrics.incr("reminders.created", created)
+        return scanned, created
+
+    def _flush(self, operations):
+        result = self.db[REMINDERS_COLLECTION].bulk_write(operations, ordered=False)
+        return result.upserted_count
+
+    def run_forever(self, interval_seconds, stop_event):
+        Vehicle.assign_missing_shard_keys(self.db)
+        while not stop_event.is_set():
+            try:
+                totals = self.run_once()
+                logger.info("Reminder scan finished: %s", totals)
+            except Exception:
+                logger.exception("Reminder scan failed")
+            stop_event.wait(interval_seconds)
+
+
+def build_scheduler(app, db):
+    return ReminderScheduler(
+        db,
+        shard_count=app.config["REMINDER_SHARDS"],
+        batch_size=app.config["REMINDER_BATCH_SIZE"],
+        horizon_days=app.config["REMINDER_HORIZON_DAYS"],
+        margin_km=app.config["REMINDER_MARGIN_KM"],
+        lease_seconds=app.config["REMINDER_LEASE_SECONDS"],
+        cycle_seconds=app.config["REMINDER_INTERVAL_SECONDS"],
+    )
+
+
+def start_reminder_thread(app):
+    """Run the scheduler in a daemon thread of this process (REMINDERS_IN_PROCESS)."""
+    stop_event = threading.Event()
+
+    def target():
+        with app.app_context():
+            build_scheduler(app, get_db()).run_forever(app.config["REMINDER_INTERVAL_SECONDS"], stop_event)
+
+    thread = threading.Thread(target=target, name="reminder-scheduler", daemon=True)
+    thread.start()
+    return stop_event
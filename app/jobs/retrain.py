@@ -0,0 +1,321 @@
+import json
+import logging
+import math
+import multiprocessing
+import os
+import secrets
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from ..ml_model import data_cache
+from ..ml_model.predict import (
+    CURRENT_POINTER,
+    MODEL_FILES,
+    _load_model,
+    configure_inference,
+    configure_model_store,
+)
+from ..ml_model.train_model import (
+    COST_CATEGORICAL_COLS,
+    COST_DATA_PATH,
+    INTERVAL_CATEGORICAL_COLS,
+    INTERVAL_DATA_PATH,
+    train,
+)
+from ..ml_model.tuning import tune
+from ..models.due import refresh_all_due_fields
+from ..utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+LOCK_FILE = "retrain.lock"
+VALIDATION_ROWS = 5
+TRAINERS = {"train": train, "tune": tune}
+TRAINING_SOURCES = {
+    "cost": (COST_DATA_PATH, COST_CATEGORICAL_COLS, "cost_regressor"),
+    "interval": (INTERVAL_DATA_PATH, INTERVAL_CATEGORICAL_COLS, "interval_optimizer"),
+}
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _write_json(path, payload):
+    # Readers in other workers only ever see a complete file.
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(payload, indent=2, default=str), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _read_json(path):
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _train_process(output_dir, result_path, mode="train", options=None):
+    """Entry point of the spawned training process; mode picks train() or tune()."""
+    try:
+        result = TRAINERS[mode](output_dir, **(options or {}))
+    except Exception as exc:  # pragma: no cover - reported through the job status
+        result = {"status": "error", "message": str(exc)}
+    _write_json(Path(result_path), result)
+
+
+class ModelRegistry:
+    """Versioned model artifacts on disk.
+
+    ``versions/<version>/`` holds the bundles and a manifest of one training run and
+    is never modified after promotion; ``CURRENT`` names the served version and is
+    replaced atomically. Job status files live under ``jobs/``.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.versions_dir = self.root / "versions"
+        self.jobs_dir = self.root / "jobs"
+
+    def ensure_layout(self):
+        self.versions_dir.mkdir(parents=True, exist_ok=True)
+        self.jobs_dir.mkdir(parents=True, exist_ok=True)
+
+    def current_version(self):
+        try:
+            return (self.root / CURRENT_POINTER).read_text(encoding="utf-8").strip() or None
+        except OSError:
+            return None
+
+    def manifest(self, version):
+        if not version:
+            return None
+        return _read_json(self.versions_dir / version / "manifest.json")
+
+    def read_job(self, job_id):
+        if not job_id or not job_id.replace("-", "").isalnum():
+            return None
+        return _read_json(self.jobs_dir / f"{job_id}.json")
+
+    def write_job(self, job):
+        job["updated_at"] = _now()
+        _write_json(self.jobs_dir / f"{job['job_id']}.json", job)
+
+    def acquire_lock(self, job_id, stale_seconds):
+        path = self.root / LOCK_FILE
+        for _ in range(2):
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                try:
+                    if time.time() - path.stat().st_mtime < stale_seconds:
+                        return False
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+                continue
+            with os.fdopen(fd, "w") as f:
+                f.write(job_id)
+            return True
+        return False
+
+    def release_lock(self):
+        try:
+            (self.root / LOCK_FILE).unlink()
+        except FileNotFoundError:
+            pass
+
+    def promote(self, staging_dir, version, manifest):
+        target = self.versions_dir / version
+        _write_json(staging_dir / "manifest.json", manifest)
+        staging_dir.rename(target)
+        tmp = self.root / f".{CURRENT_POINTER}.{os.getpid()}.tmp"
+        tmp.write_text(version, encoding="utf-8")
+        os.replace(tmp, self.root / CURRENT_POINTER)
+        return target
+
+    def prune(self, keep):
+        current = self.current_version()
+        versions = sorted(
+            (p for p in self.versions_dir.iterdir() if p.is_dir() and not p.name.startswith(".")),
+            key=lambda p: p.name,
+            reverse=True,
+        )
+        removed = []
+        for path in versions[max(1, keep):]:
+            if path.name != current:
+                shutil.rmtree(path, ignore_errors=True)
+                removed.append(path.name)
+        return removed
+
+
+def validate_artifacts(directory, results, current_manifest, max_mae_ratio):
+    """Return a list of problems that block promoting the bundles in directory."""
+    errors = []
+    current_mae = {}
+    for item in (current_manifest or {}).get("results", []):
+        current_mae[item.get("model")] = item.get("mae")
+    new_mae = {item.get("model"): item.get("mae") for item in results}
+
+    for name, filename in MODEL_FILES.items():
+        source, categorical_cols, model_key = TRAINING_SOURCES[name]
+        bundle = _load_model(directory / filename)
+        if not bundle or bundle.get("model") is None:
+            errors.append(f"{filename} could not be loaded")
+            continue
+        columns = bundle.get("categorical_cols", []) + bundle.get("numeric_cols", [])
+        try:
+            frame = data_cache.load_frame(source, categorical_cols)[columns].head(VALIDATION_ROWS)
+            predictions = [float(value) for value in bundle["model"].predict(frame)]
+        except Exception as exc:
+            errors.append(f"{filename} failed to predict: {exc}")
+            continue
+        if not all(math.isfinite(value) for value in predictions):
+            errors.append(f"{filename} produced non-finite predictions")
+
+        previous, candidate = current_mae.get(model_key), new_mae.get(model_key)
+        if previous and candidate is not None and candidate > previous * max_mae_ratio:
+            errors.append(f"{model_key} MAE {candidate} exceeds {max_mae_ratio}x the current {previous}")
+    return errors
+
+
+class RetrainManager:
+    """Runs ``train()`` or ``tune()`` in a spawned process and promotes the result when it validates."""
+
+    def __init__(self, registry, timeout_seconds=1800, keep_versions=5, max_mae_ratio=1.25,
+                 tuning_n_jobs=2, on_promoted=None):
+        self.registry = registry
+        self.timeout_seconds = timeout_seconds
+        self.keep_versions = keep_versions
+        self.max_mae_ratio = max_mae_ratio
+        self.tuning_n_jobs = tuning_n_jobs
+        # Called with the promoted version; returns fields to record on the job.
+        self.on_promoted = on_promoted
+
+    def start(self, requested_by=None, mode="train", background=True):
+        """Start a retraining job; returns its status, or None if one is already running.
+
+        ``mode`` is a key of TRAINERS. With background=False the job runs in the
+        calling thread and its final status is returned.
+        """
+        self.registry.ensure_layout()
+        version = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}-{secrets.token_hex(2)}"
+        if not self.registry.acquire_lock(version, self.timeout_seconds):
+            return None
+        job = {
+            "job_id": version,
+            "mode": mode,
+            "status": "queued",
+            "requested_by": requested_by,
+            "created_at": _now(),
+            "base_version": self.registry.current_version(),
+        }
+        self.registry.write_job(job)
+        if not background:
+            return self._run(job)
+        snapshot = dict(job)
+        threading.Thread(target=self._run, args=(job,), name="model-retrain", daemon=True).start()
+        return snapshot
+
+    def _run(self, job):
+        staging = self.registry.versions_dir / f".staging-{job['job_id']}"
+        result_path = self.registry.jobs_dir / f"{job['job_id']}.result.json"
+        started = time.perf_counter()
+        try:
+            self._update(job, status="training")
+            # A spawned interpreter keeps training's CPU and memory out of this
+            # worker and does not inherit its threads or Mongo connections.
+            process = multiprocessing.get_context("spawn").Process(
+                target=_train_process,
+                args=(str(staging), str(result_path), job["mode"], self._trainer_options(job["mode"])),
+                name="model-train",
+            )
+            process.start()
+            process.join(self.timeout_seconds)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+                return self._update(job, status="failed", errors=["training timed out"])
+
+            result = _read_json(result_path) or {"status": "error", "message": f"exit code {process.exitcode}"}
+            if result.get("status") != "ok":
+                return self._update(job, status="failed", errors=[result.get("message", "training failed")], result=result)
+
+            self._update(job, status="validating", results=result["results"])
+            base_manifest = self.registry.manifest(self.registry.current_version())
+            errors = validate_artifacts(staging, result["results"], base_manifest, self.max_mae_ratio)
+            if errors:
+                return self._update(job, status="rejected", errors=errors)
+
+            manifest = {
+                "version": job["job_id"],
+                "mode": job["mode"],
+                "created_at": _now(),
+                "previous_version": job["base_version"],
+                "training_seconds": round(time.perf_counter() - started, 2),
+                "results": result["results"],
+            }
+            self.registry.promote(staging, job["job_id"], manifest)
+            removed = self.registry.prune(self.keep_versions)
+            metrics.incr("models.promoted")
+            self._update(job, status="promoted", version=job["job_id"], pruned=removed)
+            return self._after_promotion(job)
+        except Exception as exc:
+            logger.exception("Model retraining failed")
+            return self._update(job, status="failed", errors=[str(exc)])
+        finally:
+            metrics.observe("models.retrain_ms", (time.perf_counter() - started) * 1000)
+            shutil.rmtree(staging, ignore_errors=True)
+            try:
+                result_path.unlink()
+            except FileNotFoundError:
+                pass
+            self.registry.release_lock()
+
+    def _trainer_options(self, mode):
+        return {"n_jobs": self.tuning_n_jobs} if mode == "tune" else {}
+
+    def _after_promotion(self, job):
+        # Stored next-due fields were computed by the previous models. The new
+        # version is already served, so a failure here only leaves them stale.
+        if self.on_promoted is None:
+            return job
+        try:
+            return self._update(job, **self.on_promoted(job["version"]))
+        except Exception as exc:
+            logger.exception("Post-promotion refresh failed")
+            return self._update(job, after_promotion_error=str(exc))
+
+    def _update(self, job, **changes):
+        job.update(changes)
+        self.registry.write_job(job)
+        return job
+
+
+def init_model_registry(app):
+    def refresh_due_fields(version):
+        with app.app_context():
+            return {"due_refreshed": refresh_all_due_fields()}
+
+    registry = ModelRegistry(app.config["MODEL_REGISTRY_DIR"])
+    app.extensions["model_retrain"] = RetrainManager(
+        registry,
+        timeout_seconds=app.config["MODEL_RETRAIN_TIMEOUT_SECONDS"],
+        keep_versions=app.config["MODEL_KEEP_VERSIONS"],
+        max_mae_ratio=app.config["MODEL_PROMOTION_MAX_MAE_RATIO"],
+        tuning_n_jobs=app.config["MODEL_TUNING_N_JOBS"],
+        on_promoted=refresh_due_fields,
+    )
+    store = configure_model_store(registry.root)
+    configure_inference(
+        app.config["PREDICT_LATENCY_BUDGET_MS"],
+        app.config["PREDICT_INFERENCE_WORKERS"],
+        app.config["PREDICT_INFERENCE_MAX_QUEUE"],
+    )
+    if app.config["PREDICT_LATENCY_BUDGET_MS"] > 0:
+        # Load in the background so the first budgeted predictions find the models ready.
+        store.warm()
+    return app.extensions["model_retrain"]
@@ -0,0 +1,64 @@
+from datetime import datetime, timezone
+
+from ..models.cost_rollup import ROLLUP_KEYS, CostRollup
+from ..models.maintenance import Maintenance
+from ..utils.dates import mongo_date
+
+
+def rebuild_cost_rollups(db):
+    """Recompute every cost rollup from the maintenance collection on the server.
+
+    Buckets are replaced in place through ``$merge``; buckets the pass did not
+    produce (no records left) are deleted afterwards. Returns (buckets, removed).
+    """
+    started = datetime.now(timezone.utc)
+    db[Maintenance.collection].aggregate(
+        [
+            {
+                "$match": {
+                    "service_date": {"$type": ["string", "date"], "$ne": ""},
+                    "vehicle_id": {"$type": "string"},
+                    "service_type": {"$type": "string"},
+                }
+            },
+            # Read as a date whether stored as a BSON date or a string; values
+            # that do not parse are left out, as CostRollup.apply does.
+            {"$addFields": {"_service_day": mongo_date("service_date")}},
+            {"$match": {"_service_day": {"$ne": None}}},
+            {
+                "$group": {
+                    "_id": {
+                        "user_id": "$user_id",
+                        "vehicle_id": "$vehicle_id",
+                        "month": {"$dateToString": {"format": "%Y-%m", "date": "$_service_day"}},
+                        "service_type": "$service_type",
+                    },
+                    "total_cost": {"$sum": {"$cond": [{"$isNumber": "$cost"}, "$cost", 0]}},
+                    "count": {"$sum": 1},
+                }
+            },
+            {
+                "$project": {
+                    "_id": 0,
+                    "user_id": "$_id.user_id",
+                    "vehicle_id": "$_id.vehicle_id",
+                    "month": "$_id.month",
+                    "service_type": "$_id.service_type",
+                    "total_cost": 1,
+                    "count": 1,
+                    "updated_at": {"$literal": started},
+                }
+            },
+            {
+                "$merge": {
+                    "into": CostRollup.collection,
+                    "on": list(ROLLUP_KEYS),
+                    "whenMatched": "replace",
+                    "whenNotMatched": "insert",
+                }
+            },
+        ],
+        allowDiskUse=True,
+    )
+    removed = db[CostRollup.collection].delete_many({"updated_at": {"$lt": started}}).deleted_count
+    return db[CostRollup.collection].count_documents({}), removed
@@ -0,0 +1,29 @@
+from ..ml_model.predict import ShadowEvaluator, configure_shadow
+from ..utils.db import get_db
+
+SHADOW_COLLECTION = "shadow_predictions"
+SHADOW_INDEXES = [
+    ([("received_at", -1)], {}),
+    ([("candidate_model", 1), ("received_at", -1)], {}),
+]
+
+
+def init_shadow_evaluation(app):
+    candidate_path = app.config["SHADOW_COST_MODEL_PATH"]
+    if not candidate_path:
+        configure_shadow(None)
+        return None
+
+    def sink(records):
+        with app.app_context():
+            get_db()[SHADOW_COLLECTION].insert_many(records, ordered=False)
+
+    evaluator = ShadowEvaluator(
+        candidate_path,
+        sink,
+        sample_rate=app.config["SHADOW_SAMPLE_RATE"],
+        queue_size=app.config["SHADOW_QUEUE_SIZE"],
+        batch_size=app.config["SHADOW_BATCH_SIZE"],
+    )
+    configure_shadow(evaluator)
+    return evaluator
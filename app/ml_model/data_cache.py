@@ -0,0 +1,197 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+try:
+    import numpy as np
+    import pandas as pd
+except Exception:  # pragma: no cover - optional dependency at runtime
+    np = None
+    pd = None
+
+
+CACHE_DIR = Path(__file__).resolve().parents[2] / "data" / ".cache"
+CACHE_FORMAT = 2
+POINTER = "CURRENT"
+
+
+def _source_digest(path):
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _downcast(series):
+    if pd.api.types.is_integer_dtype(series):
+        return pd.to_numeric(series, downcast="integer")
+    if pd.api.types.is_float_dtype(series):
+        narrowed = series.astype("float32")
+        # Only narrow floats that survive the round trip, so targets keep their values.
+        if (narrowed.astype(series.dtype) == series)[series.notna()].all():
+            return narrowed
+    return series
+
+
+def _typed_frame(df, categorical_cols):
+    columns = {}
+    for name in df.columns:
+        if name in categorical_cols or df[name].dtype == object:
+            columns[name] = df[name].astype("category")
+        else:
+            columns[name] = _downcast(df[name])
+    return pd.DataFrame(columns)
+
+
+def _write_cache(cache_dir, df, manifest):
+    # Each build goes to its own version directory (columns, then the manifest
+    # naming them). The CURRENT pointer file is then swapped to it with a single
+    # os.replace, so readers see either the old version or the new one, whole.
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    previous = _current_version(cache_dir)
+    scratch = Path(tempfile.mkdtemp(prefix="v-", dir=cache_dir))
+    columns = []
+    for position, name in enumerate(df.columns):
+        series = df[name]
+        entry = {"name": name, "file": f"{position}.npy"}
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            entry["categories"] = series.cat.categories.tolist()
+            np.save(scratch / entry["file"], series.cat.codes.to_numpy())
+        else:
+            np.save(scratch / entry["file"], series.to_numpy())
+        columns.append(entry)
+    manifest["columns"] = columns
+    manifest["version"] = scratch.name
+    (scratch / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+    pointer = cache_dir / f".{POINTER}-{os.getpid()}"
+    pointer.write_text(scratch.name, encoding="utf-8")
+    os.replace(pointer, cache_dir / POINTER)
+
+    # The version just replaced stays for readers that resolved the pointer
+    # before the swap; older complete versions and pre-pointer files go.
+    keep = {POINTER, scratch.name, previous}
+    for entry in cache_dir.iterdir():
+        if entry.name in keep or entry.name.startswith("."):
+            continue
+        if entry.is_dir():
+            if (entry / "manifest.json").exists():
+                shutil.rmtree(entry, ignore_errors=True)
+        else:
+            entry.unlink(missing_ok=True)
+
+
+def _current_version(cache_dir):
+    try:
+        return (cache_dir / POINTER).read_text(encoding="utf-8").strip() or None
+    except OSError:
+        return None
+
+
+def _read_manifest(cache_dir):
+    version = _current_version(cache_dir)
+    if version is None:
+        return None
+    try:
+        manifest = json.loads((cache_dir / version / "manifest.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("format") == CACHE_FORMAT else None
+
+
+def _load_columns(cache_dir, manifest):
+    version_dir = cache_dir / manifest["version"]
+    columns = {}
+    for entry in manifest["columns"]:
+        values = np.load(version_dir / entry["file"], mmap_mode="r")
+        if "categories" in entry:
+            columns[entry["name"]] = pd.Categorical.from_codes(values, categories=entry["categories"])
+        else:
+            columns[entry["name"]] = pd.Series(values, copy=False)
+    return pd.DataFrame(columns, copy=False)
+
+
+def _is_fresh(manifest, source, categorical_cols):
+    if manifest is None or sorted(manifest.get("categorical_cols", [])) != sorted(categorical_cols):
+        return False
+    stat = source.stat()
+    if manifest["source_size"] == stat.st_size and manifest["source_mtime_ns"] == stat.st_mtime_ns:
+        return True
+    # A touched but unchanged file keeps its cache; only the content hash decides.
+    return manifest["source_size"] == stat.st_size and manifest["source_sha256"] == _source_digest(source)
+
+
+def prepare(source, categorical_cols=(), force=False):
+    """Convert a training CSV into a typed columnar cache; returns (manifest, rebuilt).
+
+    Categorical columns (and any other string column) are stored as category codes,
+    numeric columns are downcast to the narrowest dtype that keeps their values.
+    The cache is keyed by the CSV's SHA-256 and rebuilt only when the source changes.
+    """
+    source = Path(source)
+    cache_dir = CACHE_DIR / source.stem
+    categorical_cols = list(categorical_cols)
+    manifest = _read_manifest(cache_dir)
+    if not force and _is_fresh(manifest, source, categorical_cols):
+        return manifest, False
+
+    started = time.perf_counter()
+    raw = pd.read_csv(source)
+    parse_seconds = time.perf_counter() - started
+    typed = _typed_frame(raw, categorical_cols)
+
+    stat = source.stat()
+    manifest = {
+        "format": CACHE_FORMAT,
+        "source": str(source),
+        "source_sha256": _source_digest(source),
+        "source_size": stat.st_size,
+        "source_mtime_ns": stat.st_mtime_ns,
+        "categorical_cols": categorical_cols,
+        "rows": int(len(typed)),
+        "csv_parse_seconds": round(parse_seconds, 4),
+        "raw_memory_bytes": int(raw.memory_usage(deep=True).sum()),
+        "typed_memory_bytes": int(typed.memory_usage(deep=True).sum()),
+    }
+    _write_cache(cache_dir, typed, manifest)
+    return manifest, True
+
+
+def load_frame(source, categorical_cols=()):
+    """Return the typed DataFrame for a training CSV, building its cache if needed.
+
+    Numeric columns and category codes are memory-mapped from the cache, so
+    loading is proportional to the columns touched rather than the CSV size.
+    """
+    manifest, _ = prepare(source, categorical_cols)
+    return _load_columns(CACHE_DIR / Path(source).stem, manifest)
+
+
+def report(sources):
+    """Prepare each (path, categorical_cols) source and time a cached load against a CSV parse."""
+    results = []
+    for source, categorical_cols in sources:
+        manifest, rebuilt = prepare(source, categorical_cols)
+        started = time.perf_counter()
+        frame = _load_columns(CACHE_DIR / Path(source).stem, manifest)
+        load_seconds = time.perf_counter() - started
+        raw_bytes = manifest["raw_memory_bytes"]
+        typed_bytes = manifest["typed_memory_bytes"]
+        results.append(
+            {
+                "source": Path(source).name,
+                "rows": len(frame),
+                "rebuilt": rebuilt,
+                "csv_parse_seconds": manifest["csv_parse_seconds"],
+                "cache_load_seconds": round(load_seconds, 4),
+                "raw_memory_bytes": raw_bytes,
+                "typed_memory_bytes": typed_bytes,
+                "memory_saved_pct": round(100 * (1 - typed_bytes / raw_bytes), 1) if raw_bytes else 0.0,
+            }
+        )
+    return results
@@ -0,0 +1,225 @@
+from datetime import datetime, timedelta
+
+try:
+    import numpy as np
+except Exception:  # pragma: no cover - optional dependency at runtime
+    np = None
+
+try:
+    import pandas as pd
+except Exception:  # pragma: no cover - optional dependency at runtime
+    pd = None
+
+from .predict import (
+    _average_mileage_monthly,
+    _build_cost_features,
+    _build_interval_features,
+    _safe_float,
+    _safe_int,
+    compute_due_fields,
+    get_model_store,
+)
+from .scenarios import fallback_costs, fallback_intervals
+
+# Timeline service types, the next-due field they start from, and the cost model
+# service type used to price them.
+KM_SERVICES = (
+    ("oil_change", "next_due_oil_change_km", "oil_change"),
+    ("brake_check", "next_due_brake_check_km", "brake_service"),
+    ("tire_rotation", "next_due_tire_rotation_km", "tire_service"),
+)
+GENERAL_CHECK = ("general_check", "minor_service")
+SERVICE_NAMES = [name for name, _, _ in KM_SERVICES] + [GENERAL_CHECK[0]]
+COST_SERVICE_TYPES = [cost for _, _, cost in KM_SERVICES] + [GENERAL_CHECK[1]]
+
+MAX_EVENTS_PER_SERVICE = 400
+DAYS_PER_YEAR = 365.25
+
+
+def _daily_rate(vehicle):
+    telemetry = vehicle.get("telemetry") or {}
+    if telemetry.get("avg_km_daily") is not None:
+        return max(0.0, _safe_float(telemetry["avg_km_daily"]))
+    return max(0.0, _average_mileage_monthly(vehicle) / 30.44)
+
+
+def oil_change_intervals(vehicles, default_interval_km):
+    """Recommended oil-change interval per vehicle from one interval-model call."""
+    features = [_build_interval_features(vehicle) for vehicle in vehicles]
+    bundle = get_model_store().bundle("interval") or {}
+    if bundle.get("model") is not None and pd is not None:
+        estimates = bundle["model"].predict(pd.DataFrame(features))
+        return np.clip(np.round(estimates), 4000, 15000).astype(np.int64)
+    columns = {name: np.array([f[name] for f in features]) for name in features[0]}
+    return fallback_intervals(columns, default_interval_km).astype(np.int64)
+
+
+def _expand(counts):
+    """Row index and per-row ordinal for rows repeated counts[i] times."""
+    rows = np.repeat(np.arange(len(counts)), counts)
+    starts = np.repeat(np.cumsum(counts) - counts, counts)
+    return rows, np.arange(int(counts.sum())) - starts
+
+
+def _km_events(next_km, interval_km, mileage, rate, horizon_days):
+    """Project km-based services; every input is an array over (vehicle, service) rows.
+
+    An overdue service is due today at the current mileage and later events are
+    spaced from there.
+    """
+    anchor = np.maximum(next_km, mileage)
+    reach = mileage + rate * horizon_days
+    counts = np.where(anchor <= reach, np.floor((reach - anchor) / interval_km) + 1, 0)
+    counts = np.clip(counts, 0, MAX_EVENTS_PER_SERVICE).astype(np.int64)
+
+    rows, ordinal = _expand(counts)
+    due_km = anchor[rows] + ordinal * interval_km[rows]
+    driven = due_km - mileage[rows]
+    days = np.divide(driven, rate[rows], out=np.zeros_like(driven, dtype=float), where=rate[rows] > 0)
+    overdue = (next_km[rows] < mileage[rows]) & (ordinal == 0)
+    return rows, due_km, days, overdue
+
+
+def _date_events(next_days, interval_days, mileage, rate, horizon_days):
+    """Project the date-based general check; next_days is days from now to its next due date."""
+    anchor = np.maximum(next_days, 0)
+    counts = np.where(anchor <= horizon_days, np.floor((horizon_days - anchor) / interval_days) + 1, 0)
+    counts = np.clip(counts, 0, MAX_EVENTS_PER_SERVICE).astype(np.int64)
+
+    rows, ordinal = _expand(counts)
+    days = anchor[rows] + ordinal * interval_days
+    due_km = mileage[rows] + rate[rows] * days
+    overdue = (next_days[rows] < 0) & (ordinal == 0)
+    return rows, due_km, days, overdue
+
+
+def _event_costs(vehicles, vehicle_rows, service_codes, due_km, years_ahead, cost_bases):
+    # Columns keep the cost model's training order; per-vehicle values are gathered by row.
+    columns = {name: np.array([base[name] for base in cost_bases])[vehicle_rows] for name in cost_bases[0]}
+    columns["service_type"] = np.array(COST_SERVICE_TYPES, dtype=object)[service_codes]
+    columns["current_mileage"] = np.round(due_km).astype(np.int64)
+    columns["vehicle_age"] = columns["vehicle_age"] + years_ahead
+
+    bundle = get_model_store().bundle("cost") or {}
+    if bundle.get("model") is not None and pd is not None:
+        if not len(vehicle_rows):
+            return np.zeros(0), bundle.get("model_name", "trained_regressor")
+        estimates = bundle["model"].predict(pd.DataFrame(columns))
+        return np.round(np.maximum(estimates, 500.0), 2), bundle.get("model_name", "trained_regressor")
+
+    usage_types = np.array([vehicle.get("usage_type") for vehicle in vehicles], dtype=object)[vehicle_rows]
+    conditions = np.array([vehicle.get("driving_conditions") for vehicle in vehicles], dtype=object)[vehicle_rows]
+    costs = fallback_costs(
+        columns["service_type"],
+        columns["current_mileage"],
+        columns["vehicle_age"],
+        columns["historical_avg_cost"],
+        usage_types,
+        conditions,
+    )
+    return costs, "rule_based_fallback"
+
+
+def forecast_timeline(items, intervals, horizon_days, now=None):
+    """Project every service type's due events over horizon_days for many vehicles at once.
+
+    ``items`` is a list of (vehicle, history) pairs with history newest first. Due
+    events start from the same next-due values as compute_due_fields and repeat at
+    each service's interval, converted between km and dates with the vehicle's
+    daily mileage rate. All events are priced with one cost-model call.
+    """
+    now = now or datetime.utcnow()
+    if not items:
+        return {"vehicles": [], "cost_model": None, "totals": {"events": 0, "estimated_cost_mxn": 0.0, "by_year": {}}}
+
+    vehicles = [vehicle for vehicle, _ in items]
+    oil_intervals = oil_change_intervals(vehicles, int(intervals.get("oil_change_km", 10000)))
+    brake_km = int(intervals.get("brake_check_km", 30000))
+    tire_km = int(intervals.get("tire_rotation_km", 12000))
+    check_days = int(intervals.get("general_check_days", 180))
+
+    count = len(items)
+    mileage = np.empty(count)
+    rate = np.empty(count)
+    next_km = np.empty((count, len(KM_SERVICES)))
+    next_check_days = np.empty(count)
+    cost_bases = []
+    for i, (vehicle, history) in enumerate(items):
+        due = compute_due_fields(vehicle, history, intervals, now=now, oil_interval_km=int(oil_intervals[i]))
+        mileage[i] = _safe_int(vehicle.get("current_mileage", vehicle.get("mileage", 0)))
+        rate[i] = _daily_rate(vehicle)
+        next_km[i] = [due[field] for _, field, _ in KM_SERVICES]
+        next_check_days[i] = (due["next_due_general_check_date"] - now) / timedelta(days=1)
+        cost_bases.append(_build_cost_features(vehicle, history, "oil_change"))
+
+    interval_km = np.column_stack([oil_intervals, np.full(count, brake_km), np.full(count, tire_km)])
+    km_rows, km_due, km_days, km_overdue = _km_events(
+        next_km.ravel(),
+        interval_km.ravel().astype(float),
+        np.repeat(mileage, len(KM_SERVICES)),
+        np.repeat(rate, len(KM_SERVICES)),
+        horizon_days,
+    )
+    check_rows, check_due, check_days_ahead, check_overdue = _date_events(
+        next_check_days, check_days, mileage, rate, horizon_days
+    )
+
+    vehicle_rows = np.concatenate([km_rows // len(KM_SERVICES), check_rows])
+    service_codes = np.concatenate([km_rows % len(KM_SERVICES), np.full(len(check_rows), len(KM_SERVICES))])
+    due_km = np.concatenate([km_due, check_due])
+    days_ahead = np.concatenate([km_days, check_days_ahead])
+    overdue = np.concatenate([km_overdue, check_overdue])
+
+    costs, cost_model = _event_costs(
+        vehicles,
+        vehicle_rows, service_codes, due_km, np.floor(days_ahead / DAYS_PER_YEAR).astype(np.int64), cost_bases
+    )
+
+    due_dates = np.datetime64(now, "s") + np.round(days_ahead * 86400).astype("timedelta64[s]")
+    order = np.lexsort((service_codes, due_dates, vehicle_rows))
+    date_strings = np.datetime_as_string(due_dates[order], unit="D").tolist()
+    years = [value[:4] for value in date_strings]
+
+    timelines = [
+        {
+            "vehicle_id": str(vehicle.get("_id") or vehicle.get("id")),
+            "mileage_rate_km_daily": round(float(rate[i]), 2),
+            "events": [],
+            "estimated_cost_mxn": 0.0,
+        }
+        for i, vehicle in enumerate(vehicles)
+    ]
+    by_year = {}
+    for position, (row, code, km, cost, late) in enumerate(
+        zip(
+            vehicle_rows[order].tolist(),
+            service_codes[order].tolist(),
+            np.round(due_km[order]).astype(np.int64).tolist(),
+            costs[order].tolist(),
+            overdue[order].tolist(),
+        )
+    ):
+        timeline = timelines[row]
+        timeline["events"].append(
+            {
+                "service_type": SERVICE_NAMES[code],
+                "due_date": date_strings[position],
+                "due_km": km,
+                "overdue": late,
+                "estimated_cost_mxn": cost,
+            }
+        )
+        timeline["estimated_cost_mxn"] += cost
+        by_year[years[position]] = by_year.get(years[position], 0.0) + cost
+
+    for timeline in timelines:
+        timeline["estimated_cost_mxn"] = round(timeline["estimated_cost_mxn"], 2)
+    return {
+        "vehicles": timelines,
+        "cost_model": cost_model,
+        "totals": {
+            "events": int(len(order)),
+            "estimated_cost_mxn": round(float(costs.sum()), 2),
+            "by_year": {year: round(total, 2) for year, total in sorted(by_year.items())},
+        },
+    }
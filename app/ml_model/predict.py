@@ -1,5 +1,13 @@
 import json
-from datetime import datetime, timedelta
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 try:
@@ -12,10 +20,22 @@ try:
 except Exception:  # pragma: no cover - optional dependency at runtime
     pd = None
 
+from ..utils.dates import parse_date
+from ..utils.metrics import metrics
+
 
 DEFAULT_INTERVALS = {
     "oil_change_km": 10000,
     "general_check_days": 180,
+    "brake_check_km": 30000,
+    "tire_rotation_km": 12000,
+}
+
+# Maintenance service types that reset each km-based interval.
+DUE_SERVICE_TYPES = {
+    "oil_change": {"oil_change"},
+    "brake_check": {"brake_check", "brake_service"},
+    "tire_rotation": {"tire_rotation", "tire_service"},
 }
 
 DEFAULT_SERVICE_COSTS_MXN = {
@@ -29,6 +49,15 @@ DEFAULT_SERVICE_COSTS_MXN = {
 COST_MODEL_PATH = Path(__file__).resolve().with_name("cost_model.pkl")
 INTERVAL_MODEL_PATH = Path(__file__).resolve().with_name("interval_model.pkl")
 
+MODEL_FILES = {"cost": COST_MODEL_PATH.name, "interval": INTERVAL_MODEL_PATH.name}
+CURRENT_POINTER = "CURRENT"
+# model_used of results answered by the rules because the model missed its deadline.
+DEADLINE_FALLBACK = "rule_based_deadline_fallback"
+
+logger = logging.getLogger(__name__)
+
+_shadow_evaluator = None
+
 
 def load_intervals():
     data_file = Path(__file__).resolve().parents[2] / "data" / "maintenance_intervals.json"
@@ -49,6 +78,180 @@ def _load_model(path):
         return None
 
 
+class ModelStore:
+    """Process-wide cache of the model bundles served for predictions.
+
+    With a registry directory, bundles come from ``versions/<version>`` named by the
+    ``CURRENT`` pointer file. Promotion replaces that file atomically, and version
+    directories are never modified, so a pointer change is seen on the next call
+    and both bundles of the new version are loaded before they replace the old
+    ones. Without a registry (or before the first promotion) the bundles shipped
+    next to this module are used.
+
+    Callers with a deadline never wait past it for a load: the load continues in a
+    background thread and, until it finishes, the previously loaded bundles (or
+    None on a cold start) are returned.
+    """
+
+    def __init__(self, registry_dir=None):
+        self.registry_dir = Path(registry_dir) if registry_dir else None
+        self._lock = threading.Lock()
+        self._loader = None
+        self._pid = os.getpid()
+        self._signature = None
+        self._state = {"version": None, "bundles": {}}
+
+    def _pointer_signature(self):
+        if self.registry_dir is not None:
+            try:
+                stat = (self.registry_dir / CURRENT_POINTER).stat()
+                return ("registry", stat.st_mtime_ns, stat.st_ino)
+            except OSError:
+                pass
+        signature = ["builtin"]
+        for path in (COST_MODEL_PATH, INTERVAL_MODEL_PATH):
+            try:
+                signature.append(path.stat().st_mtime_ns)
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def _load(self, signature):
+        if signature[0] == "registry":
+            version = (self.registry_dir / CURRENT_POINTER).read_text(encoding="utf-8").strip()
+            base = self.registry_dir / "versions" / version
+        else:
+            version, base = None, COST_MODEL_PATH.parent
+        bundles = {name: _load_model(base / filename) for name, filename in MODEL_FILES.items()}
+        return {"version": version, "bundles": bundles}
+
+    def _refresh(self):
+        signature = self._pointer_signature()
+        if signature == self._signature:
+            return self._state
+        with self._lock:
+            if signature != self._signature:
+                self._state = self._load(signature)
+                self._signature = signature
+                metrics.incr("models.reloads")
+                logger.info("Loaded model bundles (version %s)", self._state["version"] or "builtin")
+        return self._state
+
+    def warm(self):
+        """Start loading the current bundles in a background thread; returns the thread."""
+        if self._pid != os.getpid():
+            # A lock or loader thread inherited across fork is unusable in the child.
+            self._lock = threading.Lock()
+            self._loader = None
+            self._pid = os.getpid()
+        loader = self._loader
+        if loader is None or not loader.is_alive():
+            loader = threading.Thread(target=self._refresh, name="model-warmup", daemon=True)
+            self._loader = loader
+            loader.start()
+        return loader
+
+    def bundle(self, name, deadline=None):
+        """Return a loaded bundle; with a time.monotonic() deadline, wait for a load only until then."""
+        if deadline is None:
+            return self._refresh()["bundles"].get(name)
+        if self._pointer_signature() != self._signature:
+            self.warm().join(max(0.0, deadline - time.monotonic()))
+        return self._state["bundles"].get(name)
+
+    def loading(self):
+        loader = self._loader
+        return loader is not None and loader.is_alive()
+
+    def current_version(self):
+        return self._refresh()["version"]
+
+
+_model_store = ModelStore()
+
+
+def configure_model_store(registry_dir):
+    """Serve predictions from the promoted version in registry_dir (None: shipped bundles)."""
+    global _model_store
+    _model_store = ModelStore(registry_dir)
+    return _model_store
+
+
+def get_model_store():
+    return _model_store
+
+
+_inference = {"budget_ms": 0, "workers": 2, "max_queue": 2, "pool": None, "slots": None, "pid": None}
+_inference_lock = threading.Lock()
+
+
+def configure_inference(budget_ms, workers=2, max_queue=2):
+    """Set the latency budget of request-path predictions (0 disables it).
+
+    At most workers + max_queue budgeted calls are running or waiting on the
+    inference pool; further calls get the fallback right away.
+    """
+    with _inference_lock:
+        _inference["budget_ms"] = max(0, budget_ms)
+        _inference["workers"] = max(1, workers)
+        _inference["max_queue"] = max(0, max_queue)
+        if _inference["pool"] is not None and _inference["pid"] == os.getpid():
+            _inference["pool"].shutdown(wait=False, cancel_futures=True)
+        _inference["pool"] = None
+
+
+def inference_deadline(budget_ms=None):
+    """time.monotonic() deadline for one request's model calls, or None without a budget."""
+    budget_ms = _inference["budget_ms"] if budget_ms is None else budget_ms
+    return time.monotonic() + budget_ms / 1000 if budget_ms > 0 else None
+
+
+def _inference_pool():
+    """(pool, slots) of this process; slots bounds the calls running or queued on pool."""
+    pool = _inference["pool"]
+    if pool is not None and _inference["pid"] == os.getpid():
+        return pool, _inference["slots"]
+    with _inference_lock:
+        if _inference["pool"] is None or _inference["pid"] != os.getpid():
+            _inference["pool"] = ThreadPoolExecutor(_inference["workers"], thread_name_prefix="inference")
+            _inference["slots"] = threading.BoundedSemaphore(_inference["workers"] + _inference["max_queue"])
+            _inference["pid"] = os.getpid()
+        return _inference["pool"], _inference["slots"]
+
+
+def _predict_one(model, features, deadline):
+    """model's prediction for one feature row, or None if it is not ready by deadline.
+
+    A call that misses the deadline is cancelled if it has not started; one
+    already running finishes on the pool and holds its slot until then. When
+    every slot is taken the call is not queued at all.
+    """
+    frame = pd.DataFrame([features])
+    if deadline is None:
+        return float(model.predict(frame)[0])
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        return None
+    pool, slots = _inference_pool()
+    if not slots.acquire(blocking=False):
+        metrics.incr("predict.inference_pool_full")
+        return None
+    future = pool.submit(model.predict, frame)
+    future.add_done_callback(lambda _: slots.release())
+    try:
+        return float(future.result(timeout=remaining)[0])
+    except FutureTimeoutError:
+        future.cancel()
+        return None
+
+
+def _record_budget(kind, missed_stage=None):
+    # The summary's avg is the share of budgeted calls answered by the fallback.
+    metrics.observe(f"predict.{kind}.budget_exceeded", 1 if missed_stage else 0)
+    if missed_stage:
+        metrics.incr(f"predict.{kind}.budget_exceeded.{missed_stage}")
+
+
 def _safe_float(value, default=0.0):
     try:
         return float(value)
@@ -71,6 +274,13 @@ def _history_avg_cost(history):
     return sum(costs) / len(costs)
 
 
+def _average_mileage_monthly(vehicle):
+    telemetry = vehicle.get("telemetry") or {}
+    if telemetry.get("avg_km_monthly") is not None:
+        return _safe_int(round(_safe_float(telemetry["avg_km_monthly"])))
+    return _safe_int(vehicle.get("average_mileage_monthly", 0))
+
+
 def _build_cost_features(vehicle, history, service_type):
     current_year = datetime.utcnow().year
     vehicle_year = _safe_int(vehicle.get("year"), default=current_year)
@@ -84,7 +294,7 @@ def _build_cost_features(vehicle, history, service_type):
         "transmission": vehicle.get("transmission") or "unknown",
         "vehicle_type": vehicle.get("vehicle_type") or "unknown",
         "current_mileage": _safe_int(vehicle.get("current_mileage", vehicle.get("mileage", 0))),
-        "average_mileage_monthly": _safe_int(vehicle.get("average_mileage_monthly", 0)),
+        "average_mileage_monthly": _average_mileage_monthly(vehicle),
         "cylinders": _safe_int(vehicle.get("cylinders", 0)),
         "vehicle_age": vehicle_age,
         "historical_avg_cost": _history_avg_cost(history),
@@ -98,26 +308,41 @@ def _build_interval_features(vehicle):
         "fuel_type": vehicle.get("fuel_type") or "gasolina",
         "vehicle_type": vehicle.get("vehicle_type") or "sedan",
         "current_mileage": _safe_int(vehicle.get("current_mileage", vehicle.get("mileage", 0))),
-        "average_mileage_monthly": _safe_int(vehicle.get("average_mileage_monthly", 0)),
+        "average_mileage_monthly": _average_mileage_monthly(vehicle),
         "engine_hours": _safe_int(vehicle.get("engine_hours", 0)),
     }
 
 
-def estimate_next_maintenance_cost(vehicle, history, service_type="major_service"):
+def estimate_next_maintenance_cost(vehicle, history, service_type="major_service", deadline=None):
+    """Cost estimate for the next service.
+
+    With a time.monotonic() deadline, a model that is still loading or does not
+    predict in time is skipped: the rule-based estimate is returned with
+    ``model_used`` set to DEADLINE_FALLBACK.
+    """
     service_type = service_type or "major_service"
     features = _build_cost_features(vehicle, history, service_type)
-    model_bundle = _load_model(COST_MODEL_PATH)
+    model_bundle = _model_store.bundle("cost", deadline=deadline)
+    fallback_used = "rule_based_fallback"
 
-    if model_bundle and pd is not None:
+    if deadline is not None and not model_bundle and _model_store.loading():
+        _record_budget("cost", "load")
+        fallback_used = DEADLINE_FALLBACK
+    elif model_bundle and pd is not None:
         model = model_bundle.get("model")
         if model is not None:
-            frame = pd.DataFrame([features])
-            estimate = float(model.predict(frame)[0])
-            return {
-                "estimated_cost_mxn": round(max(estimate, 500.0), 2),
-                "service_type": service_type,
-                "model_used": model_bundle.get("model_name", "trained_regressor"),
-            }
+            estimate = _predict_one(model, features, deadline)
+            if deadline is not None:
+                _record_budget("cost", "inference" if estimate is None else None)
+            if estimate is not None:
+                result = {
+                    "estimated_cost_mxn": round(max(estimate, 500.0), 2),
+                    "service_type": service_type,
+                    "model_used": model_bundle.get("model_name", "trained_regressor"),
+                }
+                _submit_shadow(features, result)
+                return result
+            fallback_used = DEADLINE_FALLBACK
 
     base_cost = DEFAULT_SERVICE_COSTS_MXN.get(service_type, DEFAULT_SERVICE_COSTS_MXN["major_service"])
     mileage_factor = 1 + min(features["current_mileage"], 300000) / 300000
@@ -128,31 +353,144 @@ def estimate_next_maintenance_cost(vehicle, history, service_type="major_service
     blended_base = base_cost if historical <= 0 else (0.7 * base_cost + 0.3 * historical)
     estimate = blended_base * mileage_factor * age_factor * usage_factor
 
-    return {
+    result = {
         "estimated_cost_mxn": round(estimate, 2),
         "service_type": service_type,
-        "model_used": "rule_based_fallback",
+        "model_used": fallback_used,
     }
-
-
-def optimize_oil_change_interval(vehicle, default_interval_km=10000):
+    return result
+
+
+class ShadowEvaluator:
+    """Runs a candidate cost model on sampled production inputs in a background thread.
+
+    ``submit`` never blocks the caller: inputs are sampled, queued without waiting and
+    dropped when the queue is full. The worker predicts queued inputs in batches and
+    hands the records, including the delta against the primary estimate, to ``sink``.
+    """
+
+    def __init__(self, candidate_path, sink, sample_rate=0.1, queue_size=1000, batch_size=64):
+        self.candidate_path = Path(candidate_path)
+        self.sink = sink
+        self.sample_rate = sample_rate
+        self.batch_size = batch_size
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._worker_pid = None
+        self._bundle = None
+
+    def submit(self, features, primary_result):
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return False
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait((features, primary_result, datetime.now(timezone.utc)))
+        except queue.Full:
+            metrics.incr("shadow.dropped")
+            return False
+        metrics.incr("shadow.enqueued")
+        return True
+
+    def _ensure_worker(self):
+        # The worker thread does not survive a fork, so start one per process.
+        if self._worker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker_pid != os.getpid():
+                self._queue = queue.Queue(maxsize=self._queue.maxsize)
+                threading.Thread(target=self._run, name="shadow-evaluator", daemon=True).start()
+                self._worker_pid = os.getpid()
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                self._evaluate(batch)
+            except Exception:
+                logger.exception("Shadow evaluation failed")
+                metrics.incr("shadow.errors")
+
+    def _evaluate(self, batch):
+        if self._bundle is None:
+            self._bundle = _load_model(self.candidate_path) or {}
+        model = self._bundle.get("model")
+        if model is None or pd is None:
+            metrics.incr("shadow.skipped", len(batch))
+            return
+
+        started = time.perf_counter()
+        estimates = model.predict(pd.DataFrame([features for features, _, _ in batch]))
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+
+        records = []
+        for (features, primary, received_at), estimate in zip(batch, estimates):
+            shadow_cost = round(max(float(estimate), 500.0), 2)
+            primary_cost = primary["estimated_cost_mxn"]
+            records.append(
+                {
+                    "features": features,
+                    "primary_model": primary["model_used"],
+                    "primary_cost_mxn": primary_cost,
+                    "candidate_model": self._bundle.get("model_name", "candidate"),
+                    "candidate_cost_mxn": shadow_cost,
+                    "delta_mxn": round(shadow_cost - primary_cost, 2),
+                    "abs_delta_mxn": round(abs(shadow_cost - primary_cost), 2),
+                    "received_at": received_at,
+                }
+            )
+        self.sink(records)
+        metrics.incr("shadow.evaluated", len(records))
+        metrics.observe("shadow.batch_ms", elapsed_ms)
+
+
+def configure_shadow(evaluator):
+    """Install (or remove with None) the process-wide shadow evaluator for cost predictions."""
+    global _shadow_evaluator
+    _shadow_evaluator = evaluator
+
+
+def _submit_shadow(features, result):
+    evaluator = _shadow_evaluator
+    if evaluator is not None:
+        evaluator.submit(features, result)
+
+
+def optimize_oil_change_interval(vehicle, default_interval_km=10000, deadline=None):
+    """Oil-change interval for the vehicle; deadline works as in estimate_next_maintenance_cost."""
     features = _build_interval_features(vehicle)
-    model_bundle = _load_model(INTERVAL_MODEL_PATH)
+    model_bundle = _model_store.bundle("interval", deadline=deadline)
+    fallback_used = "rule_based_fallback"
 
-    if model_bundle and pd is not None:
+    if deadline is not None and not model_bundle and _model_store.loading():
+        _record_budget("interval", "load")
+        fallback_used = DEADLINE_FALLBACK
+    elif model_bundle and pd is not None:
         model = model_bundle.get("model")
         if model is not None:
-            frame = pd.DataFrame([features])
-            km = int(round(float(model.predict(frame)[0])))
-            km = max(4000, min(15000, km))
-            reason = "Intervalo personalizado por modelo entrenado"
-            if features["usage_type"] == "ciudad":
-                reason += " y uso urbano"
-            return {
-                "recommended_oil_change_interval_km": km,
-                "model_used": model_bundle.get("model_name", "trained_interval_model"),
-                "reason": reason,
-            }
+            prediction = _predict_one(model, features, deadline)
+            if deadline is not None:
+                _record_budget("interval", "inference" if prediction is None else None)
+            if prediction is not None:
+                km = int(round(prediction))
+                km = max(4000, min(15000, km))
+                reason = "Intervalo personalizado por modelo entrenado"
+                if features["usage_type"] == "ciudad":
+                    reason += " y uso urbano"
+                return {
+                    "recommended_oil_change_interval_km": km,
+                    "model_used": model_bundle.get("model_name", "trained_interval_model"),
+                    "reason": reason,
+                }
+            fallback_used = DEADLINE_FALLBACK
 
     usage_penalty = 0
     if features["usage_type"] == "ciudad":
@@ -167,28 +505,26 @@ def optimize_oil_change_interval(vehicle, default_interval_km=10000):
 
     return {
         "recommended_oil_change_interval_km": recommended,
-        "model_used": "rule_based_fallback",
+        "model_used": fallback_used,
         "reason": "Intervalo ajustado por patrón de uso y condiciones",
     }
 
 
-def predict_next_maintenance(vehicle, history, intervals):
+def predict_next_maintenance(vehicle, history, intervals, deadline=None):
     mileage = _safe_int(vehicle.get("current_mileage", vehicle.get("mileage", 0)))
     last_service = history[0] if history else None
 
     oil_interval = int(intervals.get("oil_change_km", 10000))
     days_interval = int(intervals.get("general_check_days", 180))
 
-    interval_optimization = optimize_oil_change_interval(vehicle, default_interval_km=oil_interval)
+    interval_optimization = optimize_oil_change_interval(
+        vehicle, default_interval_km=oil_interval, deadline=deadline
+    )
     optimized_oil_interval = interval_optimization["recommended_oil_change_interval_km"]
 
     next_oil_km = mileage + optimized_oil_interval
-    if last_service and last_service.get("service_date"):
-        base_date = datetime.fromisoformat(last_service["service_date"])
-    else:
-        base_date = datetime.utcnow()
-
-    next_check = base_date + timedelta(days=days_interval)
+    base_date = parse_date(last_service.get("service_date")) if last_service else None
+    next_check = (base_date or datetime.utcnow()) + timedelta(days=days_interval)
 
     return {
         "recommended_next_oil_change_km": next_oil_km,
@@ -197,3 +533,56 @@ def predict_next_maintenance(vehicle, history, intervals):
         "confidence": 0.72,
         "notes": "Prediccion base con intervalo personalizado.",
     }
+
+
+def _last_service_of(history, service_types):
+    for item in history:
+        if item.get("service_type") in service_types:
+            return item
+    return None
+
+
+def compute_due_fields(vehicle, history, intervals, now=None, oil_interval_km=None):
+    """Next-due km per service type and next general check date, as flat vehicle fields.
+
+    ``history`` must be ordered newest first, as returned by Maintenance.find_documents_by_vehicle.
+    ``oil_interval_km`` skips the interval model when the caller already batched it.
+    """
+    now = now or datetime.utcnow()
+    mileage = _safe_int(vehicle.get("current_mileage", vehicle.get("mileage", 0)))
+    maintenance_history = vehicle.get("maintenance_history") or {}
+
+    if oil_interval_km is None:
+        oil_interval_km = optimize_oil_change_interval(
+            vehicle, default_interval_km=int(intervals.get("oil_change_km", 10000))
+        )["recommended_oil_change_interval_km"]
+    km_intervals = {
+        "oil_change": oil_interval_km,
+        "brake_check": int(intervals.get("brake_check_km", DEFAULT_INTERVALS["brake_check_km"])),
+        "tire_rotation": int(intervals.get("tire_rotation_km", DEFAULT_INTERVALS["tire_rotation_km"])),
+    }
+
+    fields = {}
+    for service, interval_km in km_intervals.items():
+        last = _last_service_of(history, DUE_SERVICE_TYPES[service])
+        base_km = _safe_int(last.get("mileage"), default=None) if last else None
+        if base_km is None and service == "oil_change" and isinstance(maintenance_history, dict):
+            base_km = _safe_int(maintenance_history.get("last_oil_change_mileage"), default=None)
+        if base_km is None:
+            base_km = mileage
+        fields[f"next_due_{service}_km"] = base_km + interval_km
+
+    base_date = parse_date(history[0].get("service_date")) if history else None
+    next_check = (base_date or now) + timedelta(days=int(intervals.get("general_check_days", 180)))
+
+    next_due_km = min(fields.values())
+    fields.update(
+        {
+            "next_due_general_check_date": next_check,
+            "next_due_km": next_due_km,
+            "next_due_margin_km": next_due_km - mileage,
+            "next_due_date": next_check,
+            "next_due_computed_at": now,
+        }
+    )
+    return fields
@@ -0,0 +1,115 @@
+try:
+    import numpy as np
+except Exception:  # pragma: no cover - optional dependency at runtime
+    np = None
+
+try:
+    import pandas as pd
+except Exception:  # pragma: no cover - optional dependency at runtime
+    pd = None
+
+from .predict import (
+    DEFAULT_SERVICE_COSTS_MXN,
+    _build_cost_features,
+    _build_interval_features,
+    get_model_store,
+)
+
+# Request keys of the scenario grid and the feature column each one varies.
+SCENARIO_AXES = {
+    "service_types": "service_type",
+    "mileages": "current_mileage",
+    "monthly_mileages": "average_mileage_monthly",
+    "usage_types": "usage_type",
+    "driving_conditions": "driving_conditions",
+}
+
+
+def expand_grid(axes):
+    """Expand {column: values} into equally long columns holding their cartesian product.
+
+    The first axis varies slowest, as with ``itertools.product``.
+    """
+    columns = list(axes)
+    shape = tuple(len(axes[column]) for column in columns)
+    positions = np.unravel_index(np.arange(int(np.prod(shape))), shape)
+    return {column: np.asarray(axes[column])[index] for column, index in zip(columns, positions)}
+
+
+def _frame(base, grid, count):
+    # Keeps the training column order; constant features are broadcast by pandas.
+    return pd.DataFrame({name: grid.get(name, value) for name, value in base.items()}, index=pd.RangeIndex(count))
+
+
+def fallback_costs(service_types, mileages, vehicle_ages, historical_costs, usage_types, driving_conditions):
+    """Rule-based cost estimates over arrays (or scalars) of the same inputs as the scalar fallback."""
+    base_costs = np.array(
+        [DEFAULT_SERVICE_COSTS_MXN.get(s, DEFAULT_SERVICE_COSTS_MXN["major_service"]) for s in service_types],
+        dtype=float,
+    )
+    mileage_factor = 1 + np.minimum(mileages, 300000) / 300000
+    age_factor = 1 + np.minimum(vehicle_ages, 25) * 0.015
+    usage_factor = np.where((np.asarray(usage_types) == "ciudad") & (np.asarray(driving_conditions) == "severas"), 1.12, 1.0)
+    blended = np.where(np.asarray(historical_costs) > 0, 0.7 * base_costs + 0.3 * np.asarray(historical_costs), base_costs)
+    return np.round(blended * mileage_factor * age_factor * usage_factor, 2)
+
+
+def fallback_intervals(grid, default_interval_km):
+    """Rule-based oil-change intervals over a dict of interval feature arrays."""
+    penalty = np.where(grid["usage_type"] == "ciudad", 1200, 0)
+    penalty = penalty + np.where(grid["driving_conditions"] == "severas", 1800, 0)
+    penalty = penalty + np.where(grid["current_mileage"] > 120000, 800, 0)
+    penalty = penalty + np.where(grid["average_mileage_monthly"] > 2500, 700, 0)
+    return np.clip(default_interval_km - penalty, 5000, 12000)
+
+
+def evaluate_scenarios(vehicle, history, axes, default_interval_km=10000):
+    """Predict cost and oil-change interval for every combination of the given axes.
+
+    ``axes`` maps keys of SCENARIO_AXES to lists of values; axes left out keep the
+    vehicle's own value. Each model is called once on the whole scenario matrix.
+    Returns the grid and predictions as parallel columns.
+    """
+    cost_base = _build_cost_features(vehicle, history, "major_service")
+    interval_base = _build_interval_features(vehicle)
+    defaults = {**interval_base, **cost_base}
+    grid = expand_grid(
+        {column: axes.get(key) or [defaults[column]] for key, column in SCENARIO_AXES.items()}
+    )
+    count = len(grid["service_type"])
+
+    store = get_model_store()
+    cost_bundle = store.bundle("cost") or {}
+    interval_bundle = store.bundle("interval") or {}
+
+    if cost_bundle.get("model") is not None and pd is not None:
+        estimates = cost_bundle["model"].predict(_frame(cost_base, grid, count))
+        costs = np.round(np.maximum(estimates, 500.0), 2)
+        cost_model = cost_bundle.get("model_name", "trained_regressor")
+    else:
+        costs = fallback_costs(
+            grid["service_type"],
+            grid["current_mileage"],
+            cost_base["vehicle_age"],
+            cost_base["historical_avg_cost"],
+            grid["usage_type"],
+            grid["driving_conditions"],
+        )
+        cost_model = "rule_based_fallback"
+
+    if interval_bundle.get("model") is not None and pd is not None:
+        estimates = interval_bundle["model"].predict(_frame(interval_base, grid, count))
+        intervals = np.clip(np.round(estimates), 4000, 15000).astype(int)
+        interval_model = interval_bundle.get("model_name", "trained_interval_model")
+    else:
+        intervals = fallback_intervals(grid, default_interval_km)
+        interval_model = "rule_based_fallback"
+
+    columns = {column: values.tolist() for column, values in grid.items()}
+    columns["estimated_cost_mxn"] = costs.tolist()
+    columns["recommended_oil_change_interval_km"] = intervals.tolist()
+    return {
+        "count": count,
+        "models": {"cost": cost_model, "interval": interval_model},
+        "columns": columns,
+    }
@@ -1,3 +1,4 @@
+import sys
 from pathlib import Path
 
 try:
@@ -17,6 +18,8 @@ except Exception as exc:  # pragma: no cover
 else:
     _IMPORT_ERROR = None
 
+from . import data_cache
+
 
 BASE_DIR = Path(__file__).resolve().parents[2]
 DATA_DIR = BASE_DIR / "data"
@@ -27,29 +30,39 @@ INTERVAL_DATA_PATH = DATA_DIR / "interval_optimization_data.csv"
 COST_MODEL_PATH = MODEL_DIR / "cost_model.pkl"
 INTERVAL_MODEL_PATH = MODEL_DIR / "interval_model.pkl"
 
+COST_CATEGORICAL_COLS = ["service_type", "make", "model", "fuel_type", "transmission", "vehicle_type"]
+COST_NUMERIC_COLS = [
+    "current_mileage",
+    "average_mileage_monthly",
+    "cylinders",
+    "vehicle_age",
+    "historical_avg_cost",
+]
+INTERVAL_CATEGORICAL_COLS = ["usage_type", "driving_conditions", "fuel_type", "vehicle_type"]
+INTERVAL_NUMERIC_COLS = ["current_mileage", "average_mileage_monthly", "engine_hours"]
+
+TRAINING_SOURCES = [
+    (COST_DATA_PATH, COST_CATEGORICAL_COLS),
+    (INTERVAL_DATA_PATH, INTERVAL_CATEGORICAL_COLS),
+]
 
-def _build_pipeline(categorical_cols, numeric_cols, estimator):
+
+def _build_pipeline(categorical_cols, numeric_cols, estimator, memory=None):
     preprocessor = ColumnTransformer(
         transformers=[
             ("cat", OneHotEncoder(handle_unknown="ignore"), categorical_cols),
             ("num", "passthrough", numeric_cols),
         ]
     )
-    return Pipeline(steps=[("preprocessor", preprocessor), ("model", estimator)])
+    return Pipeline(steps=[("preprocessor", preprocessor), ("model", estimator)], memory=memory)
 
 
-def train_cost_model():
-    df = pd.read_csv(COST_DATA_PATH)
+def train_cost_model(output_path=COST_MODEL_PATH):
+    df = data_cache.load_frame(COST_DATA_PATH, COST_CATEGORICAL_COLS)
 
     target_col = "next_maintenance_cost_mxn"
-    categorical_cols = ["service_type", "make", "model", "fuel_type", "transmission", "vehicle_type"]
-    numeric_cols = [
-        "current_mileage",
-        "average_mileage_monthly",
-        "cylinders",
-        "vehicle_age",
-        "historical_avg_cost",
-    ]
+    categorical_cols = COST_CATEGORICAL_COLS
+    numeric_cols = COST_NUMERIC_COLS
 
     X = df[categorical_cols + numeric_cols]
     y = df[target_col]
@@ -73,23 +86,23 @@ def train_cost_model():
         "categorical_cols": categorical_cols,
         "numeric_cols": numeric_cols,
     }
-    joblib.dump(bundle, COST_MODEL_PATH)
+    joblib.dump(bundle, output_path)
 
     return {
         "model": "cost_regressor",
         "algorithm": "RandomForestRegressor",
         "samples": int(len(df)),
         "mae": round(mae, 2),
-        "output_path": str(COST_MODEL_PATH),
+        "output_path": str(output_path),
     }
 
 
-def train_interval_model():
-    df = pd.read_csv(INTERVAL_DATA_PATH)
+def train_interval_model(output_path=INTERVAL_MODEL_PATH):
+    df = data_cache.load_frame(INTERVAL_DATA_PATH, INTERVAL_CATEGORICAL_COLS)
 
     target_col = "recommended_oil_change_interval_km"
-    categorical_cols = ["usage_type", "driving_conditions", "fuel_type", "vehicle_type"]
-    numeric_cols = ["current_mileage", "average_mileage_monthly", "engine_hours"]
+    categorical_cols = INTERVAL_CATEGORICAL_COLS
+    numeric_cols = INTERVAL_NUMERIC_COLS
 
     X = df[categorical_cols + numeric_cols]
     y = df[target_col]
@@ -113,18 +126,18 @@ def train_interval_model():
         "categorical_cols": categorical_cols,
         "numeric_cols": numeric_cols,
     }
-    joblib.dump(bundle, INTERVAL_MODEL_PATH)
+    joblib.dump(bundle, output_path)
 
     return {
         "model": "interval_optimizer",
         "algorithm": "LinearRegression",
         "samples": int(len(df)),
         "mae": round(mae, 2),
-        "output_path": str(INTERVAL_MODEL_PATH),
+        "output_path": str(output_path),
     }
 
 
-def train():
+def _check_environment():
     if _IMPORT_ERROR is not None:
         return {
             "status": "error",
@@ -135,9 +148,31 @@ def train():
     missing = [str(p) for p in [COST_DATA_PATH, INTERVAL_DATA_PATH] if not p.exists()]
     if missing:
         return {"status": "error", "message": "Missing training data files", "missing": missing}
+    return None
+
+
+def prepare_data():
+    """Build (or reuse) the typed columnar caches of the training CSVs."""
+    error = _check_environment()
+    if error:
+        return error
+    return {"status": "ok", "results": data_cache.report(TRAINING_SOURCES)}
+
+
+def train(output_dir=None):
+    """Train both models; bundles go next to this module unless output_dir is given."""
+    error = _check_environment()
+    if error:
+        return error
 
-    cost_result = train_cost_model()
-    interval_result = train_interval_model()
+    if output_dir is None:
+        cost_result = train_cost_model()
+        interval_result = train_interval_model()
+    else:
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        cost_result = train_cost_model(output_dir / COST_MODEL_PATH.name)
+        interval_result = train_interval_model(output_dir / INTERVAL_MODEL_PATH.name)
 
     return {
         "status": "ok",
@@ -146,4 +181,4 @@ def train():
 
 
 if __name__ == "__main__":
-    print(train())
+    print(prepare_data() if sys.argv[1:] == ["prepare"] else train())
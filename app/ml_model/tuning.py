@@ -0,0 +1,201 @@
+import json
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+try:
+    import joblib
+    from sklearn.ensemble import ExtraTreesRegressor, HistGradientBoostingRegressor, RandomForestRegressor
+    from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+    from sklearn.linear_model import LinearRegression, Ridge
+    from sklearn.metrics import mean_absolute_error
+    from sklearn.model_selection import HalvingRandomSearchCV, train_test_split
+except Exception:  # pragma: no cover - optional dependency at runtime
+    joblib = None
+
+from . import data_cache
+from .train_model import (
+    COST_CATEGORICAL_COLS,
+    COST_DATA_PATH,
+    COST_MODEL_PATH,
+    COST_NUMERIC_COLS,
+    INTERVAL_CATEGORICAL_COLS,
+    INTERVAL_DATA_PATH,
+    INTERVAL_MODEL_PATH,
+    INTERVAL_NUMERIC_COLS,
+    _build_pipeline,
+    _check_environment,
+)
+
+TUNING_REPORT_FILE = "tuning_report.json"
+LATENCY_SAMPLES = 200
+
+
+def _search_spaces():
+    """Candidate estimators and parameters per model; ``model`` swaps the pipeline's estimator."""
+    forest = {
+        "model__n_estimators": [100, 200, 300, 500],
+        "model__max_depth": [None, 8, 16],
+        "model__min_samples_leaf": [1, 2, 4],
+        "model__max_features": [1.0, "sqrt", 0.5],
+    }
+    return {
+        "cost_regressor": [
+            {"model": [RandomForestRegressor(random_state=42)], **forest},
+            {"model": [ExtraTreesRegressor(random_state=42)], **forest},
+            {
+                "model": [HistGradientBoostingRegressor(random_state=42, early_stopping=True)],
+                "model__learning_rate": [0.03, 0.1, 0.3],
+                "model__max_leaf_nodes": [15, 31, 63],
+                "model__l2_regularization": [0.0, 1.0],
+            },
+        ],
+        "interval_optimizer": [
+            {"model": [LinearRegression()]},
+            {"model": [Ridge()], "model__alpha": [0.1, 1.0, 10.0, 100.0]},
+            {"model": [RandomForestRegressor(random_state=42)], **forest},
+        ],
+    }
+
+
+def _single_row_latency_ms(model, X):
+    row = X.iloc[:1]
+    timings = []
+    for _ in range(LATENCY_SAMPLES):
+        started = time.perf_counter()
+        model.predict(row)
+        timings.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(timings), 3)
+
+
+def _candidate_report(search, cv):
+    results = search.cv_results_
+    candidates = []
+    for index, params in enumerate(results["params"]):
+        test_rows = max(1, int(results["n_resources"][index]) // cv)
+        candidates.append(
+            {
+                "iteration": int(results["iter"][index]),
+                "n_samples": int(results["n_resources"][index]),
+                "estimator": type(params["model"]).__name__,
+                "params": {key: value for key, value in params.items() if key != "model"},
+                "cv_mae": round(-float(results["mean_test_score"][index]), 2),
+                "fit_seconds": round(float(results["mean_fit_time"][index]), 4),
+                "predict_ms_per_row": round(float(results["mean_score_time"][index]) * 1000 / test_rows, 4),
+            }
+        )
+    # Each halving iteration re-scores survivors on more samples; keep the last one.
+    last = {}
+    for candidate in candidates:
+        key = json.dumps([candidate["estimator"], candidate["params"]], sort_keys=True, default=str)
+        last[key] = candidate
+    return sorted(last.values(), key=lambda c: (-c["iteration"], c["cv_mae"]))
+
+
+def tune_model(name, data_path, categorical_cols, numeric_cols, target_col, output_path=None,
+               n_candidates=24, cv=3, factor=2, n_jobs=2):
+    df = data_cache.load_frame(data_path, categorical_cols)
+    X = df[categorical_cols + numeric_cols]
+    y = df[target_col]
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    # Fitted preprocessors are memoized on disk, so candidates sharing a fold and
+    # sample budget reuse the one-hot encoding instead of refitting it.
+    cache_dir = tempfile.mkdtemp(prefix="caremycar-tuning-")
+    try:
+        pipeline = _build_pipeline(categorical_cols, numeric_cols, LinearRegression(), memory=cache_dir)
+        search = HalvingRandomSearchCV(
+            pipeline,
+            _search_spaces()[name],
+            n_candidates=n_candidates,
+            factor=factor,
+            cv=cv,
+            scoring="neg_mean_absolute_error",
+            n_jobs=n_jobs,
+            random_state=42,
+        )
+        started = time.perf_counter()
+        search.fit(X_train, y_train)
+        search_seconds = time.perf_counter() - started
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    best = search.best_estimator_
+    best.set_params(memory=None)
+    mae = float(mean_absolute_error(y_test, best.predict(X_test)))
+    model_name = type(best.named_steps["model"]).__name__
+
+    if output_path is not None:
+        joblib.dump(
+            {
+                "model": best,
+                "model_name": model_name,
+                "mae": mae,
+                "params": {k: v for k, v in search.best_params_.items() if k != "model"},
+                "categorical_cols": categorical_cols,
+                "numeric_cols": numeric_cols,
+            },
+            output_path,
+        )
+
+    return {
+        "model": name,
+        "algorithm": model_name,
+        "samples": int(len(df)),
+        "mae": round(mae, 2),
+        "best_params": {k: v for k, v in search.best_params_.items() if k != "model"},
+        "search_seconds": round(search_seconds, 2),
+        "iterations": int(search.n_iterations_),
+        "predict_ms_single_row": _single_row_latency_ms(best, X_test),
+        "output_path": str(output_path) if output_path is not None else None,
+        "candidates": _candidate_report(search, cv),
+    }
+
+
+def tune(output_dir=None, n_candidates=24, n_jobs=2):
+    """Successive-halving search for both models.
+
+    With output_dir the best bundles and the report are saved there, named like
+    train()'s bundles, so RetrainManager can validate and promote them as a
+    registry version; the served models are never written directly.
+    """
+    error = _check_environment()
+    if error:
+        return error
+
+    if output_dir is not None:
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+    results = [
+        tune_model(
+            "cost_regressor",
+            COST_DATA_PATH,
+            COST_CATEGORICAL_COLS,
+            COST_NUMERIC_COLS,
+            "next_maintenance_cost_mxn",
+            output_dir / COST_MODEL_PATH.name if output_dir is not None else None,
+            n_candidates=n_candidates,
+            n_jobs=n_jobs,
+        ),
+        tune_model(
+            "interval_optimizer",
+            INTERVAL_DATA_PATH,
+            INTERVAL_CATEGORICAL_COLS,
+            INTERVAL_NUMERIC_COLS,
+            "recommended_oil_change_interval_km",
+            output_dir / INTERVAL_MODEL_PATH.name if output_dir is not None else None,
+            n_candidates=n_candidates,
+            n_jobs=n_jobs,
+        ),
+    ]
+    report = {"status": "ok", "results": results}
+    if output_dir is not None:
+        (output_dir / TUNING_REPORT_FILE).write_text(json.dumps(report, indent=2, default=str), encoding="utf-8")
+    return report
+
+
+if __name__ == "__main__":
+    print(tune())
@@ -1,6 +1,9 @@
+from .cost_rollup import CostRollup
 from .maintenance import Maintenance
+from .prediction import Prediction
+from .telemetry import Telemetry
 from .user import User
 from .vehicle import Vehicle
 from .vehicle_catalog import VehicleCatalog
 
-__all__ = ["User", "Vehicle", "Maintenance", "VehicleCatalog"]
+__all__ = ["User", "Vehicle", "Maintenance", "VehicleCatalog", "Telemetry", "Prediction", "CostRollup"]
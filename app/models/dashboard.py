@@ -0,0 +1,104 @@
+from flask import current_app
+
+from ..utils.dates import date_string, mongo_date
+from ..utils.db import get_db
+from .maintenance import Maintenance
+from .prediction import Prediction
+from .vehicle import Vehicle
+
+# Correlates the joined collections with the vehicle on the fields of their
+# (user_id, vehicle_id, ...) indexes; vehicle_id is stored as a string.
+_SAME_VEHICLE = {
+    "$match": {
+        "$expr": {
+            "$and": [
+                {"$eq": ["$user_id", "$$user_id"]},
+                {"$eq": ["$vehicle_id", "$$vehicle_id"]},
+            ]
+        }
+    }
+}
+
+
+def _lookup(collection, pipeline, output):
+    return {
+        "$lookup": {
+            "from": collection,
+            "let": {"user_id": "$user_id", "vehicle_id": {"$toString": "$_id"}},
+            "pipeline": [_SAME_VEHICLE, *pipeline],
+            "as": output,
+        }
+    }
+
+
+def dashboard_pipeline(user_id, dates_migrated=False):
+    """Vehicles of user_id joined with their latest maintenance, latest prediction and totals.
+
+    Until dates_migrated, service_date is compared as a date (BSON would rank
+    every date above every "YYYY-MM-DD" string).
+    """
+    service_date = "$service_date" if dates_migrated else mongo_date("service_date")
+    if dates_migrated:
+        latest_service = [{"$sort": {"service_date": -1}}, {"$limit": 1}]
+    else:
+        latest_service = [
+            {"$addFields": {"_service_order": service_date}},
+            {"$sort": {"_service_order": -1}},
+            {"$limit": 1},
+            {"$project": {"_service_order": 0}},
+        ]
+    return [
+        {"$match": {"user_id": user_id}},
+        {"$sort": {"created_at": -1}},
+        _lookup(Maintenance.collection, latest_service, "latest_maintenance"),
+        _lookup(
+            Prediction.collection,
+            [{"$sort": {"created_at": -1}}, {"$limit": 1}, {"$project": {"snapshot": 0}}],
+            "latest_prediction",
+        ),
+        _lookup(
+            Maintenance.collection,
+            [
+                {
+                    "$group": {
+                        "_id": None,
+                        "maintenance_count": {"$sum": 1},
+                        "total_cost": {"$sum": "$cost"},
+                        "last_service_date": {"$max": service_date},
+                    }
+                },
+                {"$project": {"_id": 0}},
+            ],
+            "stats",
+        ),
+    ]
+
+
+def _first(items):
+    return items[0] if items else None
+
+
+def dashboard_for_user(user_id):
+    """Home-screen data for every vehicle of a user from one aggregation."""
+    rows = get_db()[Vehicle.collection].aggregate(
+        dashboard_pipeline(user_id, dates_migrated=current_app.config["STRING_DATES_MIGRATED"])
+    )
+    items = []
+    summary = {"vehicles": 0, "maintenance_count": 0, "total_cost": 0}
+    for row in rows:
+        stats = _first(row.pop("stats")) or {"maintenance_count": 0, "total_cost": 0, "last_service_date": None}
+        stats["total_cost"] = round(stats["total_cost"], 2)
+        stats["last_service_date"] = date_string(stats["last_service_date"])
+        items.append(
+            {
+                "vehicle": Vehicle.serialize(row),
+                "latest_maintenance": Maintenance.serialize(_first(row.pop("latest_maintenance"))),
+                "latest_prediction": Prediction.serialize(_first(row.pop("latest_prediction"))),
+                "stats": stats,
+            }
+        )
+        summary["vehicles"] += 1
+        summary["maintenance_count"] += stats["maintenance_count"]
+        summary["total_cost"] += stats["total_cost"]
+    summary["total_cost"] = round(summary["total_cost"], 2)
+    return {"items": items, "summary": summary}
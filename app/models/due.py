@@ -0,0 +1,82 @@
+from ..ml_model.forecast import forecast_timeline, oil_change_intervals
+from ..ml_model.predict import compute_due_fields, load_intervals
+from ..storage import get_repository
+from .maintenance import Maintenance
+from .vehicle import Vehicle
+
+
+def _history_by_vehicle(vehicles):
+    history = {str(vehicle["_id"]): [] for vehicle in vehicles}
+    vehicle_ids_by_user = {}
+    for vehicle in vehicles:
+        vehicle_ids_by_user.setdefault(vehicle["user_id"], []).append(str(vehicle["_id"]))
+    repository = get_repository(Maintenance.collection)
+    for user_id, vehicle_ids in vehicle_ids_by_user.items():
+        rows = repository.history_for_vehicles(
+            user_id, vehicle_ids, ["vehicle_id", "service_type", "mileage", "service_date", "cost"]
+        )
+        for row in rows:
+            history[row["vehicle_id"]].append(row)
+    return history
+
+
+def _refresh_documents(vehicles, intervals):
+    if not vehicles:
+        return 0
+    history = _history_by_vehicle(vehicles)
+    oil_intervals = oil_change_intervals(vehicles, int(intervals.get("oil_change_km", 10000)))
+    updates = []
+    for vehicle, oil_interval_km in zip(vehicles, oil_intervals):
+        fields = compute_due_fields(
+            vehicle, history[str(vehicle["_id"])], intervals, oil_interval_km=int(oil_interval_km)
+        )
+        updates.append((vehicle, fields))
+    modified = get_repository(Vehicle.collection).set_fields_many(
+        [(vehicle["_id"], fields) for vehicle, fields in updates]
+    )
+    for vehicle, fields in updates:
+        Vehicle.remember(vehicle["user_id"], {**vehicle, **fields})
+    return modified
+
+
+def refresh_due_fields(user_id, vehicle_ids):
+    """Recompute the next-due fields of the given vehicles after mileage or maintenance changes."""
+    vehicles = Vehicle.find_documents_for_user(user_id, vehicle_ids)
+    return _refresh_documents(vehicles, load_intervals())
+
+
+def refresh_vehicle_due(user_id, vehicle_id):
+    """Recompute one vehicle's next-due fields and return the serialized vehicle."""
+    vehicles = Vehicle.find_documents_for_user(user_id, [vehicle_id])
+    if not vehicles:
+        return None
+    history = _history_by_vehicle(vehicles)[str(vehicles[0]["_id"])]
+    result = get_repository(Vehicle.collection).update(
+        vehicles[0]["_id"], None, compute_due_fields(vehicles[0], history, load_intervals())
+    )
+    return Vehicle.serialize(Vehicle.remember(user_id, result)) if result else None
+
+
+def refresh_all_due_fields(batch_size=500):
+    """Recompute next-due fields for every vehicle, e.g. after new models are deployed."""
+    intervals = load_intervals()
+    refreshed = 0
+    batch = []
+    for vehicle in get_repository(Vehicle.collection).iter_all(batch_size):
+        batch.append(vehicle)
+        if len(batch) >= batch_size:
+            refreshed += _refresh_documents(batch, intervals)
+            batch = []
+    refreshed += _refresh_documents(batch, intervals)
+    return refreshed
+
+
+def forecast_for_user(user_id, horizon_days, vehicle_id=None):
+    """Maintenance timeline of one vehicle, or of the user's whole fleet; None if the vehicle is missing."""
+    vehicle_ids = [vehicle_id] if vehicle_id else None
+    vehicles = list(get_repository(Vehicle.collection).find_for_user(user_id, vehicle_ids=vehicle_ids, read_only=True))
+    if vehicle_id and not vehicles:
+        return None
+    history = _history_by_vehicle(vehicles)
+    items = [(vehicle, history[str(vehicle["_id"])]) for vehicle in vehicles]
+    return forecast_timeline(items, load_intervals(), horizon_days)
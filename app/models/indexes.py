@@ -0,0 +1,35 @@
+from flask import current_app
+
+from ..jobs.reminders import REMINDER_INDEXES, REMINDERS_COLLECTION
+from ..jobs.shadow import SHADOW_COLLECTION, SHADOW_INDEXES
+from ..storage import get_storage
+from ..utils.db import get_db
+from .cost_rollup import CostRollup
+from .maintenance import Maintenance
+from .prediction import Prediction
+from .telemetry import Telemetry
+from .vehicle import Vehicle
+from .vehicle_catalog import VehicleCatalog
+
+INDEXED_MODELS = [Vehicle, Maintenance, VehicleCatalog, Telemetry, Prediction, CostRollup]
+
+# Collections without a model class.
+EXTRA_INDEXES = {
+    REMINDERS_COLLECTION: REMINDER_INDEXES,
+    SHADOW_COLLECTION: SHADOW_INDEXES,
+}
+
+
+def ensure_indexes():
+    storage = get_storage()
+    if storage.name != "mongo":
+        return storage.ensure_indexes()
+
+    db = get_db()
+    created = []
+    specs = [(model.collection, model.indexes) for model in INDEXED_MODELS] + list(EXTRA_INDEXES.items())
+    for collection, indexes in specs:
+        for keys, options in indexes:
+            created.append(f"{collection}.{db[collection].create_index(keys, **options)}")
+    created.append(Prediction.ensure_ttl_index(db, current_app.config["PREDICTIONS_TTL_DAYS"]))
+    return created
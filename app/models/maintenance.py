@@ -1,42 +1,89 @@
 from datetime import datetime, timezone
 
-from bson import ObjectId
-from pymongo import ReturnDocument
-
-from ..utils.db import get_db
+from ..storage import get_repository
+from ..utils.dates import day_range, storable_date
+from .cost_rollup import CostRollup
+from .records import MaintenanceRecord
+from .unit_of_work import current_unit_of_work, load_once
 
 
 class Maintenance:
     collection = "maintenance"
+    # Identity-map namespace of per-vehicle histories.
+    history_key = "maintenance.by_vehicle"
+    indexes = [
+        ([("user_id", 1), ("vehicle_id", 1), ("service_date", -1)], {}),
+        ([("user_id", 1), ("service_date", -1)], {}),
+    ]
 
     @staticmethod
-    def create(user_id, payload):
-        db = get_db()
-        now = datetime.now(timezone.utc)
-        item = {
+    def build_document(user_id, payload, now):
+        return {
             "user_id": user_id,
             "vehicle_id": payload.get("vehicle_id"),
             "service_type": payload.get("service_type"),
             "description": payload.get("description"),
             "cost": payload.get("cost"),
             "mileage": payload.get("mileage"),
-            "service_date": payload.get("service_date"),
+            "service_date": storable_date(payload.get("service_date")),
             "created_at": now,
             "updated_at": now,
         }
-        inserted = db[Maintenance.collection].insert_one(item)
-        item["_id"] = inserted.inserted_id
+
+    @staticmethod
+    def create(user_id, payload):
+        item = Maintenance.build_document(user_id, payload, datetime.now(timezone.utc))
+        get_repository(Maintenance.collection).insert(item)
+        CostRollup.apply(added=[item])
+        Maintenance._forget_histories(user_id, [item])
         return Maintenance.serialize(item)
 
+    @staticmethod
+    def insert_many(user_id, payloads):
+        """Insert payloads unordered; returns (inserted_count, {index: error message})."""
+        if not payloads:
+            return 0, {}
+
+        now = datetime.now(timezone.utc)
+        items = [Maintenance.build_document(user_id, payload, now) for payload in payloads]
+        Maintenance._forget_histories(user_id, items)
+        failures = get_repository(Maintenance.collection).insert_many(items)
+        CostRollup.apply(added=[item for index, item in enumerate(items) if index not in failures])
+        return len(items) - len(failures), failures
+
     @staticmethod
     def find_by_vehicle(user_id, vehicle_id):
-        db = get_db()
-        items = db[Maintenance.collection].find({"user_id": user_id, "vehicle_id": vehicle_id}).sort("service_date", -1)
-        return [Maintenance.serialize(i) for i in items]
+        return [Maintenance.serialize(i) for i in Maintenance.find_documents_by_vehicle(user_id, vehicle_id)]
+
+    @staticmethod
+    def find_documents_by_vehicle(user_id, vehicle_id):
+        """Raw records of a vehicle, newest service first; service_date stays a datetime for the predictors."""
+        return load_once(
+            Maintenance.history_key,
+            (user_id, vehicle_id),
+            lambda: list(get_repository(Maintenance.collection).find_for_vehicle(user_id, vehicle_id)),
+        )
+
+    @staticmethod
+    def _forget_histories(user_id, documents):
+        uow = current_unit_of_work()
+        if uow is None:
+            return
+        for vehicle_id in {doc.get("vehicle_id") for doc in documents}:
+            uow.forget(Maintenance.history_key, (user_id, vehicle_id))
+
+    @staticmethod
+    def iter_by_user(user_id, vehicle_id=None, start_date=None, end_date=None):
+        """A user's records, newest service first; optionally within inclusive "YYYY-MM-DD" bounds."""
+        start, end = day_range(start_date, end_date)
+        items = get_repository(Maintenance.collection).iter_for_user(
+            user_id, vehicle_id=vehicle_id, start=start, end=end
+        )
+        for item in items:
+            yield Maintenance.serialize(item)
 
     @staticmethod
     def update_for_user(maintenance_id, user_id, payload):
-        db = get_db()
         updates = {
             key: payload[key]
             for key in ["service_type", "description", "cost", "mileage", "service_date"]
@@ -44,34 +91,32 @@ class Maintenance:
         }
         if not updates:
             return None
+        if "service_date" in updates:
+            updates["service_date"] = storable_date(updates["service_date"])
 
         updates["updated_at"] = datetime.now(timezone.utc)
-        result = db[Maintenance.collection].find_one_and_update(
-            {"_id": ObjectId(maintenance_id), "user_id": user_id},
-            {"$set": updates},
-            return_document=ReturnDocument.AFTER,
-        )
-        return Maintenance.serialize(result) if result else None
+        before = get_repository(Maintenance.collection).update_returning_before(maintenance_id, user_id, updates)
+        if not before:
+            return None
+        Maintenance._forget_histories(user_id, [before])
+        result = {**before, **updates}
+        if any(before.get(key) != result.get(key) for key in ("service_type", "cost", "service_date")):
+            CostRollup.apply(added=[result], removed=[before])
+        return Maintenance.serialize(result)
 
     @staticmethod
     def delete_for_user(maintenance_id, user_id):
-        db = get_db()
-        result = db[Maintenance.collection].delete_one({"_id": ObjectId(maintenance_id), "user_id": user_id})
-        return result.deleted_count > 0
+        """Delete a record; returns the deleted document's vehicle reference, or None."""
+        result = get_repository(Maintenance.collection).delete(
+            maintenance_id, user_id, ["user_id", "vehicle_id", "service_type", "cost", "service_date"]
+        )
+        if result:
+            CostRollup.apply(removed=[result])
+            Maintenance._forget_histories(user_id, [result])
+        return result
 
     @staticmethod
     def serialize(item):
         if not item:
             return None
-        return {
-            "id": str(item.get("_id")),
-            "user_id": item.get("user_id"),
-            "vehicle_id": item.get("vehicle_id"),
-            "service_type": item.get("service_type"),
-            "description": item.get("description"),
-            "cost": item.get("cost"),
-            "mileage": item.get("mileage"),
-            "service_date": item.get("service_date"),
-            "created_at": item.get("created_at").isoformat() if item.get("created_at") else None,
-            "updated_at": item.get("updated_at").isoformat() if item.get("updated_at") else None,
-        }
+        return MaintenanceRecord.from_document(item).to_public()
@@ -0,0 +1,62 @@
+from datetime import datetime, timezone
+
+from pymongo.errors import OperationFailure
+
+from ..storage import get_repository
+
+TTL_INDEX_NAME = "prediction_ttl"
+
+
+class Prediction:
+    collection = "predictions"
+    indexes = [
+        ([("user_id", 1), ("vehicle_id", 1), ("created_at", -1)], {}),
+    ]
+
+    @staticmethod
+    def create(user_id, vehicle_id, prediction):
+        item = {
+            "user_id": user_id,
+            "vehicle_id": vehicle_id,
+            "prediction": prediction,
+            "snapshot": False,
+            "created_at": datetime.now(timezone.utc),
+        }
+        return Prediction.serialize(get_repository(Prediction.collection).insert(item))
+
+    @staticmethod
+    def find_by_vehicle(user_id, vehicle_id, limit=0):
+        items = get_repository(Prediction.collection).find_for_vehicle(user_id, vehicle_id, limit=limit)
+        return [Prediction.serialize(i) for i in items]
+
+    @staticmethod
+    def iter_by_user(user_id, vehicle_id=None):
+        for item in get_repository(Prediction.collection).iter_for_user(user_id, vehicle_id=vehicle_id):
+            yield Prediction.serialize(item)
+
+    @staticmethod
+    def ensure_ttl_index(db, ttl_days):
+        """Expire non-snapshot predictions after ttl_days; daily snapshots are kept."""
+        seconds = int(ttl_days * 86400)
+        try:
+            db[Prediction.collection].create_index(
+                [("created_at", 1)],
+                name=TTL_INDEX_NAME,
+                expireAfterSeconds=seconds,
+                partialFilterExpression={"snapshot": False},
+            )
+        except OperationFailure:
+            # The index exists with another TTL; adjust it in place.
+            db.command("collMod", Prediction.collection, index={"name": TTL_INDEX_NAME, "expireAfterSeconds": seconds})
+        return f"{Prediction.collection}.{TTL_INDEX_NAME}"
+
+    @staticmethod
+    def serialize(rec):
+        if not rec:
+            return None
+        return {
+            "id": str(rec["_id"]),
+            "vehicle_id": rec["vehicle_id"],
+            "prediction": rec["prediction"],
+            "created_at": rec["created_at"].isoformat() if rec.get("created_at") else None,
+        }
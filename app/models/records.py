@@ -0,0 +1,224 @@
+from ..utils.dates import date_string
+
+# Documents are decoded once into slotted records: no per-instance __dict__,
+# only the public fields are kept, and the input document is never modified.
+# to_public() builds the API dict with a single dict display.
+
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+
+class TelemetryRecord:
+    __slots__ = ("last_at", "last_km", "avg_km_daily", "avg_km_weekly", "avg_km_monthly")
+
+    @classmethod
+    def from_document(cls, telemetry):
+        if not telemetry:
+            return None
+        record = cls.__new__(cls)
+        get = telemetry.get
+        record.last_at = get("last_at")
+        record.last_km = get("last_km")
+        record.avg_km_daily = get("avg_km_daily")
+        record.avg_km_weekly = get("avg_km_weekly")
+        record.avg_km_monthly = get("avg_km_monthly")
+        return record
+
+    def to_public(self):
+        return {
+            "last_at": _iso(self.last_at),
+            "last_km": self.last_km,
+            "avg_km_daily": self.avg_km_daily,
+            "avg_km_weekly": self.avg_km_weekly,
+            "avg_km_monthly": self.avg_km_monthly,
+        }
+
+
+class VehicleRecord:
+    __slots__ = (
+        "id",
+        "user_id",
+        "catalog_vehicle_id",
+        "make",
+        "model",
+        "year",
+        "vehicle_type",
+        "fuel_type",
+        "cylinders",
+        "transmission",
+        "vin",
+        "license_plate",
+        "color",
+        "current_mileage",
+        "average_mileage_daily",
+        "average_mileage_weekly",
+        "average_mileage_monthly",
+        "engine_hours",
+        "acquisition_date",
+        "usage_type",
+        "driving_conditions",
+        "image_urls",
+        "maintenance_history",
+        "telemetry",
+        "next_due_oil_change_km",
+        "next_due_brake_check_km",
+        "next_due_tire_rotation_km",
+        "next_due_general_check_date",
+        "next_due_km",
+        "next_due_margin_km",
+        "next_due_date",
+        "created_at",
+        "updated_at",
+    )
+
+    @classmethod
+    def from_document(cls, doc):
+        record = cls.__new__(cls)
+        get = doc.get
+        record.id = str(get("_id"))
+        record.user_id = get("user_id")
+        record.catalog_vehicle_id = get("catalog_vehicle_id")
+        record.make = get("make")
+        record.model = get("model")
+        record.year = get("year")
+        record.vehicle_type = get("vehicle_type")
+        record.fuel_type = get("fuel_type")
+        record.cylinders = get("cylinders")
+        record.transmission = get("transmission")
+        record.vin = get("vin")
+        record.license_plate = get("license_plate")
+        record.color = get("color")
+        record.current_mileage = get("current_mileage")
+        record.average_mileage_daily = get("average_mileage_daily")
+        record.average_mileage_weekly = get("average_mileage_weekly")
+        record.average_mileage_monthly = get("average_mileage_monthly")
+        record.engine_hours = get("engine_hours")
+        record.acquisition_date = get("acquisition_date")
+        record.usage_type = get("usage_type")
+        record.driving_conditions = get("driving_conditions")
+        record.image_urls = doc["image_urls"] if "image_urls" in doc else []
+        record.maintenance_history = doc["maintenance_history"] if "maintenance_history" in doc else {}
+        record.telemetry = TelemetryRecord.from_document(get("telemetry"))
+        record.next_due_oil_change_km = get("next_due_oil_change_km")
+        record.next_due_brake_check_km = get("next_due_brake_check_km")
+        record.next_due_tire_rotation_km = get("next_due_tire_rotation_km")
+        record.next_due_general_check_date = get("next_due_general_check_date")
+        record.next_due_km = get("next_due_km")
+        record.next_due_margin_km = get("next_due_margin_km")
+        record.next_due_date = get("next_due_date")
+        record.created_at = get("created_at")
+        record.updated_at = get("updated_at")
+        return record
+
+    def to_public(self):
+        telemetry = self.telemetry
+        return {
+            "id": self.id,
+            "user_id": self.user_id,
+            "catalog_vehicle_id": self.catalog_vehicle_id,
+            "make": self.make,
+            "model": self.model,
+            "year": self.year,
+            "vehicle_type": self.vehicle_type,
+            "fuel_type": self.fuel_type,
+            "cylinders": self.cylinders,
+            "transmission": self.transmission,
+            "vin": self.vin,
+            "license_plate": self.license_plate,
+            "color": self.color,
+            "current_mileage": self.current_mileage,
+            "mileage": self.current_mileage,
+            "average_mileage_daily": self.average_mileage_daily,
+            "average_mileage_weekly": self.average_mileage_weekly,
+            "average_mileage_monthly": self.average_mileage_monthly,
+            "engine_hours": self.engine_hours,
+            "acquisition_date": date_string(self.acquisition_date),
+            "usage_type": self.usage_type,
+            "driving_conditions": self.driving_conditions,
+            "image_urls": self.image_urls,
+            "maintenance_history": self.maintenance_history,
+            "telemetry": telemetry.to_public() if telemetry is not None else None,
+            "next_due_oil_change_km": self.next_due_oil_change_km,
+            "next_due_brake_check_km": self.next_due_brake_check_km,
+            "next_due_tire_rotation_km": self.next_due_tire_rotation_km,
+            "next_due_general_check_date": _iso(self.next_due_general_check_date),
+            "next_due_km": self.next_due_km,
+            "next_due_margin_km": self.next_due_margin_km,
+            "next_due_date": _iso(self.next_due_date),
+            "created_at": _iso(self.created_at),
+            "updated_at": _iso(self.updated_at),
+        }
+
+
+class MaintenanceRecord:
+    __slots__ = (
+        "id",
+        "user_id",
+        "vehicle_id",
+        "service_type",
+        "description",
+        "cost",
+        "mileage",
+        "service_date",
+        "created_at",
+        "updated_at",
+    )
+
+    @classmethod
+    def from_document(cls, doc):
+        record = cls.__new__(cls)
+        get = doc.get
+        record.id = str(get("_id"))
+        record.user_id = get("user_id")
+        record.vehicle_id = get("vehicle_id")
+        record.service_type = get("service_type")
+        record.description = get("description")
+        record.cost = get("cost")
+        record.mileage = get("mileage")
+        record.service_date = get("service_date")
+        record.created_at = get("created_at")
+        record.updated_at = get("updated_at")
+        return record
+
+    def to_public(self):
+        return {
+            "id": self.id,
+            "user_id": self.user_id,
+            "vehicle_id": self.vehicle_id,
+            "service_type": self.service_type,
+            "description": self.description,
+            "cost": self.cost,
+            "mileage": self.mileage,
+            "service_date": date_string(self.service_date),
+            "created_at": _iso(self.created_at),
+            "updated_at": _iso(self.updated_at),
+        }
+
+
+class CatalogRecord:
+    __slots__ = ("id", "make", "model", "vehicle_type", "fuel_type", "transmission", "image_urls")
+
+    @classmethod
+    def from_document(cls, doc):
+        record = cls.__new__(cls)
+        get = doc.get
+        record.id = get("id")
+        record.make = get("make")
+        record.model = get("model")
+        record.vehicle_type = get("vehicle_type")
+        record.fuel_type = get("fuel_type")
+        record.transmission = get("transmission")
+        record.image_urls = doc["image_urls"] if "image_urls" in doc else []
+        return record
+
+    def to_public(self):
+        return {
+            "id": self.id,
+            "make": self.make,
+            "model": self.model,
+            "vehicle_type": self.vehicle_type,
+            "fuel_type": self.fuel_type,
+            "transmission": self.transmission,
+            "image_urls": self.image_urls,
+        }
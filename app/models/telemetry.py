@@ -0,0 +1,151 @@
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from ..utils.db import get_db
+from .unit_of_work import current_unit_of_work
+from .vehicle import Vehicle
+
+
+def _bucket_start(ts):
+    return datetime(ts.year, ts.month, ts.day, tzinfo=timezone.utc)
+
+
+def _as_utc(value):
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class Telemetry:
+    collection = "telemetry_buckets"
+    indexes = [
+        ([("vehicle_id", 1), ("bucket_start", 1), ("count", 1)], {}),
+        ([("user_id", 1), ("vehicle_id", 1), ("bucket_start", -1)], {}),
+    ]
+
+    @staticmethod
+    def append_readings(user_id, readings, bucket_size):
+        """Append readings to per-vehicle daily buckets holding at most bucket_size readings each."""
+        groups = {}
+        for reading in readings:
+            key = (reading["vehicle_id"], _bucket_start(reading["timestamp"]))
+            groups.setdefault(key, []).append(reading)
+
+        operations = []
+        now = datetime.now(timezone.utc)
+        for (vehicle_id, bucket_start), items in groups.items():
+            items.sort(key=lambda r: r["timestamp"])
+            for offset in range(0, len(items), bucket_size):
+                chunk = items[offset:offset + bucket_size]
+                entries = [
+                    {"ts": r["timestamp"], "odometer_km": r["odometer_km"], "engine_hours": r.get("engine_hours")}
+                    for r in chunk
+                ]
+                operations.append(
+                    UpdateOne(
+                        {
+                            "vehicle_id": vehicle_id,
+                            "bucket_start": bucket_start,
+                            "count": {"$lte": bucket_size - len(chunk)},
+                        },
+                        {
+                            "$push": {"readings": {"$each": entries}},
+                            "$inc": {"count": len(chunk)},
+                            "$min": {"first_ts": chunk[0]["timestamp"]},
+                            "$max": {"last_ts": chunk[-1]["timestamp"], "max_odometer_km": max(r["odometer_km"] for r in chunk)},
+                            "$set": {"updated_at": now},
+                            "$setOnInsert": {"user_id": user_id, "created_at": now},
+                        },
+                        upsert=True,
+                    )
+                )
+
+        if not operations:
+            return 0
+        get_db()[Telemetry.collection].bulk_write(operations, ordered=False)
+        return len(operations)
+
+    @staticmethod
+    def apply_to_vehicles(user_id, readings, vehicle_states, rate_alpha):
+        """Advance each vehicle's mileage and usage averages from its newest reading.
+
+        ``vehicle_states`` maps vehicle ids to their stored ``telemetry`` sub-document
+        (or None). Vehicles whose stored reading is newer than the batch are left as is.
+        """
+        latest = {}
+        earliest = {}
+        for reading in readings:
+            vehicle_id = reading["vehicle_id"]
+            if vehicle_id not in latest or reading["timestamp"] > latest[vehicle_id]["timestamp"]:
+                latest[vehicle_id] = reading
+            if vehicle_id not in earliest or reading["timestamp"] < earliest[vehicle_id]["timestamp"]:
+                earliest[vehicle_id] = reading
+
+        operations = []
+        now = datetime.now(timezone.utc)
+        for vehicle_id, newest in latest.items():
+            previous = vehicle_states.get(vehicle_id) or {}
+            previous_at = _as_utc(previous.get("last_at"))
+            if previous_at is not None and newest["timestamp"] <= previous_at:
+                continue
+
+            stats = Telemetry._next_stats(previous, previous_at, earliest[vehicle_id], newest, rate_alpha)
+            updates = {
+                "current_mileage": newest["odometer_km"],
+                "telemetry": {"$literal": stats},
+                "updated_at": now,
+                # Keep the indexed due margin in step with the new odometer reading.
+                "next_due_margin_km": {"$subtract": ["$next_due_km", newest["odometer_km"]]},
+            }
+            if newest.get("engine_hours") is not None:
+                updates["engine_hours"] = int(newest["engine_hours"])
+
+            # Guard on the stored timestamp so concurrent batches cannot move mileage backwards.
+            query = {"_id": ObjectId(vehicle_id), "user_id": user_id}
+            query["telemetry.last_at"] = previous.get("last_at") if previous_at is not None else {"$exists": False}
+            operations.append(UpdateOne(query, [{"$set": updates}]))
+
+        if not operations:
+            return 0
+        result = get_db()[Vehicle.collection].bulk_write(operations, ordered=False)
+        uow = current_unit_of_work()
+        if uow is not None:
+            uow.forget(Vehicle.collection)
+        return result.modified_count
+
+    @staticmethod
+    def _next_stats(previous, previous_at, first, newest, rate_alpha):
+        if previous_at is None:
+            base_at, base_km = first["timestamp"], first["odometer_km"]
+            stats = {"first_at": base_at, "first_km": base_km, "avg_km_daily": None}
+        else:
+            base_at, base_km = previous_at, previous.get("last_km", newest["odometer_km"])
+            stats = {
+                "first_at": previous.get("first_at"),
+                "first_km": previous.get("first_km"),
+                "avg_km_daily": previous.get("avg_km_daily"),
+            }
+
+        elapsed_days = (newest["timestamp"] - base_at) / timedelta(days=1)
+        driven_km = newest["odometer_km"] - base_km
+        if elapsed_days > 0 and driven_km >= 0:
+            rate = driven_km / elapsed_days
+            current = stats["avg_km_daily"]
+            stats["avg_km_daily"] = rate if current is None else rate_alpha * rate + (1 - rate_alpha) * current
+
+        daily = stats["avg_km_daily"]
+        stats.update(
+            {
+                "last_at": newest["timestamp"],
+                "last_km": newest["odometer_km"],
+                "avg_km_weekly": round(daily * 7, 2) if daily is not None else None,
+                "avg_km_monthly": round(daily * 30.44, 2) if daily is not None else None,
+            }
+        )
+        if daily is not None:
+            stats["avg_km_daily"] = round(daily, 3)
+        return stats
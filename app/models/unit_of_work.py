@@ -0,0 +1,116 @@
+import logging
+
+from flask import g, has_request_context
+
+from ..storage import get_repository
+from ..utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+MISSING = object()
+
+
+class UnitOfWork:
+    """Identity map and pending writes of one request.
+
+    Documents read through the model classes are remembered by (collection, key),
+    so a second lookup of the same document in the request is served from memory.
+    Writes through the models replace or forget the affected entries. Counter
+    updates registered with ``increment`` are coalesced per target document and
+    sent in one batch per collection when the request ends.
+    """
+
+    def __init__(self):
+        self._identities = {}
+        self._increments = {}
+
+    def get(self, collection, key):
+        """Return the remembered value for key, or MISSING when it was never loaded."""
+        value = self._identities.get((collection, key), MISSING)
+        metrics.incr("identity_map.hits" if value is not MISSING else "identity_map.misses")
+        return value
+
+    def remember(self, collection, key, value):
+        self._identities[(collection, key)] = value
+        return value
+
+    def forget(self, collection, key=None):
+        if key is not None:
+            self._identities.pop((collection, key), None)
+            return
+        for entry in [entry for entry in self._identities if entry[0] == collection]:
+            del self._identities[entry]
+
+    def increment(self, collection, query, inc, set_fields=None):
+        """Queue an upserting ``$inc`` on the document matching query."""
+        entry_key = (collection, tuple(sorted(query.items())))
+        entry = self._increments.get(entry_key)
+        if entry is None:
+            entry = self._increments[entry_key] = {"query": query, "inc": {}, "set": {}}
+        for field, amount in inc.items():
+            entry["inc"][field] = entry["inc"].get(field, 0) + amount
+        entry["set"].update(set_fields or {})
+
+    def flush(self):
+        """Send the queued writes; returns the number of operations sent."""
+        if not self._increments:
+            return 0
+        by_collection = {}
+        for (collection, _), entry in self._increments.items():
+            by_collection.setdefault(collection, []).append((entry["query"], entry["inc"], entry["set"]))
+        self._increments = {}
+
+        sent = 0
+        for collection, changes in by_collection.items():
+            sent += get_repository(collection).increment_many(changes)
+        metrics.observe("unit_of_work.flushed_operations", sent)
+        return sent
+
+
+def current_unit_of_work():
+    """The request's unit of work, or None outside a request (CLI commands, jobs)."""
+    if not has_request_context():
+        return None
+    if "unit_of_work" not in g:
+        g.unit_of_work = UnitOfWork()
+    return g.unit_of_work
+
+
+def load_once(collection, key, loader):
+    """Return loader()'s result for key, calling it at most once per request."""
+    uow = current_unit_of_work()
+    if uow is None:
+        return loader()
+    value = uow.get(collection, key)
+    if value is MISSING:
+        value = uow.remember(collection, key, loader())
+    return value
+
+
+def _flush_request_unit_of_work():
+    # The request's own writes are committed by now: a failed counter flush is
+    # logged rather than turning their response into an error. The lost
+    # increments are restored by `flask backfill-cost-rollups`.
+    uow = g.pop("unit_of_work", None)
+    if uow is None:
+        return
+    try:
+        uow.flush()
+    except Exception:
+        metrics.incr("unit_of_work.flush_errors")
+        logger.exception("Failed to flush pending writes; run backfill-cost-rollups to repair the rollups")
+
+
+def init_unit_of_work(app):
+    # Registered after init_db, so it runs before the query-count hook and the
+    # flushed writes are included in X-Mongo-Query-Count.
+    @app.after_request
+    def flush_unit_of_work(response):
+        _flush_request_unit_of_work()
+        return response
+
+    @app.teardown_request
+    def flush_unit_of_work_on_error(exc):
+        # after_request is skipped when the view raised; writes already made in
+        # the request still need their counters.
+        _flush_request_unit_of_work()
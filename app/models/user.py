@@ -2,9 +2,10 @@ from datetime import datetime, timezone
 
 from bson import ObjectId
 from bson.errors import InvalidId
-from werkzeug.security import check_password_hash, generate_password_hash
 
-from ..utils.db import get_db
+from ..storage import get_repository
+from ..utils import passwords
+from .unit_of_work import current_unit_of_work, load_once
 
 
 class User:
@@ -12,40 +13,48 @@ class User:
 
     @staticmethod
     def create(email, password, name=None, role="user"):
-        db = get_db()
         now = datetime.now(timezone.utc)
         normalized_role = (role or "user").strip().lower()
         if normalized_role not in {"user", "admin"}:
             normalized_role = "user"
         user = {
             "email": email,
-            "password_hash": generate_password_hash(password),
+            "password_hash": passwords.hash_password(password),
             "name": name,
             "role": normalized_role,
             "created_at": now,
         }
-        inserted = db[User.collection].insert_one(user)
-        user["_id"] = inserted.inserted_id
-        return User.serialize(user)
+        return User.serialize(get_repository(User.collection).insert(user))
 
     @staticmethod
     def find_by_email(email):
-        db = get_db()
-        user = db[User.collection].find_one({"email": email})
+        user = get_repository(User.collection).find_by_email(email)
         return User.serialize(user) if user else None
 
     @staticmethod
     def find_by_id(user_id):
-        db = get_db()
         try:
-            user = db[User.collection].find_one({"_id": ObjectId(user_id)})
+            object_id = ObjectId(user_id)
         except InvalidId:
             return None
-        return User.serialize(user) if user else None
+        user = load_once(User.collection, str(object_id), lambda: get_repository(User.collection).find_by_id(object_id))
+        return User.serialize(dict(user)) if user else None
 
     @staticmethod
     def verify_password(user, password):
-        return check_password_hash(user["password_hash"], password)
+        return passwords.verify_password(user["password_hash"], password)
+
+    @staticmethod
+    def rehash_password_if_needed(user, password):
+        if not passwords.needs_rehash(user["password_hash"]):
+            return False
+        new_hash = passwords.hash_password(password)
+        get_repository(User.collection).set_fields(ObjectId(user["_id"]), {"password_hash": new_hash})
+        user["password_hash"] = new_hash
+        uow = current_unit_of_work()
+        if uow is not None:
+            uow.forget(User.collection, str(user["_id"]))
+        return True
 
     @staticmethod
     def to_public(user):
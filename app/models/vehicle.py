@@ -1,13 +1,27 @@
+import random
 from datetime import datetime, timezone
 
 from bson import ObjectId
-from pymongo import ReturnDocument
 
+from ..storage import get_repository
+from ..utils.dates import storable_date
 from ..utils.db import get_db
+from .records import VehicleRecord
+from .unit_of_work import MISSING, current_unit_of_work, load_once
+
+# Vehicles carry a random shard_key in [0, SHARD_SPACE) so background scans can be split.
+SHARD_SPACE = 1024
 
 
 class Vehicle:
     collection = "vehicles"
+    indexes = [
+        ([("user_id", 1), ("created_at", -1)], {}),
+        ([("user_id", 1), ("next_due_date", 1)], {}),
+        ([("user_id", 1), ("next_due_margin_km", 1)], {}),
+        ([("shard_key", 1), ("next_due_date", 1)], {}),
+        ([("shard_key", 1), ("next_due_margin_km", 1)], {}),
+    ]
     updatable_fields = [
         "catalog_vehicle_id",
         "make",
@@ -34,7 +48,6 @@ class Vehicle:
 
     @staticmethod
     def create(user_id, payload):
-        db = get_db()
         now = datetime.now(timezone.utc)
         vehicle = {
             "user_id": user_id,
@@ -54,33 +67,89 @@ class Vehicle:
             "average_mileage_weekly": payload.get("average_mileage_weekly"),
             "average_mileage_monthly": payload.get("average_mileage_monthly"),
             "engine_hours": payload.get("engine_hours"),
-            "acquisition_date": payload.get("acquisition_date"),
+            "acquisition_date": storable_date(payload.get("acquisition_date")),
             "usage_type": payload.get("usage_type"),
             "driving_conditions": payload.get("driving_conditions"),
             "image_urls": payload.get("image_urls", []),
             "maintenance_history": payload.get("maintenance_history", {}),
+            "shard_key": random.randrange(SHARD_SPACE),
             "created_at": now,
             "updated_at": now,
         }
-        inserted = db[Vehicle.collection].insert_one(vehicle)
-        vehicle["_id"] = inserted.inserted_id
+        get_repository(Vehicle.collection).insert(vehicle)
+        Vehicle.remember(user_id, vehicle)
         return Vehicle.serialize(vehicle)
 
     @staticmethod
     def find_all_by_user(user_id):
-        db = get_db()
-        items = db[Vehicle.collection].find({"user_id": user_id}).sort("created_at", -1)
+        items = get_repository(Vehicle.collection).find_for_user(user_id)
         return [Vehicle.serialize(v) for v in items]
 
+    @staticmethod
+    def iter_by_user(user_id):
+        for vehicle in get_repository(Vehicle.collection).find_for_user(user_id, read_only=True):
+            yield Vehicle.serialize(vehicle)
+
     @staticmethod
     def find_by_id_for_user(vehicle_id, user_id):
-        db = get_db()
-        item = db[Vehicle.collection].find_one({"_id": ObjectId(vehicle_id), "user_id": user_id})
+        item = load_once(
+            Vehicle.collection,
+            (user_id, str(vehicle_id)),
+            lambda: get_repository(Vehicle.collection).find_one(vehicle_id, user_id),
+        )
         return Vehicle.serialize(item) if item else None
 
+    @staticmethod
+    def find_documents_for_user(user_id, vehicle_ids):
+        """Raw vehicle documents owned by user_id, reading only those not loaded in this request."""
+        uow = current_unit_of_work()
+        documents = []
+        missing = []
+        for vehicle_id in {str(v) for v in vehicle_ids if v and ObjectId.is_valid(v)}:
+            cached = uow.get(Vehicle.collection, (user_id, vehicle_id)) if uow is not None else MISSING
+            if cached is MISSING:
+                missing.append(vehicle_id)
+            elif cached:
+                documents.append(cached)
+        if missing:
+            for vehicle in get_repository(Vehicle.collection).find_for_user(user_id, vehicle_ids=missing):
+                documents.append(Vehicle.remember(user_id, vehicle))
+        return documents
+
+    @staticmethod
+    def remember(user_id, vehicle):
+        """Record the current state of a vehicle document in the request's identity map."""
+        uow = current_unit_of_work()
+        if uow is not None:
+            uow.remember(Vehicle.collection, (user_id, str(vehicle["_id"])), vehicle)
+        return vehicle
+
+    @staticmethod
+    def assign_missing_shard_keys(db=None):
+        db = db if db is not None else get_db()
+        result = db[Vehicle.collection].update_many(
+            {"shard_key": {"$exists": False}},
+            [{"$set": {"shard_key": {"$floor": {"$multiply": [{"$rand": {}}, SHARD_SPACE]}}}}],
+        )
+        return result.modified_count
+
+    @staticmethod
+    def find_due_for_user(user_id, due_before, margin_km, limit=200):
+        items = get_repository(Vehicle.collection).find_due(user_id, due_before, margin_km, limit)
+        return [Vehicle.serialize(v) for v in items]
+
+    @staticmethod
+    def find_owned_ids(user_id, vehicle_ids):
+        rows = get_repository(Vehicle.collection).find_for_user(user_id, vehicle_ids=vehicle_ids, fields=["_id"])
+        return {str(r["_id"]) for r in rows}
+
+    @staticmethod
+    def find_telemetry_states(user_id, vehicle_ids):
+        rows = get_repository(Vehicle.collection).find_for_user(user_id, vehicle_ids=vehicle_ids, fields=["telemetry"])
+        return {str(r["_id"]): r.get("telemetry") for r in rows}
+
     @staticmethod
     def update_for_user(vehicle_id, user_id, payload):
-        db = get_db()
         updates = {
             key: payload[key]
             for key in Vehicle.updatable_fields
@@ -88,53 +157,27 @@ class Vehicle:
         }
         if "mileage" in payload and "current_mileage" not in payload:
             updates["current_mileage"] = payload["mileage"]
+        if "acquisition_date" in updates:
+            updates["acquisition_date"] = storable_date(updates["acquisition_date"])
         if not updates:
             return None
 
         updates["updated_at"] = datetime.now(timezone.utc)
-        result = db[Vehicle.collection].find_one_and_update(
-            {"_id": ObjectId(vehicle_id), "user_id": user_id},
-            {"$set": updates},
-            return_document=ReturnDocument.AFTER,
-        )
-        return Vehicle.serialize(result) if result else None
+        result = get_repository(Vehicle.collection).update(vehicle_id, user_id, updates)
+        if not result:
+            return None
+        return Vehicle.serialize(Vehicle.remember(user_id, result))
 
     @staticmethod
     def delete_for_user(vehicle_id, user_id):
-        db = get_db()
-        result = db[Vehicle.collection].delete_one({"_id": ObjectId(vehicle_id), "user_id": user_id})
-        return result.deleted_count > 0
+        deleted = get_repository(Vehicle.collection).delete(vehicle_id, user_id)
+        uow = current_unit_of_work()
+        if uow is not None:
+            uow.forget(Vehicle.collection, (user_id, str(vehicle_id)))
+        return deleted
 
     @staticmethod
     def serialize(vehicle):
         if not vehicle:
             return None
-        vehicle["id"] = str(vehicle.pop("_id"))
-        return {
-            "id": vehicle["id"],
-            "user_id": vehicle["user_id"],
-            "catalog_vehicle_id": vehicle.get("catalog_vehicle_id"),
-            "make": vehicle.get("make"),
-            "model": vehicle.get("model"),
-            "year": vehicle.get("year"),
-            "vehicle_type": vehicle.get("vehicle_type"),
-            "fuel_type": vehicle.get("fuel_type"),
-            "cylinders": vehicle.get("cylinders"),
-            "transmission": vehicle.get("transmission"),
-            "vin": vehicle.get("vin"),
-            "license_plate": vehicle.get("license_plate"),
-            "color": vehicle.get("color"),
-            "current_mileage": vehicle.get("current_mileage"),
-            "mileage": vehicle.get("current_mileage"),
-            "average_mileage_daily": vehicle.get("average_mileage_daily"),
-            "average_mileage_weekly": vehicle.get("average_mileage_weekly"),
-            "average_mileage_monthly": vehicle.get("average_mileage_monthly"),
-            "engine_hours": vehicle.get("engine_hours"),
-            "acquisition_date": vehicle.get("acquisition_date"),
-            "usage_type": vehicle.get("usage_type"),
-            "driving_conditions": vehicle.get("driving_conditions"),
-            "image_urls": vehicle.get("image_urls", []),
-            "maintenance_history": vehicle.get("maintenance_history", {}),
-            "created_at": vehicle.get("created_at").isoformat() if vehicle.get("created_at") else None,
-            "updated_at": vehicle.get("updated_at").isoformat() if vehicle.get("updated_at") else None,
-        }
+        return VehicleRecord.from_document(vehicle).to_public()
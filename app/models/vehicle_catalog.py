@@ -1,64 +1,93 @@
+import threading
+import time
 from datetime import datetime, timezone
 
-from ..utils.db import get_db
+from flask import current_app
+
+from ..storage import get_repository
+from ..utils.search import SearchIndex
+from .records import CatalogRecord
+
+SEARCH_FIELDS = {"make": 1.0, "model": 1.0, "vehicle_type": 0.5, "fuel_type": 0.5}
+
+_search_lock = threading.Lock()
+_search_state = {"index": None, "built_at": 0.0}
 
 
 class VehicleCatalog:
     collection = "vehicle_catalog"
+    indexes = [
+        ([("id", 1)], {"unique": True}),
+        ([("make", 1)], {}),
+    ]
 
     @staticmethod
     def upsert_many(items):
-        db = get_db()
         now = datetime.now(timezone.utc)
-        upserted = 0
+        payloads = []
 
         for item in items:
             catalog_id = (item.get("id") or "").strip().lower()
             if not catalog_id:
                 continue
 
-            payload = {
-                "id": catalog_id,
-                "make": item.get("make"),
-                "model": item.get("model"),
-                "vehicle_type": item.get("vehicle_type"),
-                "fuel_type": item.get("fuel_type"),
-                "transmission": item.get("transmission"),
-                "image_urls": item.get("image_urls", []),
-                "updated_at": now,
-            }
-            result = db[VehicleCatalog.collection].update_one(
-                {"id": catalog_id},
-                {"$set": payload, "$setOnInsert": {"created_at": now}},
-                upsert=True,
+            payloads.append(
+                {
+                    "id": catalog_id,
+                    "make": item.get("make"),
+                    "model": item.get("model"),
+                    "vehicle_type": item.get("vehicle_type"),
+                    "fuel_type": item.get("fuel_type"),
+                    "transmission": item.get("transmission"),
+                    "image_urls": item.get("image_urls", []),
+                    "updated_at": now,
+                }
             )
-            if result.upserted_id is not None:
-                upserted += 1
 
+        upserted = get_repository(VehicleCatalog.collection).upsert_many(payloads, now)
+        VehicleCatalog.rebuild_search_index()
         return upserted
 
     @staticmethod
-    def find_all():
-        db = get_db()
-        rows = db[VehicleCatalog.collection].find({}).sort("make", 1)
+    def find_all(read_only=True):
+        rows = get_repository(VehicleCatalog.collection).find_all(read_only=read_only)
         return [VehicleCatalog.serialize(r) for r in rows]
 
     @staticmethod
     def find_by_id(catalog_id):
-        db = get_db()
-        row = db[VehicleCatalog.collection].find_one({"id": catalog_id})
+        row = get_repository(VehicleCatalog.collection).find_by_id(catalog_id)
         return VehicleCatalog.serialize(row) if row else None
 
+    @staticmethod
+    def rebuild_search_index():
+        # Read from the primary: a rebuild right after upsert_many must not see a
+        # lagging secondary, and a periodic one must not replace a fresh index
+        # with a stale one.
+        index = SearchIndex(VehicleCatalog.find_all(read_only=False), SEARCH_FIELDS, sort_keys=("make", "model"))
+        with _search_lock:
+            _search_state["index"] = index
+            _search_state["built_at"] = time.monotonic()
+        return index
+
+    @staticmethod
+    def search_index():
+        """Return this process's catalog index, rebuilding it once it is older than
+        CATALOG_SEARCH_REFRESH_SECONDS so upserts made by other workers show up."""
+        index = _search_state["index"]
+        age = time.monotonic() - _search_state["built_at"]
+        if index is None or age > current_app.config["CATALOG_SEARCH_REFRESH_SECONDS"]:
+            index = VehicleCatalog.rebuild_search_index()
+        return index
+
+    @staticmethod
+    def search(query, limit=10):
+        return [
+            {**item, "score": score}
+            for item, score in VehicleCatalog.search_index().search(query, limit=limit)
+        ]
+
     @staticmethod
     def serialize(row):
         if not row:
             return None
-        return {
-            "id": row.get("id"),
-            "make": row.get("make"),
-            "model": row.get("model"),
-            "vehicle_type": row.get("vehicle_type"),
-            "fuel_type": row.get("fuel_type"),
-            "transmission": row.get("transmission"),
-            "image_urls": row.get("image_urls", []),
-        }
+        return CatalogRecord.from_document(row).to_public()
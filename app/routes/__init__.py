@@ -1,7 +1,11 @@
+from .analytics import analytics_bp
 from .auth import auth_bp
 from .catalog import catalog_bp
+from .dashboard import dashboard_bp
 from .maintenance import maintenance_bp
+from .ml_models import models_bp
 from .predictions import predictions_bp
+from .telemetry import telemetry_bp
 from .vehicles import vehicles_bp
 
-__all__ = ["auth_bp", "catalog_bp", "vehicles_bp", "maintenance_bp", "predictions_bp"]
+__all__ = ["auth_bp", "catalog_bp", "vehicles_bp", "maintenance_bp", "predictions_bp", "telemetry_bp", "analytics_bp", "models_bp", "dashboard_bp"]
@@ -0,0 +1,63 @@
+import re
+from datetime import datetime
+
+from bson import ObjectId
+from flask import Blueprint, request
+
+from ..models import CostRollup
+from ..utils.decorators import token_required
+
+analytics_bp = Blueprint("analytics", __name__)
+
+_MONTH_RE = re.compile(r"^\d{4}-(0[1-9]|1[0-2])$")
+GROUP_BY_CHOICES = ("month", "vehicle", "service_type")
+
+
+def _months_back(month, count):
+    year, number = int(month[:4]), int(month[5:])
+    index = year * 12 + number - 1 - count
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def _summarize(items, group_by):
+    key_name = "vehicle_id" if group_by == "vehicle" else group_by
+    groups = {}
+    for item in items:
+        group = groups.setdefault(item[key_name], {key_name: item[key_name], "total_cost": 0, "count": 0})
+        group["total_cost"] += item["total_cost"]
+        group["count"] += item["count"]
+    for group in groups.values():
+        group["total_cost"] = round(group["total_cost"], 2)
+    return list(groups.values())
+
+
+@analytics_bp.get("/costs")
+@token_required
+def get_costs(current_user):
+    end_month = request.args.get("to") or datetime.utcnow().strftime("%Y-%m")
+    if not _MONTH_RE.match(end_month):
+        return {"error": "from and to must use YYYY-MM format"}, 400
+    start_month = request.args.get("from") or _months_back(end_month, 11)
+    if not _MONTH_RE.match(start_month):
+        return {"error": "from and to must use YYYY-MM format"}, 400
+    if start_month > end_month:
+        return {"error": "from must not be after to"}, 400
+
+    vehicle_id = request.args.get("vehicle_id")
+    if vehicle_id and not ObjectId.is_valid(vehicle_id):
+        return {"error": "Invalid vehicle id"}, 400
+
+    group_by = request.args.get("group_by", "month")
+    if group_by not in GROUP_BY_CHOICES:
+        return {"error": f"group_by must be one of: {', '.join(GROUP_BY_CHOICES)}"}, 400
+
+    items = CostRollup.find_range(current_user["_id"], start_month, end_month, vehicle_id=vehicle_id)
+    return {
+        "from": start_month,
+        "to": end_month,
+        "group_by": group_by,
+        "total_cost": round(sum(item["total_cost"] for item in items), 2),
+        "count": sum(item["count"] for item in items),
+        "groups": _summarize(items, group_by),
+        "items": items,
+    }, 200
@@ -2,6 +2,8 @@ from flask import Blueprint, request
 
 from ..models import User
 from ..utils.decorators import token_required
+from ..utils.metrics import metrics
+from ..utils.passwords import PasswordHasherBusy
 from ..utils.validators import validate_email, validate_password
 from .shared import create_access_token
 
@@ -23,7 +25,10 @@ def register():
     if User.find_by_email(email):
         return {"error": "Email already registered"}, 409
 
-    created = User.create(email=email, password=password, name=name)
+    try:
+        created = User.create(email=email, password=password, name=name)
+    except PasswordHasherBusy:
+        return {"error": "Service is saturated, retry later"}, 503, {"Retry-After": "1"}
     return {"user": User.to_public(created)}, 201
 
 
@@ -34,8 +39,13 @@ def login():
     password = payload.get("password") or ""
 
     user = User.find_by_email(email)
-    if not user or not User.verify_password(user, password):
-        return {"error": "Invalid credentials"}, 401
+    try:
+        if not user or not User.verify_password(user, password):
+            return {"error": "Invalid credentials"}, 401
+        if User.rehash_password_if_needed(user, password):
+            metrics.incr("auth.password_rehashed")
+    except PasswordHasherBusy:
+        return {"error": "Service is saturated, retry later"}, 503, {"Retry-After": "1"}
 
     token = create_access_token(user["_id"])
     return {"access_token": token, "user": User.to_public(user)}, 200
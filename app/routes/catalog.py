@@ -33,6 +33,20 @@ def list_catalog_vehicles():
     return {"items": items}, 200
 
 
+@catalog_bp.get("/search")
+def search_catalog_vehicles():
+    query = (request.args.get("q") or "").strip()
+    if not query:
+        return {"error": "q is required"}, 400
+    try:
+        limit = min(50, max(1, int(request.args.get("limit", 10))))
+    except ValueError:
+        return {"error": "limit must be an integer"}, 400
+
+    items = VehicleCatalog.search(query, limit=limit)
+    return {"items": items, "query": query}, 200
+
+
 @catalog_bp.get("/vehicles/<catalog_id>")
 def get_catalog_vehicle(catalog_id):
     item = VehicleCatalog.find_by_id(catalog_id)
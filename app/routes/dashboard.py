@@ -0,0 +1,14 @@
+from flask import Blueprint
+
+from ..models.dashboard import dashboard_for_user
+from ..storage import mongo_backend_required
+from ..utils.decorators import token_required
+
+dashboard_bp = Blueprint("dashboard", __name__)
+dashboard_bp.before_request(mongo_backend_required)
+
+
+@dashboard_bp.get("")
+@token_required
+def get_dashboard(current_user):
+    return dashboard_for_user(current_user["_id"]), 200
@@ -1,12 +1,19 @@
+import re
+
 from bson import ObjectId
-from flask import Blueprint, request
+from flask import Blueprint, current_app, request
 
 from ..models import Maintenance, Vehicle
+from ..models.due import refresh_due_fields
+from ..utils.bulk_io import export_response, iter_csv_rows, iter_ndjson_rows, parse_export_options
+from ..utils.dates import parse_date
 from ..utils.decorators import token_required
-from ..utils.validators import validate_maintenance_payload
+from ..utils.validators import validate_maintenance_payload, validate_maintenance_payloads
 
 maintenance_bp = Blueprint("maintenance", __name__)
 
+_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
 
 @maintenance_bp.post("")
 @token_required
@@ -25,9 +32,118 @@ def create_maintenance(current_user):
         return {"error": "Vehicle not found"}, 404
 
     item = Maintenance.create(current_user["_id"], payload)
+    refresh_due_fields(current_user["_id"], [vehicle_id])
     return {"maintenance": item}, 201
 
 
+def _record_import_error(report, row_number, messages):
+    report["failed"] += 1
+    if len(report["errors"]) < report["max_errors"]:
+        report["errors"].append({"row": row_number, "errors": messages})
+    else:
+        report["errors_truncated"] = True
+
+
+def _flush_import_batch(user_id, pending, ownership, report):
+    results = validate_maintenance_payloads([payload for _, payload in pending], partial=False)
+    batch = []
+    for (row_number, payload), errors in zip(pending, results):
+        if not errors and not ObjectId.is_valid(payload["vehicle_id"]):
+            errors = ["Invalid vehicle id"]
+        if errors:
+            _record_import_error(report, row_number, errors)
+            continue
+        batch.append((row_number, payload))
+
+    unknown = {payload["vehicle_id"] for _, payload in batch} - ownership["owned"] - ownership["missing"]
+    if unknown:
+        owned = Vehicle.find_owned_ids(user_id, unknown)
+        ownership["owned"] |= owned
+        ownership["missing"] |= unknown - owned
+
+    rows = []
+    payloads = []
+    for row_number, payload in batch:
+        if payload["vehicle_id"] not in ownership["owned"]:
+            _record_import_error(report, row_number, ["Vehicle not found"])
+            continue
+        rows.append(row_number)
+        payloads.append(payload)
+
+    inserted, failures = Maintenance.insert_many(user_id, payloads)
+    report["inserted"] += inserted
+    for index, message in sorted(failures.items()):
+        _record_import_error(report, rows[index], [message])
+    if inserted:
+        report["vehicle_ids"].update(p["vehicle_id"] for i, p in enumerate(payloads) if i not in failures)
+
+
+@maintenance_bp.post("/import")
+@token_required
+def import_maintenance(current_user):
+    import_format = (request.args.get("format") or "").lower()
+    if not import_format:
+        import_format = "csv" if request.mimetype == "text/csv" else "ndjson"
+    if import_format not in {"csv", "ndjson"}:
+        return {"error": "format must be one of: ndjson, csv"}, 400
+
+    rows = iter_csv_rows(request.stream) if import_format == "csv" else iter_ndjson_rows(request.stream)
+    batch_size = current_app.config["MAINTENANCE_IMPORT_BATCH_SIZE"]
+    report = {
+        "total_rows": 0,
+        "inserted": 0,
+        "failed": 0,
+        "errors": [],
+        "max_errors": current_app.config["MAINTENANCE_IMPORT_MAX_ERRORS"],
+        "vehicle_ids": set(),
+    }
+    ownership = {"owned": set(), "missing": set()}
+    pending = []
+
+    for row_number, payload, parse_error in rows:
+        report["total_rows"] += 1
+        if parse_error:
+            _record_import_error(report, row_number, [parse_error])
+            continue
+
+        pending.append((row_number, payload))
+        if len(pending) >= batch_size:
+            _flush_import_batch(current_user["_id"], pending, ownership, report)
+            pending = []
+
+    if pending:
+        _flush_import_batch(current_user["_id"], pending, ownership, report)
+
+    refresh_due_fields(current_user["_id"], report.pop("vehicle_ids"))
+    report.pop("max_errors")
+    report["errors"].sort(key=lambda e: e["row"])
+    return report, 200
+
+
+@maintenance_bp.get("/export")
+@token_required
+def export_maintenance(current_user):
+    export_format, compress = parse_export_options(request)
+    if not export_format:
+        return {"error": "format must be one of: ndjson, csv"}, 400
+
+    vehicle_id = request.args.get("vehicle_id")
+    if vehicle_id and not ObjectId.is_valid(vehicle_id):
+        return {"error": "Invalid vehicle id"}, 400
+
+    start_date, end_date = request.args.get("from"), request.args.get("to")
+    for value in (start_date, end_date):
+        if value and not (_DATE_RE.match(value) and parse_date(value)):
+            return {"error": "from and to must use YYYY-MM-DD format"}, 400
+    if start_date and end_date and start_date > end_date:
+        return {"error": "from must not be after to"}, 400
+
+    rows = Maintenance.iter_by_user(
+        current_user["_id"], vehicle_id=vehicle_id, start_date=start_date, end_date=end_date
+    )
+    return export_response(rows, export_format, "maintenance", compress=compress)
+
+
 @maintenance_bp.get("/<vehicle_id>")
 @token_required
 def list_maintenance(current_user, vehicle_id):
@@ -57,6 +173,7 @@ def update_maintenance(current_user, maintenance_id):
     if not item:
         return {"error": "Maintenance record not found or empty payload"}, 404
 
+    refresh_due_fields(current_user["_id"], [item["vehicle_id"]])
     return {"maintenance": item}, 200
 
 
@@ -70,4 +187,5 @@ def delete_maintenance(current_user, maintenance_id):
     if not deleted:
         return {"error": "Maintenance record not found"}, 404
 
+    refresh_due_fields(current_user["_id"], [deleted.get("vehicle_id")])
     return {"status": "deleted"}, 200
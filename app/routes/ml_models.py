@@ -0,0 +1,45 @@
+from flask import Blueprint, current_app, request
+
+from ..jobs.retrain import TRAINERS
+from ..ml_model.predict import get_model_store
+from ..utils.decorators import admin_required
+
+models_bp = Blueprint("models", __name__)
+
+
+def _retrain_manager():
+    return current_app.extensions["model_retrain"]
+
+
+@models_bp.post("/retrain")
+@admin_required
+def start_retrain(current_user):
+    payload = request.get_json(silent=True) or {}
+    mode = payload.get("mode", "train") if isinstance(payload, dict) else "train"
+    if not isinstance(mode, str) or mode not in TRAINERS:
+        return {"error": f"mode must be one of {', '.join(TRAINERS)}"}, 400
+    job = _retrain_manager().start(requested_by=current_user["_id"], mode=mode)
+    if job is None:
+        return {"error": "A retraining job is already running"}, 409
+    return {"job": job}, 202
+
+
+@models_bp.get("/retrain/<job_id>")
+@admin_required
+def get_retrain_status(current_user, job_id):
+    job = _retrain_manager().registry.read_job(job_id)
+    if not job:
+        return {"error": "Retraining job not found"}, 404
+    return {"job": job}, 200
+
+
+@models_bp.get("/current")
+@admin_required
+def get_current_models(current_user):
+    registry = _retrain_manager().registry
+    version = registry.current_version()
+    return {
+        "version": version,
+        "serving_version": get_model_store().current_version(),
+        "manifest": registry.manifest(version),
+    }, 200
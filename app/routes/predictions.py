@@ -1,16 +1,18 @@
-from datetime import datetime, timezone
-
 from bson import ObjectId
-from flask import Blueprint, request
+from flask import Blueprint, current_app, request
 
 from ..ml_model.predict import (
     estimate_next_maintenance_cost,
+    inference_deadline,
     load_intervals,
     predict_next_maintenance,
 )
-from ..models import Maintenance, Vehicle
-from ..utils.db import get_db
+from ..ml_model.scenarios import evaluate_scenarios
+from ..models import Maintenance, Prediction, Vehicle
+from ..utils.admission import get_admission_controller
+from ..utils.bulk_io import export_response, parse_export_options
 from ..utils.decorators import token_required
+from ..utils.validators import validate_scenario_grid
 
 predictions_bp = Blueprint("predictions", __name__)
 
@@ -18,6 +20,8 @@ predictions_bp = Blueprint("predictions", __name__)
 @predictions_bp.post("/predict/<vehicle_id>")
 @token_required
 def generate_prediction(current_user, vehicle_id):
+    # The budget covers the whole request, including the admission queue wait.
+    deadline = inference_deadline()
     if not ObjectId.is_valid(vehicle_id):
         return {"error": "Invalid vehicle id"}, 400
 
@@ -28,50 +32,90 @@ def generate_prediction(current_user, vehicle_id):
     payload = request.get_json(silent=True) or {}
     service_type = payload.get("service_type", "major_service")
 
-    history = Maintenance.find_by_vehicle(current_user["_id"], vehicle_id)
+    history = Maintenance.find_documents_by_vehicle(current_user["_id"], vehicle_id)
     intervals = load_intervals()
 
-    maintenance_schedule = predict_next_maintenance(vehicle, history, intervals)
-    cost_prediction = estimate_next_maintenance_cost(vehicle, history, service_type=service_type)
+    limiter = get_admission_controller("predict")
+    if not limiter.acquire():
+        return limiter.saturated_response()
+    try:
+        maintenance_schedule = predict_next_maintenance(vehicle, history, intervals, deadline=deadline)
+        cost_prediction = estimate_next_maintenance_cost(
+            vehicle, history, service_type=service_type, deadline=deadline
+        )
+    finally:
+        limiter.release()
 
     prediction = {
         "maintenance_schedule": maintenance_schedule,
         "cost_prediction": cost_prediction,
     }
 
-    db = get_db()
-    db["predictions"].insert_one(
-        {
-            "user_id": current_user["_id"],
-            "vehicle_id": vehicle_id,
-            "prediction": prediction,
-            "created_at": datetime.now(timezone.utc),
-        }
-    )
-
+    Prediction.create(current_user["_id"], vehicle_id, prediction)
     return {"prediction": prediction}, 201
 
 
+@predictions_bp.post("/predict/<vehicle_id>/scenarios")
+@token_required
+def evaluate_prediction_scenarios(current_user, vehicle_id):
+    if not ObjectId.is_valid(vehicle_id):
+        return {"error": "Invalid vehicle id"}, 400
+
+    payload = request.get_json(silent=True) or {}
+    errors = validate_scenario_grid(payload, current_app.config["PREDICT_MAX_SCENARIOS"])
+    if errors:
+        return {"errors": errors}, 400
+
+    vehicle = Vehicle.find_by_id_for_user(vehicle_id, current_user["_id"])
+    if not vehicle:
+        return {"error": "Vehicle not found"}, 404
+
+    axes = {key: payload[key] for key in payload if key in ("service_types", "mileages", "monthly_mileages")}
+    for key in ("usage_types", "driving_conditions"):
+        if key in payload:
+            axes[key] = [value.lower() for value in payload[key]]
+
+    history = Maintenance.find_documents_by_vehicle(current_user["_id"], vehicle_id)
+    intervals = load_intervals()
+
+    limiter = get_admission_controller("predict")
+    if not limiter.acquire():
+        return limiter.saturated_response()
+    try:
+        result = evaluate_scenarios(
+            vehicle, history, axes, default_interval_km=int(intervals.get("oil_change_km", 10000))
+        )
+    finally:
+        limiter.release()
+
+    return {"vehicle_id": vehicle_id, **result}, 200
+
+
 @predictions_bp.get("/predictions/<vehicle_id>")
 @token_required
 def get_predictions(current_user, vehicle_id):
     if not ObjectId.is_valid(vehicle_id):
         return {"error": "Invalid vehicle id"}, 400
 
-    db = get_db()
-    records = db["predictions"].find(
-        {"user_id": current_user["_id"], "vehicle_id": vehicle_id}
-    ).sort("created_at", -1)
-
-    items = []
-    for rec in records:
-        items.append(
-            {
-                "id": str(rec["_id"]),
-                "vehicle_id": rec["vehicle_id"],
-                "prediction": rec["prediction"],
-                "created_at": rec["created_at"].isoformat() if rec.get("created_at") else None,
-            }
-        )
+    try:
+        limit = max(0, int(request.args.get("limit", 0)))
+    except ValueError:
+        return {"error": "limit must be an integer"}, 400
 
+    items = Prediction.find_by_vehicle(current_user["_id"], vehicle_id, limit=limit)
     return {"items": items}, 200
+
+
+@predictions_bp.get("/predictions/export")
+@token_required
+def export_predictions(current_user):
+    export_format, compress = parse_export_options(request)
+    if not export_format:
+        return {"error": "format must be one of: ndjson, csv"}, 400
+
+    vehicle_id = request.args.get("vehicle_id")
+    if vehicle_id and not ObjectId.is_valid(vehicle_id):
+        return {"error": "Invalid vehicle id"}, 400
+
+    rows = Prediction.iter_by_user(current_user["_id"], vehicle_id=vehicle_id)
+    return export_response(rows, export_format, "predictions", compress=compress)
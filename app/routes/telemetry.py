@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+from flask import Blueprint, current_app, request
+
+from ..models import Telemetry, Vehicle
+from ..storage import mongo_backend_required
+from ..utils.decorators import token_required
+from ..utils.metrics import metrics
+from ..utils.validators import validate_telemetry_readings
+
+telemetry_bp = Blueprint("telemetry", __name__)
+telemetry_bp.before_request(mongo_backend_required)
+
+
+def _parse_timestamp(value):
+    try:
+        parsed = datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+@telemetry_bp.post("")
+@token_required
+def ingest_telemetry(current_user):
+    payload = request.get_json(silent=True) or {}
+    readings = payload.get("readings") if isinstance(payload, dict) else None
+    if not isinstance(readings, list) or not readings:
+        return {"error": "readings must be a non-empty list"}, 400
+
+    max_batch = current_app.config["TELEMETRY_MAX_BATCH"]
+    if len(readings) > max_batch:
+        return {"error": f"at most {max_batch} readings per request"}, 413
+
+    # Readings stamped past this come from a wrong device clock and would pin
+    # the vehicle's last reading (and mileage) in the future.
+    latest_allowed = datetime.now(timezone.utc) + timedelta(seconds=current_app.config["TELEMETRY_MAX_CLOCK_SKEW_S"])
+    errors = []
+    accepted = []
+    results = validate_telemetry_readings([r if isinstance(r, dict) else {} for r in readings])
+    for index, (reading, reading_errors) in enumerate(zip(readings, results)):
+        if not isinstance(reading, dict):
+            errors.append({"index": index, "errors": ["reading must be an object"]})
+            continue
+        if reading_errors:
+            errors.append({"index": index, "errors": reading_errors})
+            continue
+        timestamp = _parse_timestamp(reading["timestamp"])
+        if timestamp is None:
+            errors.append({"index": index, "errors": ["timestamp must be ISO 8601"]})
+            continue
+        if timestamp > latest_allowed:
+            errors.append({"index": index, "errors": ["timestamp is in the future"]})
+            continue
+        if not ObjectId.is_valid(reading["vehicle_id"]):
+            errors.append({"index": index, "errors": ["Invalid vehicle id"]})
+            continue
+        accepted.append((index, {**reading, "timestamp": timestamp}))
+
+    vehicle_states = Vehicle.find_telemetry_states(
+        current_user["_id"], {reading["vehicle_id"] for _, reading in accepted}
+    )
+    owned = []
+    for index, reading in accepted:
+        if reading["vehicle_id"] not in vehicle_states:
+            errors.append({"index": index, "errors": ["Vehicle not found"]})
+            continue
+        owned.append(reading)
+
+    Telemetry.append_readings(current_user["_id"], owned, current_app.config["TELEMETRY_BUCKET_SIZE"])
+    updated = Telemetry.apply_to_vehicles(
+        current_user["_id"], owned, vehicle_states, current_app.config["TELEMETRY_RATE_ALPHA"]
+    )
+
+    metrics.incr("telemetry.readings_accepted", len(owned))
+    metrics.incr("telemetry.readings_rejected", len(readings) - len(owned))
+    errors.sort(key=lambda e: e["index"])
+    return {"accepted": len(owned), "rejected": len(errors), "vehicles_updated": updated, "errors": errors}, 202
@@ -1,8 +1,13 @@
+from datetime import datetime, timedelta
+
 from bson import ObjectId
-from flask import Blueprint, request
+from flask import Blueprint, current_app, request
 
 from ..models import Vehicle
+from ..models.due import forecast_for_user, refresh_vehicle_due
 from ..models.vehicle_catalog import VehicleCatalog
+from ..utils.admission import get_admission_controller
+from ..utils.bulk_io import export_response, parse_export_options
 from ..utils.decorators import token_required
 from ..utils.validators import validate_vehicle_payload
 
@@ -41,6 +46,7 @@ def create_vehicle(current_user):
         return {"errors": errors}, 400
 
     item = Vehicle.create(current_user["_id"], payload)
+    item = refresh_vehicle_due(current_user["_id"], item["id"]) or item
     return {"vehicle": item}, 201
 
 
@@ -51,6 +57,72 @@ def list_vehicles(current_user):
     return {"items": items}, 200
 
 
+@vehicles_bp.get("/export")
+@token_required
+def export_vehicles(current_user):
+    export_format, compress = parse_export_options(request)
+    if not export_format:
+        return {"error": "format must be one of: ndjson, csv"}, 400
+
+    rows = Vehicle.iter_by_user(current_user["_id"])
+    return export_response(rows, export_format, "vehicles", compress=compress)
+
+
+@vehicles_bp.get("/due")
+@token_required
+def list_due_vehicles(current_user):
+    try:
+        days = int(request.args.get("days", 30))
+        km = int(request.args.get("km", 1000))
+    except ValueError:
+        return {"error": "days and km must be integers"}, 400
+    max_days, max_km = current_app.config["DUE_MAX_DAYS"], current_app.config["DUE_MAX_KM"]
+    if not 0 <= days <= max_days:
+        return {"error": f"days must be between 0 and {max_days}"}, 400
+    if not 0 <= km <= max_km:
+        return {"error": f"km must be between 0 and {max_km}"}, 400
+
+    due_before = datetime.utcnow() + timedelta(days=days)
+    items = Vehicle.find_due_for_user(current_user["_id"], due_before, km)
+    return {"items": items, "days": days, "km": km}, 200
+
+
+def _forecast_response(current_user, vehicle_id=None):
+    try:
+        years = float(request.args.get("years", 5))
+    except ValueError:
+        return {"error": "years must be a number"}, 400
+    max_years = current_app.config["FORECAST_MAX_YEARS"]
+    if not 0 < years <= max_years:
+        return {"error": f"years must be between 0 and {max_years}"}, 400
+
+    limiter = get_admission_controller("predict")
+    if not limiter.acquire():
+        return limiter.saturated_response()
+    try:
+        forecast = forecast_for_user(current_user["_id"], round(years * 365.25), vehicle_id=vehicle_id)
+    finally:
+        limiter.release()
+
+    if forecast is None:
+        return {"error": "Vehicle not found"}, 404
+    return {"years": years, **forecast}, 200
+
+
+@vehicles_bp.get("/forecast")
+@token_required
+def forecast_fleet(current_user):
+    return _forecast_response(current_user)
+
+
+@vehicles_bp.get("/<vehicle_id>/forecast")
+@token_required
+def forecast_vehicle(current_user, vehicle_id):
+    if not ObjectId.is_valid(vehicle_id):
+        return {"error": "Invalid vehicle id"}, 400
+    return _forecast_response(current_user, vehicle_id)
+
+
 @vehicles_bp.get("/<vehicle_id>")
 @token_required
 def get_vehicle(current_user, vehicle_id):
@@ -83,6 +155,7 @@ def update_vehicle(current_user, vehicle_id):
     if not vehicle:
         return {"error": "Vehicle not found or empty payload"}, 404
 
+    vehicle = refresh_vehicle_due(current_user["_id"], vehicle_id) or vehicle
     return {"vehicle": vehicle}, 200
 
 
@@ -0,0 +1,34 @@
+from flask import current_app
+
+from .mongo import MongoStorage
+from .sqlite import SQLiteStorage
+
+BACKENDS = {"mongo": MongoStorage, "sqlite": SQLiteStorage}
+
+
+def init_storage(app):
+    backend = app.config["STORAGE_BACKEND"]
+    if backend not in BACKENDS:
+        raise ValueError(f"STORAGE_BACKEND must be one of: {', '.join(BACKENDS)}")
+    app.extensions["storage"] = BACKENDS[backend](app)
+    return app.extensions["storage"]
+
+
+def get_storage():
+    return current_app.extensions["storage"]
+
+
+def get_repository(collection):
+    """The configured backend's repository for a model's collection."""
+    return get_storage().repository(collection)
+
+
+def mongo_backend_required():
+    # before_request hook of blueprints built on Mongo-only features (time-series
+    # buckets, aggregation pipelines).
+    if get_storage().name != "mongo":
+        return {"error": f"Not available with the {get_storage().name} storage backend"}, 501
+    return None
+
+
+__all__ = ["init_storage", "get_storage", "get_repository", "mongo_backend_required"]
@@ -0,0 +1,266 @@
+from bson import ObjectId
+from flask import current_app
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from ..utils.dates import mongo_date
+from ..utils.db import get_db
+
+
+def _object_ids(values):
+    return [ObjectId(v) for v in values if v and ObjectId.is_valid(v)]
+
+
+def _date_range(field, start, end):
+    """$or branches matching field in [start, end) as a BSON date or as a "YYYY-MM-DD" string.
+
+    Both branches are needed until the date migration has run; each one is
+    served by the same index, and the string branch matches nothing afterwards.
+    """
+    as_date, as_string = {}, {}
+    if start is not None:
+        as_date["$gte"], as_string["$gte"] = start, start.date().isoformat()
+    if end is not None:
+        as_date["$lt"], as_string["$lt"] = end, end.date().isoformat()
+    return [{field: as_date}, {field: as_string}]
+
+
+class MongoUserRepository:
+    collection = "users"
+
+    def insert(self, doc):
+        doc["_id"] = get_db()[self.collection].insert_one(doc).inserted_id
+        return doc
+
+    def find_by_email(self, email):
+        return get_db()[self.collection].find_one({"email": email})
+
+    def find_by_id(self, user_id):
+        return get_db()[self.collection].find_one({"_id": ObjectId(user_id)})
+
+    def set_fields(self, user_id, fields):
+        get_db()[self.collection].update_one({"_id": ObjectId(user_id)}, {"$set": fields})
+
+
+class MongoVehicleRepository:
+    collection = "vehicles"
+
+    def insert(self, doc):
+        doc["_id"] = get_db()[self.collection].insert_one(doc).inserted_id
+        return doc
+
+    def find_one(self, vehicle_id, user_id):
+        return get_db()[self.collection].find_one({"_id": ObjectId(vehicle_id), "user_id": user_id})
+
+    def find_for_user(self, user_id, vehicle_ids=None, fields=None, read_only=False):
+        """A user's vehicles, newest first; restricted to vehicle_ids when given."""
+        query = {"user_id": user_id}
+        if vehicle_ids is not None:
+            object_ids = _object_ids(vehicle_ids)
+            if not object_ids:
+                return []
+            query["_id"] = {"$in": object_ids}
+        projection = dict.fromkeys(fields, 1) if fields else None
+        return get_db(read_only=read_only)[self.collection].find(query, projection).sort("created_at", -1)
+
+    def find_due(self, user_id, due_before, margin_km, limit):
+        return (
+            get_db(read_only=True)[self.collection]
+            .find(
+                {
+                    "user_id": user_id,
+                    "$or": [
+                        {"next_due_date": {"$lte": due_before}},
+                        {"next_due_margin_km": {"$lte": margin_km}},
+                    ],
+                }
+            )
+            .sort("next_due_date", 1)
+            .limit(limit)
+        )
+
+    def iter_all(self, batch_size):
+        return get_db()[self.collection].find({}).sort("_id", 1).batch_size(batch_size)
+
+    def update(self, vehicle_id, user_id, fields):
+        """Set fields on a user's vehicle; returns the updated document or None."""
+        query = {"_id": ObjectId(vehicle_id)}
+        if user_id is not None:
+            query["user_id"] = user_id
+        return get_db()[self.collection].find_one_and_update(
+            query, {"$set": fields}, return_document=ReturnDocument.AFTER
+        )
+
+    def set_fields_many(self, updates):
+        """Apply (vehicle _id, fields) pairs in one batch; returns the modified count."""
+        if not updates:
+            return 0
+        operations = [UpdateOne({"_id": vehicle_id}, {"$set": fields}) for vehicle_id, fields in updates]
+        return get_db()[self.collection].bulk_write(operations, ordered=False).modified_count
+
+    def delete(self, vehicle_id, user_id):
+        return get_db()[self.collection].delete_one({"_id": ObjectId(vehicle_id), "user_id": user_id}).deleted_count > 0
+
+
+def _newest_service_first(collection, query, projection=None):
+    """Cursor over query's matches ordered by service_date, newest first.
+
+    BSON ranks every date above every string, so until the date migration is
+    done (STRING_DATES_MIGRATED) the order is taken from service_date read as a
+    date; afterwards the stored value is sorted through the indexes.
+    """
+    if current_app.config["STRING_DATES_MIGRATED"]:
+        return collection.find(query, projection).sort("service_date", -1)
+    return collection.aggregate(
+        [
+            {"$match": query},
+            {"$addFields": {"_service_order": mongo_date("service_date")}},
+            {"$sort": {"_service_order": -1}},
+            {"$project": projection or {"_service_order": 0}},
+        ],
+        allowDiskUse=True,
+    )
+
+
+class MongoMaintenanceRepository:
+    collection = "maintenance"
+
+    def insert(self, doc):
+        doc["_id"] = get_db()[self.collection].insert_one(doc).inserted_id
+        return doc
+
+    def insert_many(self, docs):
+        """Insert docs unordered; returns {index: error message} for the ones that failed."""
+        try:
+            get_db()[self.collection].insert_many(docs, ordered=False)
+        except BulkWriteError as exc:
+            details = exc.details or {}
+            return {err["index"]: err.get("errmsg", "insert failed") for err in details.get("writeErrors", [])}
+        return {}
+
+    def find_for_vehicle(self, user_id, vehicle_id, read_only=False):
+        return _newest_service_first(
+            get_db(read_only=read_only)[self.collection], {"user_id": user_id, "vehicle_id": vehicle_id}
+        )
+
+    def iter_for_user(self, user_id, vehicle_id=None, start=None, end=None):
+        """A user's records, newest service first; service_date within [start, end) when given."""
+        query = {"user_id": user_id}
+        if vehicle_id:
+            query["vehicle_id"] = vehicle_id
+        if start is not None or end is not None:
+            query["$or"] = _date_range("service_date", start, end)
+        return _newest_service_first(get_db(read_only=True)[self.collection], query)
+
+    def history_for_vehicles(self, user_id, vehicle_ids, fields):
+        """A user's records of every vehicle in vehicle_ids, newest service first."""
+        return _newest_service_first(
+            get_db()[self.collection],
+            {"user_id": user_id, "vehicle_id": {"$in": list(vehicle_ids)}},
+            dict.fromkeys(fields, 1),
+        )
+
+    def update_returning_before(self, maintenance_id, user_id, fields):
+        return get_db()[self.collection].find_one_and_update(
+            {"_id": ObjectId(maintenance_id), "user_id": user_id},
+            {"$set": fields},
+            return_document=ReturnDocument.BEFORE,
+        )
+
+    def delete(self, maintenance_id, user_id, fields):
+        """Delete a user's record; returns the given fields of the deleted document, or None."""
+        return get_db()[self.collection].find_one_and_delete(
+            {"_id": ObjectId(maintenance_id), "user_id": user_id},
+            projection=dict.fromkeys(fields, 1),
+        )
+
+
+class MongoCatalogRepository:
+    collection = "vehicle_catalog"
+
+    def upsert_many(self, payloads, now):
+        """Upsert catalog entries keyed by ``id``; returns how many were new."""
+        if not payloads:
+            return 0
+        operations = [
+            UpdateOne({"id": payload["id"]}, {"$set": payload, "$setOnInsert": {"created_at": now}}, upsert=True)
+            for payload in payloads
+        ]
+        return get_db()[self.collection].bulk_write(operations, ordered=False).upserted_count
+
+    def find_all(self, read_only=True):
+        return get_db(read_only=read_only)[self.collection].find({}).sort("make", 1)
+
+    def find_by_id(self, catalog_id):
+        return get_db(read_only=True)[self.collection].find_one({"id": catalog_id})
+
+
+class MongoPredictionRepository:
+    collection = "predictions"
+
+    def insert(self, doc):
+        doc["_id"] = get_db()[self.collection].insert_one(doc).inserted_id
+        return doc
+
+    def find_for_vehicle(self, user_id, vehicle_id, limit=0):
+        return (
+            get_db(read_only=True)[self.collection]
+            .find({"user_id": user_id, "vehicle_id": vehicle_id})
+            .sort("created_at", -1)
+            .limit(limit)
+        )
+
+    def iter_for_user(self, user_id, vehicle_id=None):
+        query = {"user_id": user_id}
+        if vehicle_id:
+            query["vehicle_id"] = vehicle_id
+        return get_db(read_only=True)[self.collection].find(query).sort("created_at", -1)
+
+
+class MongoCostRollupRepository:
+    collection = "cost_rollups"
+
+    def increment_many(self, changes):
+        """Apply (bucket key, {field: delta}, {field: value}) changes as upserting $inc updates."""
+        if not changes:
+            return 0
+        operations = []
+        for key, inc, set_fields in changes:
+            update = {"$inc": inc}
+            if set_fields:
+                update["$set"] = set_fields
+            operations.append(UpdateOne(key, update, upsert=True))
+        get_db()[self.collection].bulk_write(operations, ordered=False)
+        return len(operations)
+
+    def find_range(self, user_id, start_month, end_month, vehicle_id=None):
+        query = {"user_id": user_id, "month": {"$gte": start_month, "$lte": end_month}}
+        if vehicle_id:
+            query["vehicle_id"] = vehicle_id
+        # Buckets emptied by deletes are kept with a zero count; skip them.
+        query["count"] = {"$gt": 0}
+        return get_db(read_only=True)[self.collection].find(
+            query, {"_id": 0, "vehicle_id": 1, "month": 1, "service_type": 1, "total_cost": 1, "count": 1}
+        ).sort([("month", 1), ("vehicle_id", 1), ("service_type", 1)])
+
+
+REPOSITORIES = (
+    MongoUserRepository,
+    MongoVehicleRepository,
+    MongoMaintenanceRepository,
+    MongoCatalogRepository,
+    MongoPredictionRepository,
+    MongoCostRollupRepository,
+)
+
+
+class MongoStorage:
+    """Repositories over the app's MongoDB database (see ``app.utils.db``)."""
+
+    name = "mongo"
+
+    def __init__(self, app):
+        self.repositories = {repository.collection: repository() for repository in REPOSITORIES}
+
+    def repository(self, collection):
+        return self.repositories[collection]
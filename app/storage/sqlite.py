@@ -0,0 +1,483 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from bson import ObjectId, json_util
+from bson.json_util import JSONMode, JSONOptions
+
+# Documents are stored as Extended JSON so ObjectIds and datetimes round-trip;
+# datetimes come back naive UTC, as pymongo returns them.
+_JSON_OPTIONS = JSONOptions(json_mode=JSONMode.RELAXED, tz_aware=False)
+# Stay well below SQLite's bound-parameter limit in IN (...) lists.
+_IN_CHUNK = 500
+# Rows decoded per fetchmany() round trip when streaming a result set.
+_FETCH_SIZE = 500
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS users (id TEXT PRIMARY KEY, email TEXT, doc TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS users_email ON users (email)",
+    """CREATE TABLE IF NOT EXISTS vehicles (
+        id TEXT PRIMARY KEY,
+        user_id TEXT,
+        created_at TEXT,
+        next_due_date TEXT,
+        next_due_margin_km REAL,
+        doc TEXT NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS vehicles_user_created ON vehicles (user_id, created_at DESC)",
+    "CREATE INDEX IF NOT EXISTS vehicles_user_due_date ON vehicles (user_id, next_due_date)",
+    "CREATE INDEX IF NOT EXISTS vehicles_user_due_margin ON vehicles (user_id, next_due_margin_km)",
+    """CREATE TABLE IF NOT EXISTS maintenance (
+        id TEXT PRIMARY KEY,
+        user_id TEXT,
+        vehicle_id TEXT,
+        service_date TEXT,
+        doc TEXT NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS maintenance_user_vehicle_date ON maintenance (user_id, vehicle_id, service_date DESC)",
+    "CREATE INDEX IF NOT EXISTS maintenance_vehicle_date ON maintenance (vehicle_id, service_date DESC)",
+    "CREATE INDEX IF NOT EXISTS maintenance_user_date ON maintenance (user_id, service_date DESC)",
+    "CREATE TABLE IF NOT EXISTS vehicle_catalog (id TEXT PRIMARY KEY, make TEXT, doc TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS vehicle_catalog_make ON vehicle_catalog (make)",
+    """CREATE TABLE IF NOT EXISTS predictions (
+        id TEXT PRIMARY KEY,
+        user_id TEXT,
+        vehicle_id TEXT,
+        created_at TEXT,
+        doc TEXT NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS predictions_user_vehicle_created ON predictions (user_id, vehicle_id, created_at DESC)",
+    # Missing key parts are stored as '' so the unique key also covers them.
+    """CREATE TABLE IF NOT EXISTS cost_rollups (
+        user_id TEXT NOT NULL,
+        month TEXT NOT NULL,
+        vehicle_id TEXT NOT NULL,
+        service_type TEXT NOT NULL,
+        total_cost REAL NOT NULL DEFAULT 0,
+        count INTEGER NOT NULL DEFAULT 0,
+        updated_at TEXT,
+        PRIMARY KEY (user_id, month, vehicle_id, service_type)
+    ) WITHOUT ROWID""",
+]
+
+
+def _encode(doc):
+    return json_util.dumps(doc, json_options=_JSON_OPTIONS)
+
+
+def _decode(text):
+    return json_util.loads(text, json_options=_JSON_OPTIONS)
+
+
+def _column(value):
+    """Sortable column value: datetimes as naive-UTC ISO text, ids as hex."""
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value.isoformat()
+    if isinstance(value, ObjectId):
+        return str(value)
+    return value
+
+
+def _project(doc, fields):
+    if not fields:
+        return doc
+    return {key: doc[key] for key in ("_id", *fields) if key in doc}
+
+
+def _chunks(values, size=_IN_CHUNK):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _placeholders(values):
+    return ", ".join("?" * len(values))
+
+
+class SQLiteDatabase:
+    """One SQLite file shared by the app's repositories.
+
+    Each thread gets its own connection in WAL mode, so readers never block the
+    writer. Writes run in ``BEGIN IMMEDIATE`` transactions that take the write
+    lock up front instead of failing on upgrade.
+    """
+
+    def __init__(self, path, busy_timeout_ms=5000):
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        self._pid = None
+
+    def connection(self):
+        # Connections must not cross a fork: each worker opens its own.
+        if self._pid != os.getpid():
+            self._local = threading.local()
+            self._pid = os.getpid()
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            self._local.conn = conn
+        return conn
+
+    def query(self, sql, params=()):
+        return self.connection().execute(sql, params)
+
+    @contextmanager
+    def transaction(self):
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def ensure_schema(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with self.transaction() as conn:
+            for statement in SCHEMA:
+                conn.execute(statement)
+        names = self.query("SELECT tbl_name, name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL")
+        return [f"{table}.{name}" for table, name in names]
+
+
+class _DocumentTable:
+    """A table holding one Extended JSON document per row plus indexed copies of some fields."""
+
+    table = None
+    columns = ()
+
+    def __init__(self, db):
+        self.db = db
+
+    def _row(self, doc):
+        return (str(doc["_id"]), *(_column(doc.get(name)) for name in self.columns), _encode(doc))
+
+    def _insert_rows(self, conn, docs):
+        names = ("id", *self.columns, "doc")
+        conn.executemany(
+            f"INSERT INTO {self.table} ({', '.join(names)}) VALUES ({_placeholders(names)})",
+            [self._row(doc) for doc in docs],
+        )
+
+    def _write_rows(self, conn, docs):
+        assignments = ", ".join(f"{name} = ?" for name in (*self.columns, "doc"))
+        conn.executemany(
+            f"UPDATE {self.table} SET {assignments} WHERE id = ?",
+            [(*self._row(doc)[1:], str(doc["_id"])) for doc in docs],
+        )
+
+    def insert(self, doc):
+        doc.setdefault("_id", ObjectId())
+        with self.db.transaction() as conn:
+            self._insert_rows(conn, [doc])
+        return doc
+
+    def iter_select(self, where="", params=(), order="", limit=0):
+        sql = f"SELECT doc FROM {self.table}"
+        if where:
+            sql += f" WHERE {where}"
+        if order:
+            sql += f" ORDER BY {order}"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        cursor = self.db.query(sql, params)
+        try:
+            while True:
+                rows = cursor.fetchmany(_FETCH_SIZE)
+                if not rows:
+                    return
+                for row in rows:
+                    yield _decode(row[0])
+        finally:
+            cursor.close()
+
+    def select(self, where="", params=(), order="", limit=0):
+        return list(self.iter_select(where, params, order, limit))
+
+    def select_one(self, where, params):
+        rows = self.select(where, params, limit=1)
+        return rows[0] if rows else None
+
+    def _update_where(self, where, params, fields):
+        """Merge fields into the first matching document; returns (before, after) or None."""
+        with self.db.transaction() as conn:
+            row = conn.execute(f"SELECT doc FROM {self.table} WHERE {where} LIMIT 1", params).fetchone()
+            if row is None:
+                return None
+            before = _decode(row[0])
+            after = {**before, **fields}
+            self._write_rows(conn, [after])
+        return before, after
+
+
+class SQLiteUserRepository(_DocumentTable):
+    collection = table = "users"
+    columns = ("email",)
+
+    def find_by_email(self, email):
+        return self.select_one("email = ?", (email,))
+
+    def find_by_id(self, user_id):
+        return self.select_one("id = ?", (str(user_id),))
+
+    def set_fields(self, user_id, fields):
+        self._update_where("id = ?", (str(user_id),), fields)
+
+
+class SQLiteVehicleRepository(_DocumentTable):
+    collection = table = "vehicles"
+    columns = ("user_id", "created_at", "next_due_date", "next_due_margin_km")
+
+    def find_one(self, vehicle_id, user_id):
+        return self.select_one("id = ? AND user_id = ?", (str(vehicle_id), user_id))
+
+    def find_for_user(self, user_id, vehicle_ids=None, fields=None, read_only=False):
+        if vehicle_ids is None:
+            docs = self.select("user_id = ?", (user_id,), order="created_at DESC")
+        else:
+            ids = [str(v) for v in vehicle_ids if v and ObjectId.is_valid(v)]
+            docs = []
+            for chunk in _chunks(ids):
+                docs += self.select(f"user_id = ? AND id IN ({_placeholders(chunk)})", (user_id, *chunk))
+            docs.sort(key=lambda doc: _column(doc.get("created_at")) or "", reverse=True)
+        return [_project(doc, fields) for doc in docs]
+
+    def find_due(self, user_id, due_before, margin_km, limit):
+        return self.select(
+            "user_id = ? AND (next_due_date <= ? OR next_due_margin_km <= ?)",
+            (user_id, _column(due_before), margin_km),
+            order="next_due_date",
+            limit=limit,
+        )
+
+    def iter_all(self, batch_size):
+        last_id = ""
+        while True:
+            batch = self.select("id > ?", (last_id,), order="id", limit=batch_size)
+            yield from batch
+            if len(batch) < batch_size:
+                return
+            last_id = str(batch[-1]["_id"])
+
+    def update(self, vehicle_id, user_id, fields):
+        if user_id is None:
+            result = self._update_where("id = ?", (str(vehicle_id),), fields)
+        else:
+            result = self._update_where("id = ? AND user_id = ?", (str(vehicle_id), user_id), fields)
+        return result[1] if result else None
+
+    def set_fields_many(self, updates):
+        if not updates:
+            return 0
+        updates = {str(vehicle_id): fields for vehicle_id, fields in updates}
+        with self.db.transaction() as conn:
+            docs = []
+            for chunk in _chunks(updates):
+                rows = conn.execute(f"SELECT doc FROM {self.table} WHERE id IN ({_placeholders(chunk)})", chunk)
+                docs += [_decode(row[0]) for row in rows]
+            changed = []
+            for doc in docs:
+                merged = {**doc, **updates[str(doc["_id"])]}
+                if merged != doc:
+                    changed.append(merged)
+            self._write_rows(conn, changed)
+        return len(changed)
+
+    def delete(self, vehicle_id, user_id):
+        with self.db.transaction() as conn:
+            cursor = conn.execute("DELETE FROM vehicles WHERE id = ? AND user_id = ?", (str(vehicle_id), user_id))
+        return cursor.rowcount > 0
+
+
+class SQLiteMaintenanceRepository(_DocumentTable):
+    collection = table = "maintenance"
+    columns = ("user_id", "vehicle_id", "service_date")
+
+    def insert_many(self, docs):
+        for doc in docs:
+            doc.setdefault("_id", ObjectId())
+        with self.db.transaction() as conn:
+            self._insert_rows(conn, docs)
+        return {}
+
+    def find_for_vehicle(self, user_id, vehicle_id, read_only=False):
+        return self.select("user_id = ? AND vehicle_id = ?", (user_id, vehicle_id), order="service_date DESC")
+
+    def iter_for_user(self, user_id, vehicle_id=None, start=None, end=None):
+        where, params = ["user_id = ?"], [user_id]
+        if vehicle_id:
+            where.append("vehicle_id = ?")
+            params.append(vehicle_id)
+        # Day-precision bounds compare correctly with both "YYYY-MM-DD" and
+        # datetime ISO text ("2026-01-31" < "2026-01-31T00:00:00" < "2026-02-01").
+        if start is not None:
+            where.append("service_date >= ?")
+            params.append(start.date().isoformat())
+        if end is not None:
+            where.append("service_date < ?")
+            params.append(end.date().isoformat())
+        return self.iter_select(" AND ".join(where), tuple(params), order="service_date DESC")
+
+    def history_for_vehicles(self, user_id, vehicle_ids, fields):
+        docs = []
+        for chunk in _chunks(vehicle_ids):
+            docs += self.select(f"user_id = ? AND vehicle_id IN ({_placeholders(chunk)})", (user_id, *chunk))
+        docs.sort(key=lambda doc: _column(doc.get("service_date")) or "", reverse=True)
+        return [_project(doc, fields) for doc in docs]
+
+    def update_returning_before(self, maintenance_id, user_id, fields):
+        result = self._update_where("id = ? AND user_id = ?", (str(maintenance_id), user_id), fields)
+        return result[0] if result else None
+
+    def delete(self, maintenance_id, user_id, fields):
+        with self.db.transaction() as conn:
+            row = conn.execute(
+                "SELECT doc FROM maintenance WHERE id = ? AND user_id = ?", (str(maintenance_id), user_id)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("DELETE FROM maintenance WHERE id = ?", (str(maintenance_id),))
+        return _project(_decode(row[0]), fields)
+
+
+class SQLiteCatalogRepository(_DocumentTable):
+    collection = table = "vehicle_catalog"
+    columns = ("make",)
+
+    def _row(self, doc):
+        # Catalog entries are keyed by their catalog id rather than an ObjectId.
+        return (doc["id"], _column(doc.get("make")), _encode(doc))
+
+    def upsert_many(self, payloads, now):
+        if not payloads:
+            return 0
+        payloads = {payload["id"]: payload for payload in payloads}
+        with self.db.transaction() as conn:
+            existing = {}
+            for chunk in _chunks(payloads):
+                rows = conn.execute(f"SELECT id, doc FROM vehicle_catalog WHERE id IN ({_placeholders(chunk)})", chunk)
+                existing.update((row[0], _decode(row[1])) for row in rows)
+            conn.executemany(
+                "INSERT INTO vehicle_catalog (id, make, doc) VALUES (?, ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET make = excluded.make, doc = excluded.doc",
+                [
+                    self._row({**existing.get(catalog_id, {"created_at": now}), **payload})
+                    for catalog_id, payload in payloads.items()
+                ],
+            )
+        return len(payloads) - len(existing)
+
+    def find_all(self, read_only=True):
+        return self.iter_select(order="make")
+
+    def find_by_id(self, catalog_id):
+        return self.select_one("id = ?", (catalog_id,))
+
+
+class SQLitePredictionRepository(_DocumentTable):
+    collection = table = "predictions"
+    columns = ("user_id", "vehicle_id", "created_at")
+
+    def find_for_vehicle(self, user_id, vehicle_id, limit=0):
+        return self.select(
+            "user_id = ? AND vehicle_id = ?", (user_id, vehicle_id), order="created_at DESC", limit=limit
+        )
+
+    def iter_for_user(self, user_id, vehicle_id=None):
+        where, params = ["user_id = ?"], [user_id]
+        if vehicle_id:
+            where.append("vehicle_id = ?")
+            params.append(vehicle_id)
+        return self.iter_select(" AND ".join(where), tuple(params), order="created_at DESC")
+
+
+class SQLiteCostRollupRepository:
+    collection = "cost_rollups"
+
+    def __init__(self, db):
+        self.db = db
+
+    def increment_many(self, changes):
+        if not changes:
+            return 0
+        rows = [
+            (
+                key["user_id"] or "",
+                key["month"],
+                key["vehicle_id"] or "",
+                key["service_type"] or "",
+                inc.get("total_cost", 0),
+                inc.get("count", 0),
+                _column((set_fields or {}).get("updated_at")),
+            )
+            for key, inc, set_fields in changes
+        ]
+        with self.db.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO cost_rollups (user_id, month, vehicle_id, service_type, total_cost, count, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (user_id, month, vehicle_id, service_type) DO UPDATE SET "
+                "total_cost = total_cost + excluded.total_cost, count = count + excluded.count, "
+                "updated_at = excluded.updated_at",
+                rows,
+            )
+        return len(rows)
+
+    def find_range(self, user_id, start_month, end_month, vehicle_id=None):
+        sql = (
+            "SELECT vehicle_id, month, service_type, total_cost, count FROM cost_rollups "
+            "WHERE user_id = ? AND month >= ? AND month <= ? AND count > 0"
+        )
+        params = [user_id, start_month, end_month]
+        if vehicle_id:
+            sql += " AND vehicle_id = ?"
+            params.append(vehicle_id)
+        sql += " ORDER BY month, vehicle_id, service_type"
+        return [
+            {
+                "vehicle_id": row[0] or None,
+                "month": row[1],
+                "service_type": row[2] or None,
+                "total_cost": row[3],
+                "count": row[4],
+            }
+            for row in self.db.query(sql, params)
+        ]
+
+
+REPOSITORIES = (
+    SQLiteUserRepository,
+    SQLiteVehicleRepository,
+    SQLiteMaintenanceRepository,
+    SQLiteCatalogRepository,
+    SQLitePredictionRepository,
+    SQLiteCostRollupRepository,
+)
+
+
+class SQLiteStorage:
+    """Repositories over an embedded SQLite file, for single-node and offline deployments."""
+
+    name = "sqlite"
+
+    def __init__(self, app):
+        self.db = SQLiteDatabase(app.config["SQLITE_PATH"], busy_timeout_ms=app.config["SQLITE_BUSY_TIMEOUT_MS"])
+        self.db.ensure_schema()
+        self.repositories = {repository.collection: repository(self.db) for repository in REPOSITORIES}
+
+    def repository(self, collection):
+        return self.repositories[collection]
+
+    def ensure_indexes(self):
+        return self.db.ensure_schema()
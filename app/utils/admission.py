@@ -0,0 +1,75 @@
+import threading
+import time
+
+from flask import current_app
+
+from .metrics import metrics
+
+
+class AdmissionController:
+    """Concurrency limiter with a bounded wait queue and a queueing deadline."""
+
+    def __init__(self, name, max_concurrency, max_queue, queue_timeout_ms, retry_after_seconds=1):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = max(0, queue_timeout_ms) / 1000.0
+        self.retry_after_seconds = retry_after_seconds
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._lock = threading.Lock()
+        self._waiting = 0
+
+    def acquire(self):
+        if self._slots.acquire(blocking=False):
+            metrics.incr(f"admission.{self.name}.admitted")
+            return True
+
+        with self._lock:
+            if self._waiting >= self.max_queue:
+                metrics.incr(f"admission.{self.name}.shed")
+                metrics.incr(f"admission.{self.name}.shed_queue_full")
+                return False
+            self._waiting += 1
+
+        metrics.incr(f"admission.{self.name}.queued")
+        started = time.perf_counter()
+        try:
+            admitted = self._slots.acquire(timeout=self.queue_timeout)
+        finally:
+            with self._lock:
+                self._waiting -= 1
+        metrics.observe(f"admission.{self.name}.queue_wait_ms", (time.perf_counter() - started) * 1000.0)
+
+        if not admitted:
+            metrics.incr(f"admission.{self.name}.shed")
+            metrics.incr(f"admission.{self.name}.shed_deadline")
+            return False
+
+        metrics.incr(f"admission.{self.name}.admitted")
+        return True
+
+    def release(self):
+        self._slots.release()
+
+    def saturated_response(self):
+        return (
+            {"error": "Service is saturated, retry later"},
+            503,
+            {"Retry-After": str(self.retry_after_seconds)},
+        )
+
+
+def init_admission(app):
+    app.extensions["admission"] = {
+        "predict": AdmissionController(
+            "predict",
+            max_concurrency=app.config["PREDICT_MAX_CONCURRENCY"],
+            max_queue=app.config["PREDICT_MAX_QUEUE"],
+            queue_timeout_ms=app.config["PREDICT_QUEUE_TIMEOUT_MS"],
+            retry_after_seconds=app.config["PREDICT_RETRY_AFTER_SECONDS"],
+        ),
+    }
+
+
+def get_admission_controller(name):
+    return current_app.extensions["admission"][name]
@@ -0,0 +1,147 @@
+import csv
+import io
+import json
+import re
+import zlib
+
+from flask import Response, stream_with_context
+
+MAINTENANCE_INT_FIELDS = {"mileage"}
+MAINTENANCE_FLOAT_FIELDS = {"cost"}
+
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+# Imports decode with surrogateescape, which maps each undecodable byte to a
+# lone surrogate; rows containing one are rejected instead of failing the stream.
+_UNDECODABLE = re.compile("[\udc80-\udcff]")
+INVALID_UTF8 = "row is not valid UTF-8"
+
+
+def _coerce_csv_value(field, value):
+    if value is None:
+        return None
+    value = value.strip()
+    if value == "":
+        return None
+    try:
+        if field in MAINTENANCE_INT_FIELDS:
+            return int(value)
+        if field in MAINTENANCE_FLOAT_FIELDS:
+            return float(value)
+    except ValueError:
+        return value
+    return value
+
+
+def iter_ndjson_rows(stream):
+    """Yield (row_number, payload, error) tuples from an NDJSON byte stream."""
+    text = io.TextIOWrapper(stream, encoding="utf-8", errors="surrogateescape", newline="")
+    for row_number, line in enumerate(text, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        if _UNDECODABLE.search(line):
+            yield row_number, None, INVALID_UTF8
+            continue
+        try:
+            payload = json.loads(line)
+        except ValueError:
+            yield row_number, None, "invalid JSON"
+            continue
+        if not isinstance(payload, dict):
+            yield row_number, None, "row must be an object"
+            continue
+        yield row_number, payload, None
+
+
+def iter_csv_rows(stream):
+    """Yield (row_number, payload, error) tuples from a CSV byte stream with a header row."""
+    text = io.TextIOWrapper(stream, encoding="utf-8", errors="surrogateescape", newline="")
+    reader = csv.DictReader(text)
+    for row_number, row in enumerate(reader, start=1):
+        if None in row:
+            yield row_number, None, "row has more columns than the header"
+            continue
+        if any(_UNDECODABLE.search(value) for value in row.values() if value):
+            yield row_number, None, INVALID_UTF8
+            continue
+        payload = {}
+        for field, value in row.items():
+            coerced = _coerce_csv_value(field, value)
+            if coerced is not None:
+                payload[field] = coerced
+        yield row_number, payload, None
+
+
+def _encode_ndjson(rows):
+    for row in rows:
+        yield json.dumps(row, default=str) + "\n"
+
+
+def _encode_csv(rows):
+    buffer = io.StringIO()
+    writer = None
+    for row in rows:
+        if writer is None:
+            writer = csv.DictWriter(buffer, fieldnames=list(row.keys()), extrasaction="ignore")
+            writer.writeheader()
+        writer.writerow(
+            {key: json.dumps(value, default=str) if isinstance(value, (dict, list)) else value for key, value in row.items()}
+        )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+
+
+def _chunked(pieces):
+    buffered = []
+    size = 0
+    for piece in pieces:
+        data = piece.encode("utf-8")
+        buffered.append(data)
+        size += len(data)
+        if size >= EXPORT_CHUNK_BYTES:
+            yield b"".join(buffered)
+            buffered = []
+            size = 0
+    if buffered:
+        yield b"".join(buffered)
+
+
+def _gzipped(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def parse_export_options(request):
+    """Return (format, gzip) for an export request, or (None, False) for an unknown format."""
+    export_format = (request.args.get("format") or "ndjson").lower()
+    if export_format not in EXPORT_FORMATS:
+        return None, False
+    gzip_param = (request.args.get("gzip") or "").lower()
+    if gzip_param:
+        compress = gzip_param in {"1", "true", "yes"}
+    else:
+        compress = request.accept_encodings["gzip"] > 0
+    return export_format, compress
+
+
+def export_response(rows, export_format, filename, compress=False):
+    """Stream rows (an iterator of dicts) as NDJSON or CSV without materializing them."""
+    encoder = _encode_csv if export_format == "csv" else _encode_ndjson
+    body = _chunked(encoder(rows))
+    # The body depends on the caller's token and, through negotiation, on
+    # Accept-Encoding even when it goes out uncompressed.
+    headers = {
+        "Content-Disposition": f'attachment; filename="{filename}.{export_format}"',
+        "Vary": "Authorization, Accept-Encoding",
+    }
+    if compress:
+        body = _gzipped(body)
+        headers["Content-Encoding"] = "gzip"
+    return Response(stream_with_context(body), mimetype=EXPORT_FORMATS[export_format], headers=headers)
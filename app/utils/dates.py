@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta, timezone
+
+
+def parse_date(value):
+    """Return a date field as a naive-UTC datetime, or None when it holds no valid date.
+
+    Accepts both stored forms: BSON dates (datetimes) and the "YYYY-MM-DD" or
+    ISO strings written before the date migration.
+    """
+    if isinstance(value, datetime):
+        parsed = value
+    elif isinstance(value, str) and value:
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    else:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def storable_date(value):
+    """Value to store for a date field: a BSON date when it parses, otherwise value unchanged."""
+    parsed = parse_date(value)
+    return parsed if parsed is not None else value
+
+
+def date_string(value):
+    """Public "YYYY-MM-DD" form of a stored date field; strings are returned as stored."""
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    return value
+
+
+def day_range(start, end):
+    """[start, end + 1 day) as datetimes for inclusive "YYYY-MM-DD" bounds; None for open bounds."""
+    lower = parse_date(start) if start else None
+    upper = parse_date(end) + timedelta(days=1) if end else None
+    return lower, upper
+
+
+def mongo_date(field):
+    """Aggregation expression reading field as a date, whether stored as a BSON date or a string."""
+    return {"$convert": {"input": f"${field}", "to": "date", "onError": None, "onNull": None}}
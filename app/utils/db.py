@@ -1,16 +1,136 @@
+import logging
+import os
+import threading
+
+from flask import g, request
 from pymongo import MongoClient
+from pymongo.read_preferences import make_read_preference, read_pref_mode_from_name
 
+from .metrics import metrics
+from .mongo_listener import CommandMetricsListener
 
-def init_db(app):
-    client = MongoClient(app.config["MONGO_URI"])
+try:
+    import zstandard  # noqa: F401
+except Exception:  # pragma: no cover - optional dependency at runtime
+    _HAVE_ZSTD = False
+else:
+    _HAVE_ZSTD = True
+
+try:
+    import snappy  # noqa: F401
+except Exception:  # pragma: no cover - optional dependency at runtime
+    _HAVE_SNAPPY = False
+else:
+    _HAVE_SNAPPY = True
+
+logger = logging.getLogger(__name__)
+
+_client_lock = threading.Lock()
+
+
+def _available_compressors(names):
+    available = []
+    for name in names:
+        name = name.strip().lower()
+        if (name == "zstd" and not _HAVE_ZSTD) or (name == "snappy" and not _HAVE_SNAPPY):
+            metrics.incr("mongo.compressors_unavailable")
+            logger.warning("Mongo compressor %s requested but its package is not installed; skipping it", name)
+            continue
+        if name:
+            available.append(name)
+    return available
+
+
+def _client_options(config):
+    options = {
+        "maxPoolSize": config["MONGO_MAX_POOL_SIZE"],
+        "minPoolSize": config["MONGO_MIN_POOL_SIZE"],
+        "waitQueueTimeoutMS": config["MONGO_WAIT_QUEUE_TIMEOUT_MS"],
+        "serverSelectionTimeoutMS": config["MONGO_SERVER_SELECTION_TIMEOUT_MS"],
+        "connectTimeoutMS": config["MONGO_CONNECT_TIMEOUT_MS"],
+        "socketTimeoutMS": config["MONGO_SOCKET_TIMEOUT_MS"],
+        "retryReads": True,
+        "retryWrites": True,
+    }
+    compressors = _available_compressors(config["MONGO_COMPRESSORS"].split(","))
+    if compressors:
+        options["compressors"] = compressors
+    logger.info("Mongo wire compressors offered: %s", ", ".join(compressors) or "none")
+    return options
+
+
+def _create_client(app):
+    listener = CommandMetricsListener(slow_query_ms=app.config["MONGO_SLOW_QUERY_MS"])
+    client = MongoClient(
+        app.config["MONGO_URI"],
+        event_listeners=[listener],
+        connect=False,
+        **_client_options(app.config),
+    )
     db = client[app.config["MONGO_DB_NAME"]]
+    read_db = db.with_options(
+        read_preference=make_read_preference(
+            read_pref_mode_from_name(app.config["MONGO_READ_ONLY_PREFERENCE"]), None
+        ),
+    )
 
     app.extensions["mongo_client"] = client
     app.extensions["mongo_db"] = db
+    app.extensions["mongo_read_db"] = read_db
+    app.extensions["mongo_listener"] = listener
+    app.extensions["mongo_pid"] = os.getpid()
+
+
+def _ensure_client(app):
+    # Clients must not cross a fork: each worker builds its own on first use.
+    if app.extensions.get("mongo_pid") == os.getpid():
+        return
+    with _client_lock:
+        if app.extensions.get("mongo_pid") != os.getpid():
+            _create_client(app)
+
+
+def init_db(app):
+    app.extensions["mongo_client"] = None
+    app.extensions["mongo_db"] = None
+    app.extensions["mongo_read_db"] = None
+    app.extensions["mongo_pid"] = None
+
+    @app.after_request
+    def record_request_query_count(response):
+        query_count = g.get("mongo_query_count", 0)
+        metrics.observe("http.mongo_queries_per_request", query_count)
+        response.headers["X-Mongo-Query-Count"] = str(query_count)
+
+        warn_threshold = app.config["MONGO_REQUEST_QUERY_WARN"]
+        if warn_threshold and query_count > warn_threshold:
+            metrics.incr("http.mongo_query_heavy_requests")
+            logger.warning(
+                "Request %s %s issued %s Mongo commands: %s",
+                request.method,
+                request.path,
+                query_count,
+                ", ".join(g.get("mongo_commands", [])),
+            )
+        return response
+
+
+
+def get_client():
+    from flask import current_app
 
+    app = current_app._get_current_object()
+    _ensure_client(app)
+    return app.extensions["mongo_client"]
 
 
-def get_db():
+def get_db(read_only=False):
     from flask import current_app
 
-    return current_app.extensions["mongo_db"]
+    app = current_app._get_current_object()
+    if app.config["STORAGE_BACKEND"] != "mongo":
+        raise RuntimeError(f"MongoDB is not available with STORAGE_BACKEND={app.config['STORAGE_BACKEND']}")
+    _ensure_client(app)
+    if read_only:
+        return app.extensions["mongo_read_db"]
+    return app.extensions["mongo_db"]
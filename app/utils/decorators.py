@@ -27,3 +27,14 @@ def token_required(func):
         return func(user, *args, **kwargs)
 
     return wrapper
+
+
+def admin_required(func):
+    @wraps(func)
+    @token_required
+    def wrapper(current_user, *args, **kwargs):
+        if current_user.get("role") != "admin":
+            return {"error": "Admin role required"}, 403
+        return func(current_user, *args, **kwargs)
+
+    return wrapper
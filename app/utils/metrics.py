@@ -0,0 +1,51 @@
+import threading
+from collections import defaultdict
+
+
+class MetricsRegistry:
+    """Thread-safe in-process counters and value summaries exposed on /metrics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = defaultdict(int)
+        self._summaries = {}
+
+    def incr(self, name, value=1):
+        with self._lock:
+            self._counters[name] += value
+
+    def observe(self, name, value):
+        with self._lock:
+            summary = self._summaries.get(name)
+            if summary is None:
+                self._summaries[name] = {"count": 1, "total": value, "max": value}
+                return
+            summary["count"] += 1
+            summary["total"] += value
+            if value > summary["max"]:
+                summary["max"] = value
+
+    def counter(self, name):
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def snapshot(self):
+        with self._lock:
+            summaries = {
+                name: {
+                    "count": t["count"],
+                    "total": round(t["total"], 3),
+                    "avg": round(t["total"] / t["count"], 3),
+                    "max": round(t["max"], 3),
+                }
+                for name, t in self._summaries.items()
+            }
+            return {"counters": dict(self._counters), "summaries": summaries}
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._summaries.clear()
+
+
+metrics = MetricsRegistry()
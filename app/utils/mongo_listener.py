@@ -0,0 +1,109 @@
+import json
+import logging
+import threading
+
+from flask import g, has_request_context
+from pymongo import monitoring
+
+from .metrics import metrics
+
+slow_query_logger = logging.getLogger("app.mongo.slow")
+
+_IGNORED_COMMANDS = {
+    "hello",
+    "ismaster",
+    "isMaster",
+    "ping",
+    "buildInfo",
+    "endSessions",
+    "saslStart",
+    "saslContinue",
+    "authenticate",
+    "getnonce",
+}
+
+
+def _command_collection(command_name, command):
+    if command_name == "getMore":
+        return command.get("collection")
+    target = command.get(command_name)
+    return target if isinstance(target, str) else None
+
+
+def _command_filter_keys(command):
+    query = command.get("filter") or command.get("q") or {}
+    return sorted(query.keys()) if isinstance(query, dict) else []
+
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """Records per-collection command counts, latencies and slow commands."""
+
+    def __init__(self, slow_query_ms=100):
+        self.slow_query_ms = slow_query_ms
+        self._lock = threading.Lock()
+        self._pending = {}
+
+    def started(self, event):
+        if event.command_name in _IGNORED_COMMANDS:
+            return
+
+        collection = _command_collection(event.command_name, event.command) or "$cmd"
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (
+                collection,
+                _command_filter_keys(event.command),
+            )
+
+        if has_request_context():
+            g.mongo_query_count = g.get("mongo_query_count", 0) + 1
+            commands = g.setdefault("mongo_commands", [])
+            commands.append(f"{collection}.{event.command_name}")
+
+    def succeeded(self, event):
+        self._finish(event, failed=False)
+
+    def failed(self, event):
+        self._finish(event, failed=True)
+
+    def _finish(self, event, failed):
+        with self._lock:
+            pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is None:
+            return
+
+        collection, filter_keys = pending
+        name = f"mongo.{collection}.{event.command_name}"
+        duration_ms = event.duration_micros / 1000.0
+
+        metrics.incr(f"{name}.count")
+        metrics.observe(f"{name}.duration_ms", duration_ms)
+        if failed:
+            metrics.incr(f"{name}.errors")
+
+        if duration_ms >= self.slow_query_ms:
+            metrics.incr("mongo.slow_queries")
+            slow_query_logger.warning(
+                json.dumps(
+                    {
+                        "event": "slow_mongo_command",
+                        "database": event.database_name,
+                        "collection": collection,
+                        "command": event.command_name,
+                        "filter_keys": filter_keys,
+                        "duration_ms": round(duration_ms, 3),
+                        "failed": failed,
+                    }
+                )
+            )
+
+
+def get_request_query_count():
+    if not has_request_context():
+        return 0
+    return g.get("mongo_query_count", 0)
+
+
+def get_request_commands():
+    if not has_request_context():
+        return []
+    return list(g.get("mongo_commands", []))
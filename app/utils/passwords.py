@@ -0,0 +1,128 @@
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from flask import current_app
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Werkzeug's parameters for a method given without them.
+_METHOD_DEFAULTS = {"scrypt": ["32768", "8", "1"], "pbkdf2": ["sha256", str(DEFAULT_PBKDF2_ITERATIONS)]}
+# Workers are started from a clean server process, never forked from the
+# threaded app process (whose locks may be held by other threads).
+_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+_executor_lock = threading.Lock()
+_executor = None
+_executor_pid = None
+_pending = None
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing pool is saturated, too slow or broken."""
+
+
+def _get_executor(config):
+    global _executor, _executor_pid, _pending
+
+    workers = config["PASSWORD_HASH_WORKERS"]
+    if workers <= 0:
+        return None, None
+
+    # A pool inherited across fork is unusable, so each worker builds its own.
+    if _executor_pid != os.getpid():
+        with _executor_lock:
+            if _executor_pid != os.getpid():
+                _executor = ProcessPoolExecutor(
+                    max_workers=workers, mp_context=multiprocessing.get_context(_START_METHOD)
+                )
+                _pending = threading.BoundedSemaphore(workers + config["PASSWORD_HASH_MAX_QUEUE"])
+                _executor_pid = os.getpid()
+    return _executor, _pending
+
+
+def _replace_broken_executor(broken, workers):
+    global _executor
+    with _executor_lock:
+        if _executor is broken:
+            _executor = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context(_START_METHOD)
+            )
+            broken.shutdown(wait=False, cancel_futures=True)
+    return _executor
+
+
+def _run(func, *args, **kwargs):
+    config = current_app.config
+    executor, pending = _get_executor(config)
+    if executor is None:
+        return func(*args, **kwargs)
+
+    timeout = config["PASSWORD_HASH_TIMEOUT_MS"] / 1000.0
+    if not pending.acquire(timeout=timeout):
+        metrics.incr("auth.password_pool_shed")
+        raise PasswordHasherBusy()
+    try:
+        result_timeout = config["PASSWORD_HASH_RESULT_TIMEOUT_MS"] / 1000.0
+        # A worker killed mid-task (e.g. by the OOM killer) breaks the whole
+        # pool; it is replaced and the call retried once on the new one.
+        for _ in range(2):
+            try:
+                return executor.submit(func, *args, **kwargs).result(timeout=result_timeout)
+            except BrokenProcessPool:
+                metrics.incr("auth.password_pool_broken")
+                logger.warning("Password hashing pool broke; starting a new one")
+                executor = _replace_broken_executor(executor, config["PASSWORD_HASH_WORKERS"])
+        raise PasswordHasherBusy()
+    except FutureTimeoutError:
+        metrics.incr("auth.password_pool_timeouts")
+        raise PasswordHasherBusy() from None
+    finally:
+        pending.release()
+
+
+def hash_password(password):
+    config = current_app.config
+    started = time.perf_counter()
+    result = _run(
+        generate_password_hash,
+        password,
+        method=config["PASSWORD_HASH_METHOD"],
+        salt_length=config["PASSWORD_SALT_LENGTH"],
+    )
+    metrics.observe("auth.password_hash_ms", (time.perf_counter() - started) * 1000.0)
+    return result
+
+
+def verify_password(password_hash, password):
+    started = time.perf_counter()
+    result = _run(check_password_hash, password_hash, password)
+    metrics.observe("auth.password_verify_ms", (time.perf_counter() - started) * 1000.0)
+    return result
+
+
+def _full_method(method):
+    name, *params = method.split(":")
+    defaults = _METHOD_DEFAULTS.get(name, [])
+    return ":".join([name, *params, *defaults[len(params):]])
+
+
+def needs_rehash(password_hash):
+    """True when password_hash was made with other parameters or salt length than configured."""
+    parts = (password_hash or "").split("$")
+    if len(parts) != 3:
+        return True
+    method, salt, _ = parts
+    config = current_app.config
+    return (
+        _full_method(method) != _full_method(config["PASSWORD_HASH_METHOD"])
+        or len(salt) != config["PASSWORD_SALT_LENGTH"]
+    )
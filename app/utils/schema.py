@@ -0,0 +1,122 @@
+import re
+
+_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_MISSING = object()
+
+
+class Field:
+    """Declarative description of a single payload field."""
+
+    __slots__ = ("name", "kind", "choices", "fields", "message", "nullable", "report_type")
+
+    def __init__(self, name, kind, choices=None, fields=None, message=None, nullable=False, report_type=True):
+        self.name = name
+        self.kind = kind
+        self.choices = choices
+        self.fields = fields
+        self.message = message
+        self.nullable = nullable
+        self.report_type = report_type
+
+
+def integer(name, message=None):
+    return Field(name, "integer", message=message)
+
+
+def numeric(name, message=None):
+    return Field(name, "numeric", message=message)
+
+
+def date(name):
+    return Field(name, "date")
+
+
+def choice(name, choices):
+    return Field(name, "choice", choices=choices)
+
+
+def obj(name, fields, nullable=False, report_type=True):
+    return Field(name, "object", fields=fields, nullable=nullable, report_type=report_type)
+
+
+def _emit_fields(lines, constants, fields, var, prefix, depth):
+    indent = "    " * depth
+    for spec in fields:
+        path = prefix + spec.name
+        key = repr(spec.name)
+
+        if spec.kind == "integer":
+            message = repr(spec.message or f"{path} must be integer")
+            lines.append(f"{indent}if {key} in {var} and not isinstance({var}[{key}], int):")
+            lines.append(f"{indent}    append({message})")
+
+        elif spec.kind == "numeric":
+            message = repr(spec.message or f"{path} must be numeric")
+            lines.append(f"{indent}if {key} in {var} and not isinstance({var}[{key}], _NUMERIC):")
+            lines.append(f"{indent}    append({message})")
+
+        elif spec.kind == "date":
+            message = repr(f"{path} must use YYYY-MM-DD format")
+            lines.append(f"{indent}if {key} in {var} and not _match_date(str({var}[{key}])):")
+            lines.append(f"{indent}    append({message})")
+
+        elif spec.kind == "choice":
+            message = repr(f"{path} must be one of: {', '.join(spec.choices)}")
+            allowed = f"_choices_{len(constants)}"
+            constants[allowed] = frozenset(spec.choices)
+            lines.append(f"{indent}if {key} in {var} and str({var}[{key}]).lower() not in {allowed}:")
+            lines.append(f"{indent}    append({message})")
+
+        elif spec.kind == "object":
+            message = repr(f"{path} must be an object")
+            nested = f"d{depth}_{len(lines)}"
+            lines.append(f"{indent}{nested} = {var}.get({key}, _MISSING)")
+            present = f"{nested} is not _MISSING"
+            if spec.nullable:
+                present += f" and {nested} is not None"
+            lines.append(f"{indent}if {present}:")
+            if spec.report_type:
+                lines.append(f"{indent}    if not isinstance({nested}, dict):")
+                lines.append(f"{indent}        append({message})")
+                lines.append(f"{indent}    else:")
+            else:
+                lines.append(f"{indent}    if isinstance({nested}, dict):")
+            body_start = len(lines)
+            _emit_fields(lines, constants, spec.fields, nested, path + ".", depth + 2)
+            if len(lines) == body_start:
+                lines.append(f"{indent}        pass")
+
+        else:
+            raise ValueError(f"Unknown field kind: {spec.kind}")
+
+
+def _compile_validator(fields, required):
+    # The schema is turned into straight-line Python once, so validation is a
+    # single pass over the payload with no per-field dispatch.
+    lines = ["def validate(payload, partial=False):", "    errors = []", "    append = errors.append"]
+    if required:
+        lines.append("    if not partial:")
+        for entry in required:
+            names = (entry,) if isinstance(entry, str) else tuple(entry)
+            present = " or ".join(f"{name!r} in payload" for name in names)
+            lines.append(f"        if not ({present}):")
+            lines.append(f"            append({names[0] + ' is required'!r})")
+    constants = {}
+    _emit_fields(lines, constants, fields, "payload", "", 1)
+    lines.append("    return errors")
+
+    source = "\n".join(lines)
+    namespace = {"_MISSING": _MISSING, "_NUMERIC": (int, float), "_match_date": _DATE_RE.match, **constants}
+    exec(compile(source, "<compiled schema>", "exec"), namespace)
+    return namespace["validate"], source
+
+
+class CompiledSchema:
+    """A declarative schema compiled once into a single-pass validator function."""
+
+    def __init__(self, fields, required=()):
+        self.validate, self.source = _compile_validator(fields, required)
+
+    def validate_many(self, payloads, partial=False):
+        validate = self.validate
+        return [validate(payload, partial) for payload in payloads]
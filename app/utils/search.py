@@ -0,0 +1,125 @@
+import heapq
+import re
+import unicodedata
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Match quality per query token, multiplied by the weight of the field it hit.
+_EXACT = 3.0
+_PREFIX = 2.0
+_FUZZY = 1.0
+
+
+def normalize(text):
+    """Lowercase and strip accents so "Híbrido" and "hibrido" index alike."""
+    decomposed = unicodedata.normalize("NFKD", str(text).lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(normalize(text))
+
+
+def _trigrams(token):
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _within_distance(a, b, limit):
+    """True when the Levenshtein distance between a and b is at most limit."""
+    if abs(len(a) - len(b)) > limit:
+        return False
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return False
+        previous = current
+    return previous[-1] <= limit
+
+
+class SearchIndex:
+    """Immutable in-memory prefix and trigram index over a list of documents.
+
+    ``fields`` maps document keys to a ranking weight. Every query token must
+    match some indexed token exactly or as a prefix; tokens of three or more
+    characters with no such match fall back to indexed tokens within a small
+    edit distance, found through shared trigrams. Results are ranked by the
+    summed weighted match quality, ties broken by ``sort_keys``.
+    """
+
+    def __init__(self, documents, fields, sort_keys=()):
+        # Documents are stored in tie-break order so ranking only compares positions.
+        self.documents = sorted(documents, key=lambda doc: tuple(str(doc.get(key) or "") for key in sort_keys))
+        self._postings = {}
+        self._prefixes = {}
+        self._trigrams = {}
+
+        for position, doc in enumerate(self.documents):
+            for field, weight in fields.items():
+                for token in tokenize(doc.get(field) or ""):
+                    postings = self._postings.setdefault(token, {})
+                    postings[position] = max(postings.get(position, 0.0), weight)
+
+        for token in self._postings:
+            for end in range(1, len(token) + 1):
+                self._prefixes.setdefault(token[:end], []).append(token)
+            for gram in _trigrams(token):
+                self._trigrams.setdefault(gram, []).append(token)
+
+    def __len__(self):
+        return len(self.documents)
+
+    def _token_scores(self, query_token):
+        scores = {}
+
+        def collect(token, quality):
+            for position, weight in self._postings[token].items():
+                score = quality * weight
+                if score > scores.get(position, 0.0):
+                    scores[position] = score
+
+        prefixed = self._prefixes.get(query_token, ())
+        for token in prefixed:
+            collect(token, _EXACT if token == query_token else _PREFIX)
+
+        if not prefixed and len(query_token) >= 3:
+            limit = 1 if len(query_token) <= 5 else 2
+            grams = _trigrams(query_token)
+            counts = {}
+            for gram in grams:
+                for token in self._trigrams.get(gram, ()):
+                    counts[token] = counts.get(token, 0) + 1
+            # Each edit changes at most three trigrams, so only tokens sharing
+            # enough of them are worth an edit-distance check.
+            required = max(1, len(grams) - 3 * limit, len(grams) // 3)
+            for token, shared in counts.items():
+                if shared < required:
+                    continue
+                # Compare against the whole token and against a prefix of the
+                # query's length so typos in a partial word still match.
+                if _within_distance(query_token, token, limit) or _within_distance(
+                    query_token, token[:len(query_token)], limit
+                ):
+                    collect(token, _FUZZY)
+        return scores
+
+    def search(self, query, limit=10):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        totals = None
+        for token in dict.fromkeys(tokens):
+            scores = self._token_scores(token)
+            if totals is None:
+                totals = scores
+            else:
+                totals = {position: totals[position] + score for position, score in scores.items() if position in totals}
+            if not totals:
+                return []
+
+        ranked = heapq.nsmallest(limit, totals.items(), key=lambda item: (-item[1], item[0]))
+        return [(self.documents[position], round(score, 2)) for position, score in ranked]
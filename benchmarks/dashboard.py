@@ -0,0 +1,125 @@
+# Home-screen load: the N+1 pattern (GET /api/vehicles, then the maintenance
+# and predictions GETs of every vehicle) against GET /api/dashboard's single
+# $lookup aggregation. Needs a MongoDB server; each run seeds a throwaway
+# database and drops it at the end:
+#
+#     python benchmarks/dashboard.py --mongo-uri mongodb://localhost:27017 --fleets 10 100 1000
+#
+# Requests go through the Flask test client, so times cover the app and
+# MongoDB but not HTTP. Query counts come from X-Mongo-Query-Count.
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from app.config import BaseConfig  # noqa: E402
+from app.models import Prediction  # noqa: E402
+from app.models.indexes import ensure_indexes  # noqa: E402
+from app.utils.db import get_db  # noqa: E402
+
+PASSWORD = "Secret123!"
+SERVICE_TYPES = ("oil_change", "brake_service", "tire_rotation", "major_service")
+
+
+def _make_app(mongo_uri, db_name):
+    class BenchConfig(BaseConfig):
+        STORAGE_BACKEND = "mongo"
+        MONGO_URI = mongo_uri
+        MONGO_DB_NAME = db_name
+        PASSWORD_HASH_WORKERS = 0
+
+    return create_app(BenchConfig)
+
+
+def _seed_fleet(app, client, vehicles, records):
+    email = f"fleet{vehicles}-{uuid.uuid4().hex[:8]}@example.com"
+    client.post("/api/auth/register", json={"email": email, "password": PASSWORD})
+    login = client.post("/api/auth/login", json={"email": email, "password": PASSWORD}).get_json()
+    headers = {"Authorization": f"Bearer {login['access_token']}"}
+
+    vehicle_ids = []
+    for i in range(vehicles):
+        response = client.post(
+            "/api/vehicles",
+            headers=headers,
+            json={"make": "Nissan", "model": "Versa", "year": 2018, "current_mileage": 40000 + i},
+        )
+        vehicle_ids.append(response.get_json()["vehicle"]["id"])
+
+    rows = [
+        {
+            "vehicle_id": vehicle_id,
+            "service_type": SERVICE_TYPES[n % len(SERVICE_TYPES)],
+            "service_date": f"202{4 + n % 2}-{1 + n % 12:02d}-15",
+            "cost": 900.0 + 150 * n,
+            "mileage": 30000 + 5000 * n,
+        }
+        for vehicle_id in vehicle_ids
+        for n in range(records)
+    ]
+    body = "\n".join(json.dumps(row) for row in rows)
+    client.post("/api/maintenance/import?format=ndjson", headers=headers, data=body)
+
+    with app.app_context():
+        for vehicle_id in vehicle_ids:
+            Prediction.create(login["user"]["id"], vehicle_id, {"estimated_cost_mxn": 2400.0})
+    return headers
+
+
+def _n_plus_one(client, headers):
+    response = client.get("/api/vehicles", headers=headers)
+    responses = [response]
+    for vehicle in response.get_json()["items"]:
+        responses.append(client.get(f"/api/maintenance/{vehicle['id']}", headers=headers))
+        responses.append(client.get(f"/api/predictions/{vehicle['id']}", headers=headers))
+    return responses
+
+
+def _dashboard(client, headers):
+    return [client.get("/api/dashboard", headers=headers)]
+
+
+def _measure(load, client, headers, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        responses = load(client, headers)
+        timings.append((time.perf_counter() - started) * 1000.0)
+    assert all(response.status_code == 200 for response in responses)
+    queries = sum(int(response.headers.get("X-Mongo-Query-Count", 0)) for response in responses)
+    return statistics.median(timings), len(responses), queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="N+1 home-screen requests vs GET /api/dashboard")
+    parser.add_argument("--mongo-uri", default=os.getenv("MONGO_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--fleets", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--records", type=int, default=3, help="maintenance records per vehicle")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    db_name = f"bench_dashboard_{uuid.uuid4().hex[:8]}"
+    app = _make_app(args.mongo_uri, db_name)
+    client = app.test_client()
+    with app.app_context():
+        ensure_indexes()
+    try:
+        print(f"{'fleet':>6} {'pattern':>10} {'requests':>9} {'queries':>8} {'median':>10}")
+        for vehicles in args.fleets:
+            headers = _seed_fleet(app, client, vehicles, args.records)
+            for name, load in (("n+1", _n_plus_one), ("dashboard", _dashboard)):
+                median_ms, requests, queries = _measure(load, client, headers, args.repeat)
+                print(f"{vehicles:>6} {name:>10} {requests:>9} {queries:>8} {median_ms:>8.1f}ms")
+    finally:
+        with app.app_context():
+            get_db().client.drop_database(db_name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+# Per-user maintenance date-range queries and newest-first history while
+# service_date holds a mix of "YYYY-MM-DD" strings and BSON dates, and (on
+# MongoDB) again after `flask migrate-dates` has converted them:
+#
+#     python benchmarks/date_queries.py --records 50000 --users 100
+#     python benchmarks/date_queries.py --backend mongo --mongo-uri mongodb://localhost:27017
+#
+# Records are generated from a fixed seed into a throwaway SQLite file or
+# MongoDB database (dropped afterwards). Reports median latency and rows of a
+# 3-month range and of a user's full history, the query plan of the range
+# query, and parse_date on a stored date vs re-parsing a string.
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import timeit
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from app.config import BaseConfig  # noqa: E402
+from app.jobs.date_migration import StringDateMigration  # noqa: E402
+from app.models.indexes import ensure_indexes  # noqa: E402
+from app.storage import get_repository, get_storage  # noqa: E402
+from app.utils.dates import parse_date  # noqa: E402
+from app.utils.db import get_db  # noqa: E402
+
+RANGE_START = datetime(2025, 1, 1)
+RANGE_END = datetime(2025, 4, 1)
+
+
+def _make_app(args, workdir):
+    class BenchConfig(BaseConfig):
+        STORAGE_BACKEND = args.backend
+        SQLITE_PATH = os.path.join(workdir, "bench.sqlite3")
+        MONGO_URI = args.mongo_uri
+        MONGO_DB_NAME = f"bench_dates_{uuid.uuid4().hex[:8]}"
+        STRING_DATES_MIGRATED = False
+
+    return create_app(BenchConfig)
+
+
+def _records(count, users, seed):
+    rng = random.Random(seed)
+    first_day = datetime(2022, 1, 1)
+    for i in range(count):
+        service_date = first_day + timedelta(days=rng.randrange(4 * 365))
+        yield {
+            "user_id": f"user{rng.randrange(users)}",
+            "vehicle_id": f"vehicle{rng.randrange(users * 3)}",
+            "service_type": "oil_change",
+            "service_date": service_date if i % 2 else service_date.date().isoformat(),
+            "cost": float(rng.randrange(500, 9000)),
+            "mileage": rng.randrange(5000, 200000),
+        }
+
+
+def _seed(repository, args):
+    batch = []
+    for doc in _records(args.records, args.users, args.seed):
+        batch.append(doc)
+        if len(batch) == 5000:
+            repository.insert_many(batch)
+            batch = []
+    if batch:
+        repository.insert_many(batch)
+
+
+def _median_ms(run, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = timeit.default_timer()
+        rows = len(list(run()))
+        timings.append((timeit.default_timer() - started) * 1000.0)
+    return statistics.median(timings), rows
+
+
+def _stages(plan):
+    stage = plan.get("stage", "?")
+    if "indexName" in plan:
+        stage += f"({plan['indexName']})"
+    children = [plan["inputStage"]] if "inputStage" in plan else plan.get("inputStages", [])
+    return [stage] + [name for child in children for name in _stages(child)]
+
+
+def _range_plan(user):
+    if get_storage().name == "sqlite":
+        rows = get_storage().db.query(
+            "EXPLAIN QUERY PLAN SELECT doc FROM maintenance "
+            "WHERE user_id = ? AND service_date >= ? AND service_date < ? ORDER BY service_date DESC",
+            (user, RANGE_START.date().isoformat(), RANGE_END.date().isoformat()),
+        )
+        return "; ".join(row[-1] for row in rows)
+    query = {
+        "user_id": user,
+        "$or": [
+            {"service_date": {"$gte": RANGE_START, "$lt": RANGE_END}},
+            {"service_date": {"$gte": RANGE_START.date().isoformat(), "$lt": RANGE_END.date().isoformat()}},
+        ],
+    }
+    explain = get_db()["maintenance"].find(query).sort("service_date", -1).explain()
+    return " <- ".join(_stages(explain["queryPlanner"]["winningPlan"]))
+
+
+def _report(label, repository, args):
+    user = "user0"
+    range_ms, range_rows = _median_ms(
+        lambda: repository.iter_for_user(user, start=RANGE_START, end=RANGE_END), args.repeat
+    )
+    history_ms, history_rows = _median_ms(lambda: repository.iter_for_user(user), args.repeat)
+    print(f"  {label}")
+    print(f"    3-month range: {range_ms:8.2f} ms  {range_rows} rows")
+    print(f"    full history:  {history_ms:8.2f} ms  {history_rows} rows")
+    print(f"    range plan:    {_range_plan(user)}")
+
+
+def run(app, args):
+    with app.app_context():
+        ensure_indexes()
+        repository = get_repository("maintenance")
+        _seed(repository, args)
+        print(f"{args.backend}: {args.records} records over {args.users} users, half strings, seed {args.seed}")
+        _report("strings and dates mixed", repository, args)
+        if args.backend == "mongo":
+            StringDateMigration(get_db(), batch_size=1000).run(restart=True)
+            app.config["STRING_DATES_MIGRATED"] = True
+            _report("after migrate-dates (STRING_DATES_MIGRATED)", repository, args)
+
+    stored, text = datetime(2025, 3, 15), "2025-03-15"
+    loops = 200000
+    as_date = min(timeit.repeat(lambda: parse_date(stored), number=loops, repeat=5)) / loops
+    as_text = min(timeit.repeat(lambda: datetime.fromisoformat(text), number=loops, repeat=5)) / loops
+    print(f"  parse_date(stored date): {as_date * 1e9:5.0f} ns, fromisoformat(string): {as_text * 1e9:5.0f} ns")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Date-range queries and sorts on service_date")
+    parser.add_argument("--backend", choices=("sqlite", "mongo"), default="sqlite")
+    parser.add_argument("--mongo-uri", default=os.getenv("MONGO_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--records", type=int, default=50000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        app = _make_app(args, workdir)
+        try:
+            run(app, args)
+        finally:
+            if args.backend == "mongo":
+                with app.app_context():
+                    get_db().client.drop_database(app.config["MONGO_DB_NAME"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# Login throughput and concurrent CRUD latency, hashing inline vs in the
+# process pool. Runs the app in-process on the SQLite backend with a
+# throwaway database:
+#
+#     python benchmarks/password_login.py --seconds 10 --login-threads 4
+#
+# Each mode starts fresh: --login-threads threads log in as fast as they can
+# while one thread polls GET /api/vehicles and records its latency.
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from app.config import BaseConfig  # noqa: E402
+
+PASSWORD = "Secret123!"
+
+
+def _make_app(workers, sqlite_path):
+    class BenchConfig(BaseConfig):
+        STORAGE_BACKEND = "sqlite"
+        SQLITE_PATH = sqlite_path
+        PASSWORD_HASH_WORKERS = workers
+
+    return create_app(BenchConfig)
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run(workers, seconds, login_threads):
+    app = _make_app(workers, os.path.join(tempfile.mkdtemp(), "bench.sqlite3"))
+    client = app.test_client()
+    emails = [f"bench{i}@example.com" for i in range(login_threads)]
+    for email in emails:
+        client.post("/api/auth/register", json={"email": email, "password": PASSWORD})
+    token = client.post("/api/auth/login", json={"email": emails[0], "password": PASSWORD}).get_json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    client.post("/api/vehicles", headers=headers, json={"make": "Nissan", "model": "Versa", "year": 2018})
+
+    stop = time.perf_counter() + seconds
+    logins, shed, crud_ms = [], [], []
+
+    def login(email):
+        local = app.test_client()
+        while time.perf_counter() < stop:
+            status = local.post("/api/auth/login", json={"email": email, "password": PASSWORD}).status_code
+            (logins if status == 200 else shed).append(status)
+
+    def crud():
+        local = app.test_client()
+        while time.perf_counter() < stop:
+            started = time.perf_counter()
+            local.get("/api/vehicles", headers=headers)
+            crud_ms.append((time.perf_counter() - started) * 1000.0)
+            time.sleep(0.01)
+
+    threads = [threading.Thread(target=login, args=(email,)) for email in emails]
+    threads.append(threading.Thread(target=crud))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return {
+        "workers": workers,
+        "logins_per_s": len(logins) / seconds,
+        "shed": len(shed),
+        "crud_p50_ms": statistics.median(crud_ms),
+        "crud_p95_ms": _percentile(crud_ms, 95),
+        "crud_max_ms": max(crud_ms),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Login throughput and CRUD latency by PASSWORD_HASH_WORKERS")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--login-threads", type=int, default=4)
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 2])
+    args = parser.parse_args()
+
+    print(f"{'workers':>7} {'logins/s':>9} {'shed':>5} {'crud p50':>9} {'crud p95':>9} {'crud max':>9}")
+    for workers in args.workers:
+        result = run(workers, args.seconds, args.login_threads)
+        print(
+            f"{result['workers']:>7} {result['logins_per_s']:>9.1f} {result['shed']:>5} "
+            f"{result['crud_p50_ms']:>7.1f}ms {result['crud_p95_ms']:>7.1f}ms {result['crud_max_ms']:>7.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
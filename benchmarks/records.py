@@ -0,0 +1,114 @@
+# Vehicle serialization: slotted VehicleRecord against building the public
+# dict straight from the document (the serializer before the record types).
+#
+#     python benchmarks/records.py --vehicles 1000
+#
+# Reports per-batch serialization time and the memory held by the decoded
+# batch (records vs public dicts), measured with tracemalloc.
+import argparse
+import os
+import sys
+import timeit
+import tracemalloc
+from datetime import datetime
+
+from bson import ObjectId
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.records import VehicleRecord  # noqa: E402
+from app.utils.dates import date_string  # noqa: E402
+
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+
+def dict_public(doc):
+    return {
+        "id": str(doc.get("_id")),
+        "user_id": doc.get("user_id"),
+        "catalog_vehicle_id": doc.get("catalog_vehicle_id"),
+        "make": doc.get("make"),
+        "model": doc.get("model"),
+        "year": doc.get("year"),
+        "vehicle_type": doc.get("vehicle_type"),
+        "fuel_type": doc.get("fuel_type"),
+        "cylinders": doc.get("cylinders"),
+        "transmission": doc.get("transmission"),
+        "vin": doc.get("vin"),
+        "license_plate": doc.get("license_plate"),
+        "color": doc.get("color"),
+        "current_mileage": doc.get("current_mileage"),
+        "mileage": doc.get("current_mileage"),
+        "average_mileage_daily": doc.get("average_mileage_daily"),
+        "average_mileage_weekly": doc.get("average_mileage_weekly"),
+        "average_mileage_monthly": doc.get("average_mileage_monthly"),
+        "engine_hours": doc.get("engine_hours"),
+        "acquisition_date": date_string(doc.get("acquisition_date")),
+        "usage_type": doc.get("usage_type"),
+        "driving_conditions": doc.get("driving_conditions"),
+        "image_urls": doc.get("image_urls", []),
+        "maintenance_history": doc.get("maintenance_history", {}),
+        "telemetry": None,
+        "next_due_oil_change_km": doc.get("next_due_oil_change_km"),
+        "next_due_brake_check_km": doc.get("next_due_brake_check_km"),
+        "next_due_tire_rotation_km": doc.get("next_due_tire_rotation_km"),
+        "next_due_general_check_date": _iso(doc.get("next_due_general_check_date")),
+        "next_due_km": doc.get("next_due_km"),
+        "next_due_margin_km": doc.get("next_due_margin_km"),
+        "next_due_date": _iso(doc.get("next_due_date")),
+        "created_at": _iso(doc.get("created_at")),
+        "updated_at": _iso(doc.get("updated_at")),
+    }
+
+
+def _documents(count):
+    now = datetime(2026, 1, 1)
+    return [
+        {
+            "_id": ObjectId(), "user_id": "u1", "make": "Nissan", "model": "Versa", "year": 2018,
+            "vehicle_type": "sedan", "fuel_type": "gasolina", "transmission": "manual", "current_mileage": 50000 + i,
+            "average_mileage_monthly": 1200, "acquisition_date": datetime(2019, 3, 4), "usage_type": "ciudad",
+            "driving_conditions": "normales", "image_urls": [], "next_due_km": 58000, "next_due_date": now,
+            "created_at": now, "updated_at": now,
+        }
+        for i in range(count)
+    ]
+
+
+def _held_bytes(build):
+    tracemalloc.start()
+    held = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del held
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Slotted vehicle records vs per-document dicts")
+    parser.add_argument("--vehicles", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    docs = _documents(args.vehicles)
+    assert dict_public(docs[0]) == VehicleRecord.from_document(docs[0]).to_public()
+
+    cases = {
+        "dict": lambda: [dict_public(doc) for doc in docs],
+        "record": lambda: [VehicleRecord.from_document(doc).to_public() for doc in docs],
+    }
+    print(f"{args.vehicles} vehicles")
+    for name, serialize in cases.items():
+        seconds = min(timeit.repeat(serialize, number=args.repeat, repeat=5)) / args.repeat
+        print(f"  serialize {name:>6}: {seconds * 1000:7.2f} ms")
+
+    dict_bytes = _held_bytes(lambda: [dict_public(doc) for doc in docs])
+    record_bytes = _held_bytes(lambda: [VehicleRecord.from_document(doc) for doc in docs])
+    print(f"  held dicts:   {dict_bytes / args.vehicles:7.0f} bytes per vehicle")
+    print(f"  held records: {record_bytes / args.vehicles:7.0f} bytes per vehicle")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# Request-path latency of cost predictions with shadow evaluation off and on.
+# The shipped cost_model.pkl serves as both the primary and the candidate:
+#
+#     python benchmarks/shadow_latency.py --predictions 2000 --sample-rate 0.1
+#
+# Reports p50/p95/max latency of estimate_next_maintenance_cost per mode and,
+# for the shadow run, how many samples the background worker evaluated.
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.ml_model import predict  # noqa: E402
+
+VEHICLE = {
+    "make": "Nissan", "model": "Versa", "year": 2018, "vehicle_type": "sedan", "fuel_type": "gasolina",
+    "transmission": "manual", "current_mileage": 62000, "average_mileage_monthly": 1200,
+    "usage_type": "ciudad", "driving_conditions": "normales",
+}
+HISTORY = [{"service_type": "major_service", "cost": 3800.0, "mileage": 50000}]
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run(predictions):
+    latencies = []
+    for _ in range(predictions):
+        started = time.perf_counter()
+        result = predict.estimate_next_maintenance_cost(VEHICLE, HISTORY)
+        latencies.append((time.perf_counter() - started) * 1000.0)
+    assert result["model_used"] != "rule_based_fallback", "cost_model.pkl did not load"
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cost prediction latency with shadow evaluation off vs on")
+    parser.add_argument("--predictions", type=int, default=2000)
+    parser.add_argument("--sample-rate", type=float, default=0.1)
+    parser.add_argument("--queue-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    evaluated = []
+    evaluator = predict.ShadowEvaluator(
+        predict.COST_MODEL_PATH, evaluated.extend, sample_rate=args.sample_rate, queue_size=args.queue_size
+    )
+    run(50)  # load the primary bundle and warm up pandas before measuring
+
+    results = {}
+    for mode, shadow in (("off", None), ("on", evaluator)):
+        predict.configure_shadow(shadow)
+        results[mode] = run(args.predictions)
+    predict.configure_shadow(None)
+
+    print(f"{args.predictions} predictions, sample rate {args.sample_rate}")
+    for mode, latencies in results.items():
+        print(
+            f"  shadow {mode:>3}: p50 {statistics.median(latencies):6.3f} ms"
+            f"  p95 {_percentile(latencies, 95):6.3f} ms  max {max(latencies):7.3f} ms"
+        )
+    deadline = time.monotonic() + 30
+    while evaluator._queue.qsize() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    time.sleep(0.2)
+    print(f"  shadow samples evaluated in the background: {len(evaluated)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# Training-data loading: pd.read_csv with inferred dtypes against the typed,
+# memory-mapped column cache of app.ml_model.data_cache. The input is a
+# synthetic maintenance_costs.csv of --rows rows, resampled with a fixed
+# seed from the shipped sample, and the cache is built in a throwaway
+# directory:
+#
+#     python benchmarks/training_cache.py --rows 1000000 --seed 7
+#
+# Reports CSV parse time, cache build and load times (lazy and with every
+# column read), the fresh-cache check, and the in-memory size of both frames.
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.ml_model import data_cache  # noqa: E402
+from app.ml_model.train_model import COST_CATEGORICAL_COLS, COST_DATA_PATH  # noqa: E402
+
+
+def _write_source(path, rows, seed):
+    rng = np.random.default_rng(seed)
+    sample = pd.read_csv(COST_DATA_PATH)
+    frame = sample.iloc[rng.integers(0, len(sample), rows)].reset_index(drop=True)
+    frame["current_mileage"] += rng.integers(-5000, 5000, rows)
+    frame["historical_avg_cost"] = (frame["historical_avg_cost"] * rng.uniform(0.8, 1.2, rows)).round(2)
+    frame.to_csv(path, index=False)
+
+
+def _best(run, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = run()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def _touch(frame):
+    # Read every value so the lazy memory-mapped load is compared fairly.
+    for name in frame.columns:
+        column = frame[name]
+        (column.cat.codes if isinstance(column.dtype, pd.CategoricalDtype) else column).to_numpy().sum()
+    return frame
+
+
+def run(workdir, args):
+    source = workdir / COST_DATA_PATH.name
+    _write_source(source, args.rows, args.seed)
+
+    parse_s, raw = _best(lambda: pd.read_csv(source), args.repeat)
+    build_s, _ = _best(lambda: data_cache.prepare(source, COST_CATEGORICAL_COLS, force=True), 1)
+    fresh_s, (_, rebuilt) = _best(lambda: data_cache.prepare(source, COST_CATEGORICAL_COLS), args.repeat)
+    load_s, cached = _best(lambda: data_cache.load_frame(source, COST_CATEGORICAL_COLS), args.repeat)
+    touched_s, _ = _best(lambda: _touch(data_cache.load_frame(source, COST_CATEGORICAL_COLS)), args.repeat)
+    assert not rebuilt
+    pd.testing.assert_frame_equal(cached.astype(raw.dtypes.to_dict()), raw)
+
+    raw_mb = raw.memory_usage(deep=True).sum() / 1e6
+    typed_mb = cached.memory_usage(deep=True).sum() / 1e6
+    print(f"{args.rows} rows, {source.stat().st_size / 1e6:.1f} MB CSV, seed {args.seed}")
+    print(f"  read_csv (inferred dtypes): {parse_s * 1000:9.1f} ms")
+    print(f"  cache build (parse + write): {build_s * 1000:8.1f} ms")
+    print(f"  fresh-cache check:          {fresh_s * 1000:9.1f} ms")
+    print(f"  cached load (mmap, lazy):   {load_s * 1000:9.1f} ms")
+    print(f"  cached load, all columns:   {touched_s * 1000:9.1f} ms")
+    print(f"  memory: {raw_mb:.1f} MB as parsed, {typed_mb:.1f} MB typed ({100 * (1 - typed_mb / raw_mb):.0f}% less)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CSV parse vs typed columnar training-data cache")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="training-cache-"))
+    data_cache.CACHE_DIR = workdir / ".cache"
+    try:
+        run(workdir, args)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
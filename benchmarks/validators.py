@@ -0,0 +1,293 @@
+# Payload validation: the compiled schema validators (single payload and
+# batch API) against the hand-written checks they replaced, which are kept
+# below verbatim as the baseline.
+#
+#     python benchmarks/validators.py --payloads 50000 --seed 7 --invalid-rate 0.02
+#
+# Payloads are generated from a seeded RNG with a mix of valid and invalid
+# fields; the error lists of both implementations are compared first.
+import argparse
+import os
+import random
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.validators import (  # noqa: E402
+    VALID_DRIVING_CONDITIONS,
+    VALID_FUEL_TYPES,
+    VALID_TRANSMISSION,
+    VALID_USAGE_TYPES,
+    VALID_VEHICLE_TYPES,
+    validate_maintenance_payload,
+    validate_maintenance_payloads,
+    validate_vehicle_payload,
+    validate_vehicle_payloads,
+)
+
+_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
+def legacy_vehicle(payload, partial=False):
+    errors = []
+    required = ["make", "model", "year", "current_mileage"]
+
+    if not partial:
+        for field in required:
+            if field not in payload and not (field == "current_mileage" and "mileage" in payload):
+                errors.append(f"{field} is required")
+
+    if "year" in payload and not isinstance(payload["year"], int):
+        errors.append("year must be integer")
+
+    if "current_mileage" in payload and not isinstance(payload["current_mileage"], int):
+        errors.append("current_mileage must be integer")
+
+    if "mileage" in payload and not isinstance(payload["mileage"], int):
+        errors.append("mileage must be integer (deprecated, use current_mileage)")
+
+    if "vehicle_type" in payload and str(payload["vehicle_type"]).lower() not in VALID_VEHICLE_TYPES:
+        errors.append("vehicle_type must be one of: sedan, suv, pickup, hatchback, coupe, van, wagon, other")
+
+    if "fuel_type" in payload and str(payload["fuel_type"]).lower() not in VALID_FUEL_TYPES:
+        errors.append("fuel_type must be one of: gasolina, diesel, electrico, hibrido")
+
+    if "transmission" in payload and str(payload["transmission"]).lower() not in VALID_TRANSMISSION:
+        errors.append("transmission must be one of: manual, automatica")
+
+    if "usage_type" in payload and str(payload["usage_type"]).lower() not in VALID_USAGE_TYPES:
+        errors.append("usage_type must be one of: ciudad, carretera, mixto")
+
+    if "driving_conditions" in payload and str(payload["driving_conditions"]).lower() not in VALID_DRIVING_CONDITIONS:
+        errors.append("driving_conditions must be one of: severas, normales, suaves")
+
+    integer_fields = [
+        "cylinders",
+        "average_mileage_daily",
+        "average_mileage_weekly",
+        "average_mileage_monthly",
+        "engine_hours",
+    ]
+    for field in integer_fields:
+        if field in payload and not isinstance(payload[field], int):
+            errors.append(f"{field} must be integer")
+
+    if "acquisition_date" in payload and not _DATE_RE.match(str(payload["acquisition_date"])):
+        errors.append("acquisition_date must use YYYY-MM-DD format")
+
+    if "maintenance_history" in payload and not isinstance(payload["maintenance_history"], dict):
+        errors.append("maintenance_history must be an object")
+
+    if isinstance(payload.get("maintenance_history"), dict):
+        history = payload["maintenance_history"]
+        if "last_oil_change_date" in history and not _DATE_RE.match(str(history["last_oil_change_date"])):
+            errors.append("maintenance_history.last_oil_change_date must use YYYY-MM-DD format")
+
+        if "last_oil_change_mileage" in history and not isinstance(history["last_oil_change_mileage"], int):
+            errors.append("maintenance_history.last_oil_change_mileage must be integer")
+
+        if "oil_change_interval_km" in history and not isinstance(history["oil_change_interval_km"], int):
+            errors.append("maintenance_history.oil_change_interval_km must be integer")
+
+        filter_fields = ["oil", "air", "fuel", "cabin"]
+        for ff in filter_fields:
+            if ff in history.get("filters", {}):
+                entry = history["filters"][ff]
+                if not isinstance(entry, dict):
+                    errors.append(f"maintenance_history.filters.{ff} must be an object")
+                    continue
+                if "date" in entry and not _DATE_RE.match(str(entry["date"])):
+                    errors.append(f"maintenance_history.filters.{ff}.date must use YYYY-MM-DD format")
+                if "km" in entry and not isinstance(entry["km"], int):
+                    errors.append(f"maintenance_history.filters.{ff}.km must be integer")
+
+        tires = history.get("tires")
+        if tires is not None:
+            if not isinstance(tires, dict):
+                errors.append("maintenance_history.tires must be an object")
+            else:
+                date_fields = [
+                    "last_rotation_date",
+                    "last_balancing_date",
+                    "last_alignment_date",
+                    "purchase_date",
+                ]
+                for df in date_fields:
+                    if df in tires and not _DATE_RE.match(str(tires[df])):
+                        errors.append(f"maintenance_history.tires.{df} must use YYYY-MM-DD format")
+
+                numeric_fields = ["tread_depth_mm", "tire_pressure_psi"]
+                for nf in numeric_fields:
+                    if nf in tires and not isinstance(tires[nf], (int, float)):
+                        errors.append(f"maintenance_history.tires.{nf} must be numeric")
+
+        brakes = history.get("brakes")
+        if brakes is not None:
+            if not isinstance(brakes, dict):
+                errors.append("maintenance_history.brakes must be an object")
+            else:
+                date_fields = ["last_change_date", "fluid_bleed_date"]
+                for df in date_fields:
+                    if df in brakes and not _DATE_RE.match(str(brakes[df])):
+                        errors.append(f"maintenance_history.brakes.{df} must use YYYY-MM-DD format")
+
+                numeric_fields = ["front_pad_thickness_mm", "rear_pad_thickness_mm", "brake_fluid_level_percent"]
+                for nf in numeric_fields:
+                    if nf in brakes and not isinstance(brakes[nf], (int, float)):
+                        errors.append(f"maintenance_history.brakes.{nf} must be numeric")
+
+    return errors
+
+
+def legacy_maintenance(payload, partial=False):
+    errors = []
+    required = ["vehicle_id", "service_type", "service_date"]
+
+    if not partial:
+        for field in required:
+            if field not in payload:
+                errors.append(f"{field} is required")
+
+    if "cost" in payload and not isinstance(payload["cost"], (int, float)):
+        errors.append("cost must be numeric")
+
+    if "mileage" in payload and not isinstance(payload["mileage"], int):
+        errors.append("mileage must be integer")
+
+    return errors
+
+
+class _Random(random.Random):
+    def __init__(self, seed, invalid_rate):
+        super().__init__(seed)
+        self.invalid_rate = invalid_rate
+
+
+def _maybe(rng, rate=0.8):
+    return rng.random() < rate
+
+
+def _valid(rng):
+    return rng.random() >= rng.invalid_rate
+
+
+def _integer(rng, value):
+    return value if _valid(rng) else str(value)
+
+
+def _date(rng):
+    return f"20{rng.randint(10, 26)}-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}" if _valid(rng) else "03/04/2021"
+
+
+def _choice(rng, choices):
+    return rng.choice(sorted(choices)).upper() if _valid(rng) else "unknown"
+
+
+def _vehicle(rng):
+    payload = {}
+    for field, value in (("make", "Nissan"), ("model", "Versa"), ("year", 2018), ("current_mileage", 52000)):
+        if _valid(rng):
+            payload[field] = _integer(rng, value) if isinstance(value, int) else value
+    for field in ("cylinders", "average_mileage_monthly", "engine_hours"):
+        if _maybe(rng):
+            payload[field] = _integer(rng, rng.randint(1, 200000))
+    if _maybe(rng, 0.1):
+        payload["mileage"] = _integer(rng, 40000)
+    for field, choices in (
+        ("vehicle_type", VALID_VEHICLE_TYPES),
+        ("fuel_type", VALID_FUEL_TYPES),
+        ("transmission", VALID_TRANSMISSION),
+        ("usage_type", VALID_USAGE_TYPES),
+        ("driving_conditions", VALID_DRIVING_CONDITIONS),
+    ):
+        if _maybe(rng):
+            payload[field] = _choice(rng, choices)
+    if _maybe(rng):
+        payload["acquisition_date"] = _date(rng)
+    if not _valid(rng):
+        payload["maintenance_history"] = "none"
+    elif _maybe(rng, 0.7):
+        filters = {
+            name: {"date": _date(rng), "km": _integer(rng, 30000)} if _valid(rng) else "yes"
+            for name in ("oil", "air", "fuel", "cabin")
+            if _maybe(rng, 0.6)
+        }
+        payload["maintenance_history"] = {
+            "last_oil_change_date": _date(rng),
+            "last_oil_change_mileage": _integer(rng, 45000),
+            "oil_change_interval_km": _integer(rng, 10000),
+            "filters": filters,
+            "tires": {
+                "last_rotation_date": _date(rng),
+                "purchase_date": _date(rng),
+                "tread_depth_mm": 6.5 if _valid(rng) else "6.5",
+                "tire_pressure_psi": 32,
+            } if _valid(rng) else [],
+            "brakes": {
+                "last_change_date": _date(rng),
+                "front_pad_thickness_mm": 8 if _valid(rng) else None,
+                "brake_fluid_level_percent": 90.0,
+            } if _maybe(rng) else None,
+        }
+    return payload
+
+
+def _maintenance(rng):
+    payload = {
+        field: value
+        for field, value in (("vehicle_id", "v1"), ("service_type", "oil_change"), ("service_date", _date(rng)))
+        if _valid(rng)
+    }
+    if _maybe(rng):
+        payload["cost"] = 850.0 if _valid(rng) else "850"
+    if _maybe(rng):
+        payload["mileage"] = _integer(rng, 52000)
+    return payload
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compiled schema validators vs the hand-written checks")
+    parser.add_argument("--payloads", type=int, default=50000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--invalid-rate", type=float, default=0.02, help="share of invalid field values")
+    parser.add_argument("--repeat", type=int, default=15)
+    args = parser.parse_args()
+
+    rng = _Random(args.seed, args.invalid_rate)
+    cases = {
+        "vehicle": (
+            [_vehicle(rng) for _ in range(args.payloads)],
+            legacy_vehicle,
+            validate_vehicle_payload,
+            validate_vehicle_payloads,
+        ),
+        "maintenance": (
+            [_maintenance(rng) for _ in range(args.payloads)],
+            legacy_maintenance,
+            validate_maintenance_payload,
+            validate_maintenance_payloads,
+        ),
+    }
+
+    print(f"{args.payloads} payloads per kind, seed {args.seed}, invalid rate {args.invalid_rate}")
+    for kind, (payloads, legacy, compiled, batch) in cases.items():
+        expected = [legacy(payload) for payload in payloads]
+        assert [compiled(payload) for payload in payloads] == expected
+        assert batch(payloads) == expected
+        invalid = sum(1 for errors in expected if errors)
+
+        timings = {
+            "hand-written": lambda: [legacy(payload) for payload in payloads],
+            "compiled": lambda: [compiled(payload) for payload in payloads],
+            "batch": lambda: batch(payloads),
+        }
+        print(f"  {kind} ({invalid} invalid, identical errors)")
+        for name, run in timings.items():
+            seconds = min(timeit.repeat(run, number=1, repeat=args.repeat))
+            print(f"    {name:>12}: {seconds * 1000:8.1f} ms  {seconds / args.payloads * 1e6:6.2f} us/payload")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import itertools
+import os
+from types import SimpleNamespace
+
+import mongomock
+import pytest
+from bson import ObjectId
+
+from app import create_app
+from app.config import BaseConfig
+from app.routes.shared import create_access_token
+from app.utils.metrics import metrics
+from app.utils.mongo_listener import CommandMetricsListener
+
+# Collection method -> the command pymongo sends for it.
+_COMMANDS = {
+    "find": "find",
+    "find_one": "find",
+    "insert_one": "insert",
+    "insert_many": "insert",
+    "update_one": "update",
+    "update_many": "update",
+    "bulk_write": "update",
+    "delete_one": "delete",
+    "delete_many": "delete",
+    "find_one_and_update": "findAndModify",
+    "find_one_and_delete": "findAndModify",
+    "aggregate": "aggregate",
+    "count_documents": "aggregate",
+}
+
+
+class CountingCollection:
+    def __init__(self, db, collection):
+        self._db = db
+        self._collection = collection
+
+    def __getattr__(self, name):
+        attr = getattr(self._collection, name)
+        command = _COMMANDS.get(name)
+        if command is None:
+            return attr
+
+        def call(*args, **kwargs):
+            self._db.record(self._collection.name, command)
+            canned = self._db.aggregate_results.get(self._collection.name)
+            if name == "aggregate" and canned is not None:
+                return iter(canned)
+            return attr(*args, **kwargs)
+
+        return call
+
+
+class CountingDatabase:
+    """mongomock database reporting each collection call to a CommandListener as one command.
+
+    ``aggregate_results`` holds canned aggregate output per collection for
+    pipelines mongomock cannot run ($lookup with let).
+    """
+
+    def __init__(self, listener):
+        self.listener = listener
+        self.aggregate_results = {}
+        self._db = mongomock.MongoClient().db
+        self._request_ids = itertools.count(1)
+
+    def __getitem__(self, name):
+        return CountingCollection(self, self._db[name])
+
+    def with_options(self, **kwargs):
+        return self
+
+    def record(self, collection, command_name):
+        event = SimpleNamespace(
+            command_name=command_name,
+            command={command_name: collection},
+            connection_id=("mongomock", 27017),
+            request_id=next(self._request_ids),
+            duration_micros=250,
+            database_name="test",
+        )
+        self.listener.started(event)
+        self.listener.succeeded(event)
+
+
+@pytest.fixture
+def app(tmp_path):
+    class TestConfig(BaseConfig):
+        TESTING = True
+        # mongomock implements neither $convert nor $lookup with let.
+        STRING_DATES_MIGRATED = True
+        MODEL_REGISTRY_DIR = str(tmp_path / "model_registry")
+        PREDICT_LATENCY_BUDGET_MS = 0
+
+    application = create_app(TestConfig)
+    listener = CommandMetricsListener(slow_query_ms=TestConfig.MONGO_SLOW_QUERY_MS)
+    db = CountingDatabase(listener)
+    application.extensions.update(
+        mongo_db=db, mongo_read_db=db, mongo_listener=listener, mongo_pid=os.getpid()
+    )
+    metrics.reset()
+    return application
+
+
+@pytest.fixture
+def db(app):
+    return app.extensions["mongo_db"]
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def user(app, db):
+    doc = {"_id": ObjectId(), "email": "driver@example.com", "role": "user"}
+    db["users"].insert_one(doc)
+    with app.app_context():
+        token = create_access_token(str(doc["_id"]))
+    return {"id": str(doc["_id"]), "headers": {"Authorization": f"Bearer {token}"}}
@@ -0,0 +1,19 @@
+from app.models import VehicleCatalog
+
+
+class _LaggingSecondary:
+    def __getitem__(self, name):
+        raise AssertionError("catalog search index read from the secondary")
+
+    def with_options(self, **kwargs):
+        return self
+
+
+def test_search_index_rebuild_after_upsert_reads_the_primary(app):
+    app.extensions["mongo_read_db"] = _LaggingSecondary()
+
+    with app.app_context():
+        VehicleCatalog.upsert_many([{"id": "nissan-versa", "make": "Nissan", "model": "Versa"}])
+        results = VehicleCatalog.search("versa")
+
+    assert [item["id"] for item in results] == ["nissan-versa"]
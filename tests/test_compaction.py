@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+
+from app.jobs.compaction import PredictionCompactor
+
+NOW = datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+
+def _prediction(db, days_ago, oil_km, **fields):
+    doc = {
+        "_id": ObjectId(), "user_id": "u1", "vehicle_id": "v1",
+        "created_at": (NOW - timedelta(days=days_ago)).replace(tzinfo=None),
+        "prediction": {"maintenance_schedule": {"recommended_next_oil_change_km": oil_km}},
+        **fields,
+    }
+    db["predictions"].insert_one(doc)
+    return doc["_id"]
+
+
+def _compactor(db, keep_latest):
+    return PredictionCompactor(db, keep_latest=keep_latest, snapshot_days=730, clock=lambda: NOW)
+
+
+def test_keep_latest_wins_over_snapshot_expiry(db):
+    newest = _prediction(db, 800, 60000)
+    older = [_prediction(db, 801, 59000), _prediction(db, 802, 58000)]
+
+    totals = _compactor(db, keep_latest=1).run()
+
+    remaining = {doc["_id"]: doc for doc in db["predictions"].find()}
+    assert set(remaining) == {newest}
+    assert remaining[newest]["snapshot"] is True
+    assert totals["expired"] == 2
+    assert all(_id not in remaining for _id in older)
+
+
+def test_legacy_records_are_backfilled_so_the_ttl_index_matches_them(db):
+    for days_ago, oil_km in ((1, 60000), (1.5, 59000), (2, 58000)):
+        _prediction(db, days_ago, oil_km)
+
+    totals = _compactor(db, keep_latest=1).run()
+
+    assert totals["backfilled"] == 3
+    assert db["predictions"].count_documents({"snapshot": {"$exists": False}}) == 0
+    # Day 1's second record is downsampled; the newest and day 2's newest stay as snapshots.
+    assert totals["downsampled"] == 1
+    assert [doc["snapshot"] for doc in db["predictions"].find()] == [True, True]
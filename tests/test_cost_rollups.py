@@ -0,0 +1,37 @@
+from datetime import datetime, timezone
+
+from bson import ObjectId
+
+from app.models.cost_rollup import month_of
+from app.utils.metrics import metrics
+
+
+def test_month_of_reads_both_stored_forms_and_rejects_malformed_dates():
+    assert month_of(datetime(2026, 3, 31, 23, 0)) == "2026-03"
+    assert month_of("2026-03-05") == "2026-03"
+    assert month_of("2026-03-31T23:30:00-02:00") == "2026-04"
+    assert month_of("15/03/2026") is None
+    assert month_of("2026-13-01") is None
+    assert month_of("") is None
+
+
+def test_malformed_service_dates_are_counted_and_left_out_of_rollups(client, db, user):
+    now = datetime.now(timezone.utc)
+    vehicle_id = str(
+        db["vehicles"].insert_one(
+            {"_id": ObjectId(), "user_id": user["id"], "make": "Nissan", "model": "Versa", "year": 2018,
+             "current_mileage": 50000, "created_at": now, "updated_at": now}
+        ).inserted_id
+    )
+
+    for service_date in ("2026-01-10", "10/01/2026"):
+        response = client.post(
+            "/api/maintenance",
+            headers=user["headers"],
+            json={"vehicle_id": vehicle_id, "service_type": "oil_change", "cost": 900, "service_date": service_date},
+        )
+        assert response.status_code == 201
+
+    rollups = list(db["cost_rollups"].find({}, {"_id": 0, "month": 1, "count": 1}))
+    assert rollups == [{"month": "2026-01", "count": 1}]
+    assert metrics.counter("rollups.skipped_invalid_date") == 1
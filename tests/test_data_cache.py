@@ -0,0 +1,34 @@
+import pandas as pd
+
+from app.ml_model import data_cache
+
+
+def test_rebuild_swaps_the_pointer_and_keeps_the_previous_version(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_cache, "CACHE_DIR", tmp_path / "cache")
+    source = tmp_path / "costs.csv"
+    pd.DataFrame({"cost": [900, 1500], "service_type": ["oil_change", "brake_service"]}).to_csv(source, index=False)
+    cache_dir = tmp_path / "cache" / "costs"
+
+    data_cache.prepare(source, ["service_type"])
+    first = (cache_dir / "CURRENT").read_text()
+    data_cache.prepare(source, ["service_type"], force=True)
+    second = (cache_dir / "CURRENT").read_text()
+    data_cache.prepare(source, ["service_type"], force=True)
+
+    # The version replaced last stays for in-flight readers; older ones are removed.
+    assert {p.name for p in cache_dir.iterdir()} == {"CURRENT", second, (cache_dir / "CURRENT").read_text()}
+    assert not (cache_dir / first).exists()
+    frame = data_cache.load_frame(source, ["service_type"])
+    assert frame["service_type"].tolist() == ["oil_change", "brake_service"]
+    assert frame["cost"].tolist() == [900, 1500]
+
+
+def test_a_missing_pointer_rebuilds_the_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_cache, "CACHE_DIR", tmp_path / "cache")
+    source = tmp_path / "costs.csv"
+    pd.DataFrame({"cost": [900]}).to_csv(source, index=False)
+
+    data_cache.prepare(source)
+    (tmp_path / "cache" / "costs" / "CURRENT").unlink()
+
+    assert data_cache.prepare(source)[1] is True
@@ -0,0 +1,17 @@
+import logging
+
+from app.utils import db
+from app.utils.metrics import metrics
+
+
+def test_missing_compressor_packages_are_skipped_with_a_warning(app, monkeypatch, caplog):
+    monkeypatch.setattr(db, "_HAVE_ZSTD", False)
+    monkeypatch.setattr(db, "_HAVE_SNAPPY", True)
+
+    with caplog.at_level(logging.INFO, logger="app.utils.db"):
+        options = db._client_options({**app.config, "MONGO_COMPRESSORS": "zstd, snappy, zlib"})
+
+    assert options["compressors"] == ["snappy", "zlib"]
+    assert metrics.counter("mongo.compressors_unavailable") == 1
+    assert "zstd requested but its package is not installed" in caplog.text
+    assert "compressors offered: snappy, zlib" in caplog.text
@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from bson import ObjectId
+
+from app.ml_model import forecast
+from app.ml_model.predict import load_intervals
+from app.models.due import refresh_due_fields
+from app.storage.mongo import MongoMaintenanceRepository
+
+
+def _vehicle(db, user_id):
+    now = datetime.now(timezone.utc)
+    doc = {"_id": ObjectId(), "user_id": user_id, "make": "Nissan", "model": "Versa", "year": 2018,
+           "current_mileage": 50000, "created_at": now, "updated_at": now}
+    db["vehicles"].insert_one(doc)
+    return str(doc["_id"])
+
+
+def test_history_only_reads_the_owners_records(app, db, user):
+    vehicle_id = _vehicle(db, user["id"])
+    db["maintenance"].insert_many([
+        {"user_id": user["id"], "vehicle_id": vehicle_id, "service_type": "oil_change", "mileage": 45000,
+         "service_date": datetime(2026, 1, 1)},
+        {"user_id": "someone-else", "vehicle_id": vehicle_id, "service_type": "oil_change", "mileage": 49000,
+         "service_date": datetime(2026, 2, 1)},
+    ])
+
+    with app.app_context():
+        rows = MongoMaintenanceRepository().history_for_vehicles(user["id"], [vehicle_id], ["mileage"])
+        assert [row["mileage"] for row in rows] == [45000]
+
+        refresh_due_fields(user["id"], [vehicle_id])
+        check_days = int(load_intervals().get("general_check_days", 180))
+    vehicle = db["vehicles"].find_one({"_id": ObjectId(vehicle_id)})
+    assert vehicle["next_due_general_check_date"] == datetime(2026, 1, 1) + timedelta(days=check_days)
+
+
+class _CountingIntervalModel:
+    def __init__(self):
+        self.calls = 0
+
+    def predict(self, frame):
+        self.calls += 1
+        return np.full(len(frame), 8000.0)
+
+
+def test_refresh_predicts_all_oil_intervals_in_one_call(app, db, user, monkeypatch):
+    model = _CountingIntervalModel()
+    store = type("Store", (), {"bundle": lambda self, name, deadline=None: {"model": model}})()
+    monkeypatch.setattr(forecast, "get_model_store", lambda: store)
+    vehicle_ids = [_vehicle(db, user["id"]) for _ in range(3)]
+
+    with app.app_context():
+        assert refresh_due_fields(user["id"], vehicle_ids) == 3
+
+    assert model.calls == 1
+    assert [v["next_due_oil_change_km"] for v in db["vehicles"].find()] == [58000, 58000, 58000]
+
+
+def test_due_list_rejects_out_of_range_windows(client, user):
+    for query in ("days=99999999999", "days=-1", "km=99999999999999999999"):
+        response = client.get(f"/api/vehicles/due?{query}", headers=user["headers"])
+        assert response.status_code == 400, query
+    assert client.get("/api/vehicles/due?days=3650&km=0", headers=user["headers"]).status_code == 200
@@ -0,0 +1,41 @@
+import gzip
+import json
+from datetime import datetime, timezone
+
+from bson import ObjectId
+
+
+def test_vehicle_export_varies_on_authorization(client, db, user):
+    now = datetime.now(timezone.utc)
+    db["vehicles"].insert_one({"_id": ObjectId(), "user_id": user["id"], "make": "Nissan", "created_at": now})
+
+    bodies = []
+    for path in ("/api/vehicles/export", "/api/vehicles/export?gzip=1"):
+        response = client.get(path, headers=user["headers"])
+        assert response.status_code == 200
+        assert set(response.vary) == {"Authorization", "Accept-Encoding"}
+        # Reading the streamed body closes the request context before the next request.
+        bodies.append(response.data)
+
+    assert [json.loads(line)["make"] for line in bodies[0].splitlines()] == ["Nissan"]
+    assert gzip.decompress(bodies[1]) == bodies[0]
+
+
+def test_import_reports_rows_that_are_not_utf8(client, db, user):
+    vehicle_id = str(db["vehicles"].insert_one({"user_id": user["id"], "current_mileage": 1000}).inserted_id)
+    good = json.dumps({"vehicle_id": vehicle_id, "service_type": "oil_change", "cost": 900,
+                       "service_date": "2026-01-10"}).encode()
+    ndjson = b"\n".join([good, b'{"description": "caf\xe9"}', good])
+    csv_body = (
+        b"vehicle_id,service_type,cost,service_date,description\n"
+        + f"{vehicle_id},oil_change,900,2026-01-10,ok\n".encode()
+        + f"{vehicle_id},oil_change,900,2026-01-11,\xff\xfe\n".encode("latin-1")
+    )
+
+    for fmt, body in (("ndjson", ndjson), ("csv", csv_body)):
+        response = client.post(f"/api/maintenance/import?format={fmt}", data=body, headers=user["headers"])
+        assert response.status_code == 200
+        report = response.get_json()
+        assert report["failed"] == 1
+        assert report["errors"] == [{"row": 2, "errors": ["row is not valid UTF-8"]}]
+    assert db["maintenance"].count_documents({}) == 3
@@ -0,0 +1,58 @@
+import threading
+import time
+
+import pytest
+
+from app.ml_model import predict
+from app.utils.metrics import metrics
+
+
+class _BlockingModel:
+    def __init__(self):
+        self.release = threading.Event()
+        self.calls = 0
+
+    def predict(self, frame):
+        self.calls += 1
+        self.release.wait(5)
+        return [1.0]
+
+
+@pytest.fixture
+def one_worker_pool(app):
+    predict.configure_inference(250, workers=1, max_queue=1)
+    yield
+    predict.configure_inference(0)
+
+
+def test_timed_out_calls_are_cancelled_and_the_queue_is_bounded(one_worker_pool):
+    model = _BlockingModel()
+    busy = threading.Thread(target=predict._predict_one, args=(model, {"x": 1}, time.monotonic() + 0.2))
+    busy.start()
+    time.sleep(0.05)
+
+    # Queued behind the running call: misses its deadline and is cancelled,
+    # which frees its slot for the next caller.
+    assert predict._predict_one(model, {"x": 1}, time.monotonic() + 0.05) is None
+    assert predict._predict_one(model, {"x": 1}, time.monotonic() + 0.05) is None
+    assert metrics.counter("predict.inference_pool_full") == 0
+
+    model.release.set()
+    busy.join()
+    assert model.calls == 1
+
+
+def test_calls_past_the_queue_bound_fall_back_without_queueing(one_worker_pool):
+    model = _BlockingModel()
+    deadline = time.monotonic() + 0.3
+    threads = [threading.Thread(target=predict._predict_one, args=(model, {"x": 1}, deadline)) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+
+    assert predict._predict_one(model, {"x": 1}, deadline) is None
+    assert metrics.counter("predict.inference_pool_full") == 1
+
+    model.release.set()
+    for thread in threads:
+        thread.join()
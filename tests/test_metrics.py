@@ -0,0 +1,91 @@
+import logging
+from types import SimpleNamespace
+
+from app.utils.metrics import MetricsRegistry, metrics
+from app.utils.mongo_listener import CommandMetricsListener
+
+
+def _event(command_name="find", collection="vehicles", duration_micros=1500, request_id=1):
+    return SimpleNamespace(
+        command_name=command_name,
+        command={command_name: collection, "filter": {"user_id": "u", "vehicle_id": "v"}},
+        connection_id=("localhost", 27017),
+        request_id=request_id,
+        duration_micros=duration_micros,
+        database_name="test",
+    )
+
+
+def test_registry_snapshot_reports_counters_and_summaries():
+    registry = MetricsRegistry()
+    registry.incr("requests")
+    registry.incr("requests", 2)
+    for value in (10, 20, 60):
+        registry.observe("latency_ms", value)
+
+    assert registry.snapshot() == {
+        "counters": {"requests": 3},
+        "summaries": {"latency_ms": {"count": 3, "total": 90, "avg": 30.0, "max": 60}},
+    }
+
+
+def test_listener_records_count_and_duration_per_collection_command(app):
+    listener = CommandMetricsListener(slow_query_ms=100)
+    event = _event(duration_micros=1500)
+    listener.started(event)
+    listener.succeeded(event)
+
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"]["mongo.vehicles.find.count"] == 1
+    assert snapshot["summaries"]["mongo.vehicles.find.duration_ms"] == {
+        "count": 1, "total": 1.5, "avg": 1.5, "max": 1.5
+    }
+    assert metrics.counter("mongo.slow_queries") == 0
+
+
+def test_listener_counts_failures_and_logs_slow_commands(app, caplog):
+    listener = CommandMetricsListener(slow_query_ms=100)
+    event = _event(command_name="aggregate", collection="maintenance", duration_micros=250_000)
+    with caplog.at_level(logging.WARNING, logger="app.mongo.slow"):
+        listener.started(event)
+        listener.failed(event)
+
+    assert metrics.counter("mongo.maintenance.aggregate.count") == 1
+    assert metrics.counter("mongo.maintenance.aggregate.errors") == 1
+    assert metrics.counter("mongo.slow_queries") == 1
+    assert '"filter_keys": ["user_id", "vehicle_id"]' in caplog.text
+    assert '"duration_ms": 250.0' in caplog.text
+
+
+def test_listener_ignores_handshake_commands(app):
+    listener = CommandMetricsListener()
+    event = _event(command_name="hello", collection="admin")
+    listener.started(event)
+    listener.succeeded(event)
+
+    assert metrics.snapshot()["counters"] == {}
+
+
+def test_request_records_its_query_count(app, client, user):
+    response = client.get("/api/vehicles", headers=user["headers"])
+
+    assert response.headers["X-Mongo-Query-Count"] == "2"
+    assert metrics.counter("mongo.users.find.count") == 1
+    assert metrics.counter("mongo.vehicles.find.count") == 1
+    assert metrics.snapshot()["summaries"]["http.mongo_queries_per_request"]["max"] == 2
+
+
+def test_metrics_endpoint_is_disabled_without_a_token(app, client):
+    app.config["METRICS_TOKEN"] = ""
+
+    assert client.get("/metrics").status_code == 404
+
+
+def test_metrics_endpoint_requires_the_configured_token(app, client):
+    app.config["METRICS_TOKEN"] = "scrape-secret"
+
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    response = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+    assert response.status_code == 200
+    assert set(response.get_json()) == {"counters", "summaries"}
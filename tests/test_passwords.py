@@ -0,0 +1,67 @@
+import os
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from app.utils import passwords
+from app.utils.metrics import metrics
+
+
+@pytest.fixture
+def ctx(app):
+    with app.app_context():
+        yield app
+
+
+def test_needs_rehash_is_false_for_the_configured_parameters(ctx):
+    ctx.config.update(PASSWORD_HASH_METHOD="scrypt", PASSWORD_SALT_LENGTH=16)
+
+    assert not passwords.needs_rehash(generate_password_hash("pw", method="scrypt:32768:8:1", salt_length=16))
+
+
+@pytest.mark.parametrize(
+    "method, salt_length",
+    [("scrypt:16384:8:1", 16), ("scrypt:32768:8:1", 8), ("pbkdf2:sha256:1000000", 16)],
+)
+def test_needs_rehash_compares_every_parameter_and_the_salt_length(ctx, method, salt_length):
+    ctx.config.update(PASSWORD_HASH_METHOD="scrypt:32768:8:1", PASSWORD_SALT_LENGTH=16)
+
+    assert passwords.needs_rehash(generate_password_hash("pw", method=method, salt_length=salt_length))
+
+
+def test_needs_rehash_compares_pbkdf2_iterations(ctx):
+    ctx.config.update(PASSWORD_HASH_METHOD="pbkdf2:sha256:600000", PASSWORD_SALT_LENGTH=16)
+    stored = generate_password_hash("pw", method="pbkdf2:sha256:600000", salt_length=16)
+
+    assert not passwords.needs_rehash(stored)
+    ctx.config["PASSWORD_HASH_METHOD"] = "pbkdf2"
+    assert passwords.needs_rehash(stored)
+
+
+def test_pool_is_rebuilt_after_a_worker_dies(ctx):
+    ctx.config.update(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_METHOD="scrypt:1024:8:1")
+    try:
+        # Both attempts kill their worker; the caller sees PasswordHasherBusy
+        # (a 503), not BrokenProcessPool ...
+        with pytest.raises(passwords.PasswordHasherBusy):
+            passwords._run(os._exit, 1)
+        assert metrics.counter("auth.password_pool_broken") == 2
+
+        # ... and the next call runs on a fresh pool.
+        stored = passwords.hash_password("pw")
+        assert passwords.verify_password(stored, "pw")
+    finally:
+        if passwords._executor is not None:
+            passwords._executor.shutdown()
+        passwords._executor = passwords._executor_pid = None
+
+
+def test_slow_hash_raises_busy_after_the_result_timeout(ctx):
+    ctx.config.update(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_RESULT_TIMEOUT_MS=1)
+    try:
+        with pytest.raises(passwords.PasswordHasherBusy):
+            passwords.hash_password("pw")
+        assert metrics.counter("auth.password_pool_timeouts") == 1
+    finally:
+        passwords._executor.shutdown()
+        passwords._executor = passwords._executor_pid = None
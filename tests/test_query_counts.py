@@ -0,0 +1,104 @@
+from datetime import datetime, timezone
+
+from bson import ObjectId
+
+from app.storage.mongo import MongoCostRollupRepository
+from app.utils.metrics import metrics
+
+
+def _query_count(response):
+    return int(response.headers["X-Mongo-Query-Count"])
+
+
+def _insert_vehicle(db, user_id, **fields):
+    now = datetime.now(timezone.utc)
+    doc = {"_id": ObjectId(), "user_id": user_id, "make": "Nissan", "model": "Versa", "year": 2018,
+           "current_mileage": 50000, "created_at": now, "updated_at": now, **fields}
+    db["vehicles"].insert_one(doc)
+    return str(doc["_id"])
+
+
+def test_vehicle_list_reads_user_and_vehicles_once(client, db, user):
+    for _ in range(3):
+        _insert_vehicle(db, user["id"])
+
+    response = client.get("/api/vehicles", headers=user["headers"])
+
+    assert response.status_code == 200
+    assert len(response.get_json()["items"]) == 3
+    assert _query_count(response) == 2
+
+
+def test_vehicle_detail_issues_two_queries(client, db, user):
+    vehicle_id = _insert_vehicle(db, user["id"])
+
+    response = client.get(f"/api/vehicles/{vehicle_id}", headers=user["headers"])
+
+    assert response.status_code == 200
+    assert response.get_json()["vehicle"]["id"] == vehicle_id
+    assert _query_count(response) == 2
+
+
+def test_maintenance_list_issues_three_queries(client, db, user):
+    vehicle_id = _insert_vehicle(db, user["id"])
+    db["maintenance"].insert_many(
+        [{"user_id": user["id"], "vehicle_id": vehicle_id, "service_type": "oil_change", "cost": 900,
+          "service_date": datetime(2026, month, 1)} for month in (1, 2, 3)]
+    )
+
+    response = client.get(f"/api/maintenance/{vehicle_id}", headers=user["headers"])
+
+    assert response.status_code == 200
+    assert [item["service_date"] for item in response.get_json()["items"]] == ["2026-03-01", "2026-02-01", "2026-01-01"]
+    assert _query_count(response) == 3
+
+
+def test_dashboard_is_one_aggregation(client, db, user):
+    vehicle_id = _insert_vehicle(db, user["id"])
+    db.aggregate_results["vehicles"] = [
+        {"_id": ObjectId(vehicle_id), "user_id": user["id"], "make": "Nissan", "latest_maintenance": [],
+         "latest_prediction": [], "stats": [{"maintenance_count": 2, "total_cost": 1800.0,
+                                             "last_service_date": datetime(2026, 2, 1)}]}
+    ]
+
+    response = client.get("/api/dashboard", headers=user["headers"])
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["summary"] == {"vehicles": 1, "maintenance_count": 2, "total_cost": 1800.0}
+    assert body["items"][0]["stats"]["last_service_date"] == "2026-02-01"
+    assert _query_count(response) == 2
+
+
+def test_maintenance_create_reuses_the_vehicle_loaded_by_the_request(client, db, user):
+    vehicle_id = _insert_vehicle(db, user["id"])
+
+    response = client.post(
+        "/api/maintenance",
+        headers=user["headers"],
+        json={"vehicle_id": vehicle_id, "service_type": "oil_change", "cost": 900, "mileage": 50500,
+              "service_date": "2026-01-10"},
+    )
+
+    assert response.status_code == 201
+    # user, vehicle, insert, history, due-field update, rollup flush
+    assert _query_count(response) == 6
+    assert metrics.counter("identity_map.hits") >= 1
+
+
+def test_failed_rollup_flush_keeps_the_committed_write(client, db, user, monkeypatch):
+    vehicle_id = _insert_vehicle(db, user["id"])
+
+    def fail(self, changes):
+        raise RuntimeError("rollup write failed")
+
+    monkeypatch.setattr(MongoCostRollupRepository, "increment_many", fail)
+    response = client.post(
+        "/api/maintenance",
+        headers=user["headers"],
+        json={"vehicle_id": vehicle_id, "service_type": "oil_change", "cost": 900, "service_date": "2026-01-10"},
+    )
+
+    assert response.status_code == 201
+    assert db["maintenance"].count_documents({"vehicle_id": vehicle_id}) == 1
+    assert metrics.counter("unit_of_work.flush_errors") == 1
@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from app.jobs.reminders import REMINDERS_COLLECTION, ReminderScheduler
+from app.models.vehicle import SHARD_SPACE
+
+NOW = datetime(2026, 10, 1)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = NOW
+
+    def __call__(self):
+        return self.now
+
+
+def _vehicle(db, shard_key):
+    db["vehicles"].insert_one(
+        {"_id": ObjectId(), "user_id": "u1", "shard_key": shard_key, "next_due_date": NOW + timedelta(days=3)}
+    )
+
+
+def _scheduler(db, owner, clock):
+    return ReminderScheduler(db, shard_count=2, lease_seconds=60, cycle_seconds=900, owner=owner, clock=clock)
+
+
+def test_each_shard_is_scanned_once_per_cycle(db):
+    clock = _Clock()
+    for shard_key in (0, 1, SHARD_SPACE // 2, SHARD_SPACE - 1):
+        _vehicle(db, shard_key)
+    first, second = _scheduler(db, "worker-a", clock), _scheduler(db, "worker-b", clock)
+
+    # worker-b holds shard 1, so worker-a only scans shard 0.
+    assert second.leases.acquire("reminders:2:1")
+    assert first.run_once() == {"shards": 1, "scanned": 2, "created": 2}
+
+    # Past the lease TTL but within the cycle, finished shards stay claimed.
+    clock.now += timedelta(seconds=120)
+    assert second.run_once() == {"shards": 1, "scanned": 2, "created": 2}
+    # Its own shard can be renewed by the same owner; the reminders are deduplicated.
+    assert first.run_once() == {"shards": 1, "scanned": 2, "created": 0}
+    assert db[REMINDERS_COLLECTION].count_documents({}) == 4
+
+    clock.now += timedelta(seconds=901)
+    assert second.run_once() == {"shards": 2, "scanned": 4, "created": 0}
+
+
+def test_a_failed_scan_releases_its_lease(db, monkeypatch):
+    clock = _Clock()
+    _vehicle(db, 0)
+    first, second = _scheduler(db, "worker-a", clock), _scheduler(db, "worker-b", clock)
+
+    def fail(shard):
+        raise RuntimeError("scan failed")
+
+    monkeypatch.setattr(first, "scan_shard", fail)
+    with pytest.raises(RuntimeError):
+        first.run_once()
+
+    clock.now += timedelta(seconds=1)
+    assert second.run_once()["shards"] == 2
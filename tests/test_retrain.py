@@ -0,0 +1,80 @@
+from datetime import datetime, timezone
+
+import pytest
+from bson import ObjectId
+
+from app.jobs import retrain
+from app.routes.shared import create_access_token
+
+
+def _admin_headers(app, db):
+    doc = {"_id": ObjectId(), "email": "admin@example.com", "role": "admin"}
+    db["users"].insert_one(doc)
+    with app.app_context():
+        return {"Authorization": f"Bearer {create_access_token(str(doc['_id']))}"}
+
+
+@pytest.fixture
+def launched(monkeypatch):
+    """Replace the spawned training process with one that reports success at once."""
+    calls = []
+
+    class Process:
+        def __init__(self, target, args, name):
+            self.args, self.exitcode = args, 0
+
+        def start(self):
+            output_dir, result_path, mode, options = self.args
+            calls.append((mode, options))
+            retrain.Path(output_dir).mkdir(parents=True)
+            retrain._write_json(retrain.Path(result_path), {"status": "ok", "results": []})
+
+        def join(self, timeout=None):
+            pass
+
+        def is_alive(self):
+            return False
+
+    monkeypatch.setattr(retrain.multiprocessing, "get_context", lambda method: type("Ctx", (), {"Process": Process}))
+    return calls
+
+
+def test_retrain_route_starts_a_tuning_job(app, client, db, monkeypatch):
+    started = []
+    manager = app.extensions["model_retrain"]
+    monkeypatch.setattr(manager, "start", lambda requested_by, mode: started.append(mode) or {"mode": mode})
+    headers = _admin_headers(app, db)
+
+    assert client.post("/api/models/retrain", headers=headers, json={"mode": "tune"}).status_code == 202
+    assert client.post("/api/models/retrain", headers=headers).status_code == 202
+    for mode in ("deploy", ["tune"], {"tune": 1}):
+        assert client.post("/api/models/retrain", headers=headers, json={"mode": mode}).status_code == 400
+    assert started == ["tune", "train"]
+
+
+def test_tuned_candidates_go_through_validation(app, launched, monkeypatch):
+    manager = app.extensions["model_retrain"]
+    monkeypatch.setattr(retrain, "validate_artifacts", lambda *args: ["interval_optimizer MAE too high"])
+
+    job = manager.start(requested_by="cli", mode="tune", background=False)
+
+    assert launched == [("tune", {"n_jobs": app.config["MODEL_TUNING_N_JOBS"]})]
+    assert job["mode"] == "tune"
+    assert job["status"] == "rejected"
+    assert job["errors"] == ["interval_optimizer MAE too high"]
+    assert manager.registry.current_version() is None
+
+
+def test_promotion_refreshes_stored_due_fields(app, db, user, launched, monkeypatch):
+    manager = app.extensions["model_retrain"]
+    monkeypatch.setattr(retrain, "validate_artifacts", lambda *args: [])
+    db["vehicles"].insert_one({"_id": ObjectId(), "user_id": user["id"], "current_mileage": 50000,
+                               "created_at": datetime.now(timezone.utc)})
+
+    job = manager.start(requested_by="cli", background=False)
+
+    assert launched == [("train", {})]
+    assert job["status"] == "promoted"
+    assert manager.registry.current_version() == job["version"]
+    assert job["due_refreshed"] == 1
+    assert db["vehicles"].find_one()["next_due_km"] is not None
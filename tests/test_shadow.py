@@ -0,0 +1,55 @@
+import pytest
+
+from app.ml_model import predict
+
+VEHICLE = {"make": "Nissan", "model": "Versa", "year": 2018, "current_mileage": 50000}
+
+
+class _Evaluator:
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, features, primary_result):
+        self.submitted.append(primary_result)
+
+
+class _Store:
+    def __init__(self, bundle):
+        self._bundle = bundle
+
+    def bundle(self, name, deadline=None):
+        return self._bundle
+
+    def loading(self):
+        return False
+
+
+class _Model:
+    def predict(self, frame):
+        return [4200.0]
+
+
+@pytest.fixture
+def evaluator():
+    evaluator = _Evaluator()
+    predict.configure_shadow(evaluator)
+    yield evaluator
+    predict.configure_shadow(None)
+
+
+def test_fallback_results_are_not_shadowed(evaluator, monkeypatch):
+    monkeypatch.setattr(predict, "_model_store", _Store(None))
+
+    result = predict.estimate_next_maintenance_cost(VEHICLE, [])
+
+    assert result["model_used"] == "rule_based_fallback"
+    assert evaluator.submitted == []
+
+
+def test_model_results_are_shadowed(evaluator, monkeypatch):
+    monkeypatch.setattr(predict, "_model_store", _Store({"model": _Model(), "model_name": "primary"}))
+
+    result = predict.estimate_next_maintenance_cost(VEHICLE, [])
+
+    assert result == {"estimated_cost_mxn": 4200.0, "service_type": "major_service", "model_used": "primary"}
+    assert evaluator.submitted == [result]
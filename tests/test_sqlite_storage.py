@@ -0,0 +1,24 @@
+import types
+from datetime import datetime, timedelta
+
+from app.storage import sqlite
+from app.storage.sqlite import SQLiteDatabase, SQLitePredictionRepository
+
+
+def test_prediction_export_streams_rows_from_the_cursor(tmp_path, monkeypatch):
+    monkeypatch.setattr(sqlite, "_FETCH_SIZE", 2)
+    db = SQLiteDatabase(str(tmp_path / "app.db"))
+    db.ensure_schema()
+    repository = SQLitePredictionRepository(db)
+    start = datetime(2026, 1, 1)
+    for day in range(5):
+        repository.insert({"user_id": "u1", "vehicle_id": "v1", "created_at": start + timedelta(days=day)})
+    repository.insert({"user_id": "u2", "vehicle_id": "v2", "created_at": start})
+
+    rows = repository.iter_for_user("u1")
+
+    assert isinstance(rows, types.GeneratorType)
+    first = next(rows)
+    assert first["created_at"] == start + timedelta(days=4)
+    assert [doc["created_at"].day for doc in rows] == [4, 3, 2, 1]
+    assert len(list(repository.iter_for_user("u1", vehicle_id="v1"))) == 5
@@ -0,0 +1,84 @@
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from app.storage import get_repository
+from app.utils.dates import mongo_date, parse_date
+
+
+class _ConvertingDatabase:
+    """Runs the unmigrated ordering pipeline over a mongomock collection.
+
+    mongomock has no $convert, so after checking the pipeline that was built,
+    the $addFields stage is evaluated in Python the way $convert (onError and
+    onNull: None) evaluates mongo_date().
+    """
+
+    def __init__(self, db):
+        self._db = db
+        self.pipelines = []
+
+    def __getitem__(self, name):
+        return _ConvertingCollection(self, self._db[name])
+
+    def with_options(self, **kwargs):
+        return self
+
+
+class _ConvertingCollection:
+    def __init__(self, db, collection):
+        self._db = db
+        self._collection = collection
+
+    def find(self, *args, **kwargs):
+        raise AssertionError("unmigrated string dates must be ordered by the aggregate pipeline")
+
+    def aggregate(self, pipeline, **kwargs):
+        self._db.pipelines.append(pipeline)
+        match, add_fields, sort, project = pipeline
+        assert add_fields == {"$addFields": {"_service_order": mongo_date("service_date")}}
+        assert sort == {"$sort": {"_service_order": -1}}
+        assert kwargs == {"allowDiskUse": True}
+        docs = list(self._collection.find(match["$match"]))
+        # Null sorts below every date, as in MongoDB.
+        docs.sort(key=lambda doc: parse_date(doc.get("service_date")) or datetime.min, reverse=True)
+        if project["$project"] != {"_service_order": 0}:
+            fields = ("_id", *project["$project"])
+            docs = [{field: doc[field] for field in fields if field in doc} for doc in docs]
+        return iter(docs)
+
+
+@pytest.fixture
+def unmigrated(app, db):
+    app.config["STRING_DATES_MIGRATED"] = False
+    converting = _ConvertingDatabase(db)
+    app.extensions.update(mongo_db=converting, mongo_read_db=converting)
+    for service_date in ("2025-03-01", datetime(2025, 6, 1), "not a date", "2025-12-24T08:30:00", datetime(2024, 1, 5)):
+        db["maintenance"].insert_one(
+            {"_id": ObjectId(), "user_id": "u1", "vehicle_id": "v1", "service_date": service_date, "cost": 100.0}
+        )
+    return converting
+
+
+def test_mixed_string_and_date_records_are_ordered_by_date(app, unmigrated):
+    with app.app_context():
+        docs = list(get_repository("maintenance").iter_for_user("u1"))
+
+    assert [doc["service_date"] for doc in docs] == [
+        "2025-12-24T08:30:00",
+        datetime(2025, 6, 1),
+        "2025-03-01",
+        datetime(2024, 1, 5),
+        "not a date",
+    ]
+    assert all("_service_order" not in doc for doc in docs)
+
+
+def test_projected_history_keeps_only_the_requested_fields(app, unmigrated):
+    with app.app_context():
+        docs = list(get_repository("maintenance").history_for_vehicles("u1", ["v1"], ["service_date", "cost"]))
+
+    assert unmigrated.pipelines[-1][-1] == {"$project": {"service_date": 1, "cost": 1}}
+    assert docs[0]["service_date"] == "2025-12-24T08:30:00"
+    assert set(docs[0]) == {"_id", "service_date", "cost"}
@@ -0,0 +1,37 @@
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+
+from app.models import Vehicle
+
+
+def test_vehicle_telemetry_is_serialized_with_iso_dates():
+    doc = {"_id": ObjectId(), "telemetry": {
+        "first_at": datetime(2026, 1, 1), "first_km": 40000, "last_at": datetime(2026, 3, 1, 8, 30),
+        "last_km": 42000, "avg_km_daily": 33.9, "avg_km_weekly": 237.3, "avg_km_monthly": 1031.92,
+    }}
+
+    assert Vehicle.serialize(doc)["telemetry"] == {
+        "last_at": "2026-03-01T08:30:00", "last_km": 42000,
+        "avg_km_daily": 33.9, "avg_km_weekly": 237.3, "avg_km_monthly": 1031.92,
+    }
+    assert Vehicle.serialize({"_id": ObjectId()})["telemetry"] is None
+
+
+def test_ingest_rejects_timestamps_past_the_clock_skew(app, client, db, user):
+    vehicle_id = str(db["vehicles"].insert_one({"user_id": user["id"], "current_mileage": 1000}).inserted_id)
+    now = datetime.now(timezone.utc)
+    app.config["TELEMETRY_MAX_CLOCK_SKEW_S"] = 300
+
+    response = client.post("/api/telemetry", headers=user["headers"], json={"readings": [
+        {"vehicle_id": vehicle_id, "timestamp": (now + timedelta(minutes=10)).isoformat(), "odometer_km": 1200},
+        {"vehicle_id": vehicle_id, "timestamp": (now + timedelta(days=365)).isoformat(), "odometer_km": 1300},
+    ]})
+
+    assert response.status_code == 202
+    body = response.get_json()
+    assert body["accepted"] == 0
+    assert body["errors"] == [
+        {"index": 0, "errors": ["timestamp is in the future"]},
+        {"index": 1, "errors": ["timestamp is in the future"]},
+    ]